@@ -0,0 +1,28 @@
+"""add user token version
+
+Revision ID: a4c9e1f7b352
+Revises: f2b8d4c6e913
+Create Date: 2026-10-16 14:22:07.815394
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c9e1f7b352'
+down_revision: Union[str, Sequence[str], None] = 'f2b8d4c6e913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'token_version')
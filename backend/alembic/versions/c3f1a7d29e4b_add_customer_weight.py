@@ -0,0 +1,28 @@
+"""add customer weight
+
+Revision ID: c3f1a7d29e4b
+Revises: b532e8cbb763
+Create Date: 2026-10-16 09:12:41.530218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f1a7d29e4b'
+down_revision: Union[str, Sequence[str], None] = 'b532e8cbb763'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('customers', sa.Column('weight', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('customers', 'weight')
@@ -0,0 +1,28 @@
+"""add organization winner email template
+
+Revision ID: c8e4f2a6d913
+Revises: b7d3e9a1c524
+Create Date: 2026-10-17 00:12:09.731846
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e4f2a6d913'
+down_revision: Union[str, Sequence[str], None] = 'b7d3e9a1c524'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('organizations', sa.Column('winner_email_template', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('organizations', 'winner_email_template')
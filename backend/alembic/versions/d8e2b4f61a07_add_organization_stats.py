@@ -0,0 +1,47 @@
+"""add organization stats counters
+
+Revision ID: d8e2b4f61a07
+Revises: c3f1a7d29e4b
+Create Date: 2026-10-16 10:03:17.284611
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8e2b4f61a07'
+down_revision: Union[str, Sequence[str], None] = 'c3f1a7d29e4b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('organization_stats',
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('total_customers', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('winners', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('notified', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('organization_id')
+    )
+
+    # Backfill counters from existing entries
+    op.execute("""
+        INSERT INTO organization_stats (organization_id, total_customers, winners, notified)
+        SELECT o.id,
+               COUNT(c.id),
+               COUNT(c.id) FILTER (WHERE c.is_winner),
+               COUNT(c.id) FILTER (WHERE c.is_notified)
+        FROM organizations o
+        LEFT JOIN customers c ON c.organization_id = o.id
+        GROUP BY o.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('organization_stats')
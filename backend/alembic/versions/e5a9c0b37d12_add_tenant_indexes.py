@@ -0,0 +1,74 @@
+"""add tenant-aware customer indexes
+
+Replaces the global unique index on customers.email with a per-organization,
+case-insensitive one and indexes every tenant-scoped access path.
+
+Revision ID: e5a9c0b37d12
+Revises: d8e2b4f61a07
+Create Date: 2026-10-16 11:26:52.904417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a9c0b37d12'
+down_revision: Union[str, Sequence[str], None] = 'd8e2b4f61a07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _check_case_duplicate_emails() -> None:
+    """
+    Stop before creating uq_customers_org_email if an organization has emails
+    differing only in case, listing them: which entry to keep (winner,
+    notified, feedback) is a decision for the organization, not the migration.
+    """
+    duplicates = op.get_bind().execute(sa.text("""
+        SELECT organization_id, lower(email) AS email, array_agg(id ORDER BY id) AS ids
+        FROM customers
+        GROUP BY organization_id, lower(email)
+        HAVING count(*) > 1
+        ORDER BY organization_id, lower(email)
+    """)).all()
+    if duplicates:
+        listing = "\n".join(
+            f"  organization {row.organization_id}: {row.email} (customer IDs {', '.join(map(str, row.ids))})"
+            for row in duplicates
+        )
+        raise RuntimeError(
+            f"{len(duplicates)} email(s) are registered more than once in the same organization, "
+            f"differing only in case. Merge or delete the extra customers, then run the migration again:\n{listing}"
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _check_case_duplicate_emails()
+    op.create_index('ix_customers_org_created_id', 'customers', ['organization_id', 'created_at', 'id'], unique=False)
+    op.create_index(
+        'ix_customers_org_eligible', 'customers', ['organization_id', 'id'],
+        unique=False, postgresql_where=sa.text('is_winner = false')
+    )
+    op.create_index(
+        'ix_customers_org_winners', 'customers', ['organization_id', 'winner_place'],
+        unique=False, postgresql_where=sa.text('is_winner = true')
+    )
+    op.create_index(
+        'uq_customers_org_email', 'customers', ['organization_id', sa.text('lower(email)')], unique=True
+    )
+    op.drop_index('ix_customers_email', table_name='customers')
+    op.create_index(op.f('ix_prizes_organization_id'), 'prizes', ['organization_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_prizes_organization_id'), table_name='prizes')
+    op.create_index('ix_customers_email', 'customers', ['email'], unique=True)
+    op.drop_index('uq_customers_org_email', table_name='customers')
+    op.drop_index('ix_customers_org_winners', table_name='customers')
+    op.drop_index('ix_customers_org_eligible', table_name='customers')
+    op.drop_index('ix_customers_org_created_id', table_name='customers')
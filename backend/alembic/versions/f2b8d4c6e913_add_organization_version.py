@@ -0,0 +1,28 @@
+"""add organization version
+
+Revision ID: f2b8d4c6e913
+Revises: e5a9c0b37d12
+Create Date: 2026-10-16 13:04:18.362710
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b8d4c6e913'
+down_revision: Union[str, Sequence[str], None] = 'e5a9c0b37d12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('organizations', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('organizations', 'version')
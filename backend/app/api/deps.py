@@ -1,56 +1,127 @@
-from typing import Generator, Optional
+from dataclasses import dataclass
+from typing import Optional
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.database import SessionLocal
-from app.models.user import User
+from app.core.database import get_db
+from app.core.security import decode_access_token
 from app.models.organization import Organization
+from app.services.organization_cache import OrganizationSnapshot, get_organization_by_id
+from app.services.user_cache import UserSnapshot, get_user_snapshot, get_user_snapshot_async
 
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_PREFIX}/auth/login"
 )
 
-def get_db() -> Generator:
-    try:
-        db = SessionLocal()
-        yield db
-    finally:
-        db.close()
+@dataclass(frozen=True)
+class Principal:
+    """ Identity of an authenticated request, built from verified token claims. """
+    user_id: int
+    organization_id: int
+    token_version: int
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _principal_from_token(token: str) -> Principal:
+    """ Principal from the verified claims of a token, before the revocation check. """
+    payload = decode_access_token(token)
+    if payload is None:
+        raise _credentials_exception()
     try:
-        payload = jwt.decode(
-            token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
+        return Principal(
+            user_id=int(payload["sub"]),
+            organization_id=int(payload["org_id"]),
+            # Tokens issued before token versions existed count as version 0
+            token_version=int(payload.get("ver", 0)),
         )
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-        
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    except (KeyError, TypeError, ValueError):
+        raise _credentials_exception()
+
+def _check_not_revoked(principal: Principal, user: Optional[UserSnapshot]) -> Principal:
+    if (
+        user is None
+        or user.token_version != principal.token_version
+        or user.organization_id != principal.organization_id
+    ):
+        raise _credentials_exception()
+    return principal
+
+def get_current_principal(
+    token: str = Depends(oauth2_scheme)
+) -> Principal:
+    """
+    Authenticate the bearer token without reading the user row.
+
+    Signature and expiry are checked by decode_access_token (cached per
+    token); revocation by comparing the "ver" claim with a cached snapshot
+    of the user. Endpoints that only need the organization ID should
+    depend on this.
+    """
+    principal = _principal_from_token(token)
+    return _check_not_revoked(principal, get_user_snapshot(principal.user_id))
+
+async def get_current_principal_async(
+    token: str = Depends(oauth2_scheme)
+) -> Principal:
+    """
+    get_current_principal for async endpoints.
+    A sync dependency would run in the threadpool; this one only goes there
+    when the user snapshot has to be loaded.
+    """
+    principal = _principal_from_token(token)
+    return _check_not_revoked(principal, await get_user_snapshot_async(principal.user_id))
+
+def get_current_user(
+    principal: Principal = Depends(get_current_principal)
+) -> UserSnapshot:
+    """
+    The user of the authenticated request, from the user cache.
+
+    get_current_principal has just loaded the same snapshot, so this runs
+    no query. It is invalidated when token_version is bumped; endpoints
+    that modify the user load the row in their own session.
+    """
+    user = get_user_snapshot(principal.user_id)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     return user
 
 def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: UserSnapshot = Depends(get_current_user),
+) -> UserSnapshot:
     # We could check for is_active here if we added that field
     return current_user
 
 def get_current_organization(
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_current_principal)
 ) -> Organization:
-    return current_user.organization
+    """
+    Load the organization of the authenticated request by primary key,
+    attached to the request session so endpoints can modify it.
+    """
+    org = db.get(Organization, principal.organization_id)
+    if org is None:
+        raise _credentials_exception()
+    return org
+
+def get_current_organization_snapshot(
+    principal: Principal = Depends(get_current_principal)
+) -> OrganizationSnapshot:
+    """
+    Read-only snapshot of the organization of the authenticated request,
+    from the organization cache (no query on a hit). Writes to the
+    organization invalidate it; use get_current_organization to modify it.
+    """
+    snapshot = get_organization_by_id(principal.organization_id)
+    if snapshot is None:
+        raise _credentials_exception()
+    return snapshot
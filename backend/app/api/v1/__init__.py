@@ -4,13 +4,41 @@ API v1 router.
 Combines all v1 endpoints into a single router.
 """
 from fastapi import APIRouter
+from fastapi.routing import APIRoute
+
+from app.api.v1.endpoints import customers, customers_async, auth, organizations, metrics
+from app.core.config import settings
+
+
+def _operations(router: APIRouter) -> set:
+    return {(route.path, method) for route in router.routes if isinstance(route, APIRoute) for method in route.methods}
+
+
+def _without_operations(router: APIRouter, operations: set) -> APIRouter:
+    """
+    Copy of router without the routes that another router serves instead.
+
+    Routes shadowed by an earlier router are unreachable, and keeping them
+    would list each operation twice in the OpenAPI schema.
+    """
+    remaining = APIRouter()
+    remaining.routes.extend(
+        route for route in router.routes
+        if not (isinstance(route, APIRoute) and {(route.path, method) for method in route.methods} & operations)
+    )
+    return remaining
 
-from app.api.v1.endpoints import customers, auth, organizations
 
 # Create the main v1 router
 api_router = APIRouter()
 
 # Include all endpoint routers
 api_router.include_router(auth.router)
-api_router.include_router(customers.router)
+if settings.DATABASE_ASYNC:
+    # Replaces the sync versions of its routes; the other customer routes stay sync
+    api_router.include_router(customers_async.router)
+    api_router.include_router(_without_operations(customers.router, _operations(customers_async.router)))
+else:
+    api_router.include_router(customers.router)
 api_router.include_router(organizations.router)
+api_router.include_router(metrics.router)
@@ -1,84 +1,186 @@
 """
 Authentication endpoints for admin login.
 """
+from typing import Optional
+
 from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 import re
 
+from app.api.deps import Principal, get_current_principal
 from app.core.database import get_db
-from app.core.security import verify_password, create_access_token, get_password_hash
+from app.core.security import (
+    PasswordHasherBusy,
+    create_access_token,
+    get_password_hash_async,
+    verify_password_async,
+)
 from app.schemas.auth import LoginRequest, TokenResponse, RegisterRequest
 from app.models.user import User
 from app.models.organization import Organization
+from app.services.user_cache import invalidate_user
 
 
 router = APIRouter(prefix='/auth', tags=['authentication'])
 
+SLUG_ALLOCATION_ATTEMPTS = 5
+
 def slugify(text: str) -> str:
     return re.sub(r'[\W_]+', '-', text.lower()).strip('-')
 
-@router.post('/register', response_model=TokenResponse)
-def register(data: RegisterRequest, db: Session = Depends(get_db)):
+def _get_user_by_email(db: Session, email: str) -> Optional[User]:
+    return db.query(User).filter(User.email == email).first()
+
+def _allocate_slug(db: Session, base_slug: str) -> str:
     """
-    Register a new business and admin user.
+    First free slug among base, base-1, base-2, ... found with one query.
+    slugify() leaves only word characters and dashes, so no LIKE escaping is needed.
     """
-    # Check if user already exists
-    existing_user = db.query(User).filter(User.email == data.email).first()
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
+    taken = set(
+        db.scalars(
+            select(Organization.slug).where(
+                or_(Organization.slug == base_slug, Organization.slug.like(f"{base_slug}-%"))
+            )
         )
-    
-    # Create organization
-    slug = slugify(data.business_name)
-    # Ensure slug is unique
-    base_slug = slug
+    )
+    if base_slug not in taken:
+        return base_slug
     counter = 1
-    while db.query(Organization).filter(Organization.slug == slug).first():
-        slug = f"{base_slug}-{counter}"
+    while f"{base_slug}-{counter}" in taken:
         counter += 1
-        
-    organization = Organization(
-        name=data.business_name,
-        slug=slug
-    )
-    db.add(organization)
-    db.commit()
-    db.refresh(organization)
-    
+    return f"{base_slug}-{counter}"
+
+def _create_organization_and_user(db: Session, data: RegisterRequest, hashed_password: str) -> Optional[User]:
+    """
+    Create the organization and its admin user in one transaction (runs in the threadpool).
+
+    A concurrent registration can take the chosen slug between the lookup
+    and the insert; the unique index rejects it and we retry with a fresh
+    lookup inside a savepoint.
+
+    Returns: The new user, or None if the email was registered concurrently
+    """
+    base_slug = slugify(data.business_name)
+    for attempt in range(SLUG_ALLOCATION_ATTEMPTS):
+        organization = Organization(
+            name=data.business_name,
+            slug=_allocate_slug(db, base_slug)
+        )
+        try:
+            with db.begin_nested():
+                db.add(organization)
+        except IntegrityError:
+            if attempt == SLUG_ALLOCATION_ATTEMPTS - 1:
+                raise
+            continue
+        break
+
     # Create admin user
     user = User(
         email=data.email,
-        hashed_password=get_password_hash(data.password),
+        hashed_password=hashed_password,
         organization_id=organization.id
     )
     db.add(user)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return None
     db.refresh(user)
+    return user
+
+def _password_pool_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in attempts in progress, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+@router.post('/register', response_model=TokenResponse)
+async def register(data: RegisterRequest, db: Session = Depends(get_db)):
+    """
+    Register a new business and admin user.
+
+    Async so that bcrypt runs on the dedicated password pool; database work
+    goes to the regular threadpool.
+    """
+    # Check if user already exists
+    existing_user = await run_in_threadpool(_get_user_by_email, db, data.email)
+    if existing_user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+
+    try:
+        hashed_password = await get_password_hash_async(data.password)
+    except PasswordHasherBusy:
+        raise _password_pool_busy()
+
+    user = await run_in_threadpool(_create_organization_and_user, db, data, hashed_password)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
     
     # Create access token
-    access_token = create_access_token(data={"sub": str(user.id), "org_id": user.organization_id})
+    access_token = create_access_token(
+        data={"sub": str(user.id), "org_id": user.organization_id, "ver": user.token_version}
+    )
     
     return TokenResponse(access_token=access_token)
 
 
 @router.post('/login', response_model=TokenResponse)
-def login(credentials: LoginRequest, db: Session = Depends(get_db)):
+async def login(credentials: LoginRequest, db: Session = Depends(get_db)):
     """
     Admin login endpoint.
+
+    Async so that bcrypt runs on the dedicated password pool; returns 503
+    when that pool is saturated.
     """
     # Find user in database
-    user = db.query(User).filter(User.email == credentials.email).first()
-    
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    user = await run_in_threadpool(_get_user_by_email, db, credentials.email)
+
+    try:
+        valid = user is not None and await verify_password_async(credentials.password, user.hashed_password)
+    except PasswordHasherBusy:
+        raise _password_pool_busy()
+
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Create access token with user ID and organization ID
-    access_token = create_access_token(data={"sub": str(user.id), "org_id": user.organization_id})
+    # Create access token with user ID, organization ID and token version
+    access_token = create_access_token(
+        data={"sub": str(user.id), "org_id": user.organization_id, "ver": user.token_version}
+    )
     
     return TokenResponse(access_token=access_token)
+
+
+@router.post('/logout-all', status_code=status.HTTP_204_NO_CONTENT)
+def logout_all(
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_current_principal)
+):
+    """
+    Revoke every token issued to the current user, on all devices.
+    Takes effect immediately on this worker and within
+    AUTH_CACHE_TTL_SECONDS on the others.
+    """
+    db.execute(
+        update(User)
+        .where(User.id == principal.user_id)
+        .values(token_version=User.token_version + 1)
+    )
+    db.commit()
+    invalidate_user(principal.user_id)
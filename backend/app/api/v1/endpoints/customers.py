@@ -3,32 +3,49 @@ Customer API endpoint
 These handle HTTP requests for customer operations.
 """
 
-from typing import List
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.api.deps import get_current_user
-from app.models.user import User
-from app.models.organization import Organization
+from app.api.deps import Principal, get_current_principal
+from app.core.config import settings
 from app.core.rate_limit import limiter
 from app.repositories.customer_repository import CustomerRepository
+from app.repositories.notification_repository import NotificationOutboxRepository
+from app.services.email_service import get_email_service
+from app.services.notification_worker import notification_worker
+from app.services.organization_cache import get_organization_by_slug
 from app.schemas.customer import (
     CustomerCreate,
     CustomerResponse,
     CustomerListResponse,
-    CustomerUpdate
+    CustomerUpdate,
+    CustomerStatsResponse,
+    DrawResponse
 )
 
 from app.schemas.notification import (
     WinnerNotification,
-    NotificationResponse
+    NotificationResponse,
+    WinnerNotificationResult,
+    BulkNotificationResponse
 )
 
 # Create router with prefix and tags for organization
 router = APIRouter(prefix='/customers', tags=['customers'])
 
+def _require_email_service() -> None:
+    """ Refuse to queue notifications nothing could send: 503 while email is not configured. """
+    try:
+        get_email_service()
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Email service not configured: {e}"
+        )
+
 @router.post('/', response_model=CustomerResponse, status_code=status.HTTP_201_CREATED)
 @limiter.limit("10/minute")  # Limit to 10 customer submissions per minute
 def create_customer(
@@ -46,8 +63,8 @@ def create_customer(
     - feedback: customer's feedback
     - organization_slug: The slug of the business
     """
-    # Find organization by slug
-    org = db.query(Organization).filter(Organization.slug == customer_data.organization_slug).first()
+    # Find organization by slug (cached, QR code bursts all hit the same slug)
+    org = get_organization_by_slug(customer_data.organization_slug)
     if not org:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -56,42 +73,78 @@ def create_customer(
 
     repo = CustomerRepository(db, organization_id=org.id)
 
-    # Check if email already exists for this organization
-    existing_customer = repo.get_by_email(customer_data.email)
-    if existing_customer:
+    # The insert skips emails already registered for this organization
+    customer = repo.create(customer_data, org_id=org.id)
+    if not customer:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered for this draw"
         )
 
-    return repo.create(customer_data, org_id=org.id)
+    return customer
 
 @router.get('/', response_model=CustomerListResponse)
 def get_customers(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_current_principal)
 ):
     """
-    Get a list of customers for the current organization.
+    Get a list of customers for the current organization, oldest first.
+
+    - skip/limit: offset pagination (kept for compatibility)
+    - cursor: keyset pagination; pass an empty value for the first page, then
+      the next_cursor of the previous response. Overrides skip when present.
     """
-    repo = CustomerRepository(db, organization_id=current_user.organization_id)
-    customers = repo.get_all(skip=skip, limit=limit)
+    repo = CustomerRepository(db, organization_id=principal.organization_id)
+
+    if cursor is not None:
+        try:
+            customers = repo.get_page_after(cursor, limit=limit)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+    else:
+        customers = repo.get_all(skip=skip, limit=limit)
     total = repo.get_count()
 
-    return CustomerListResponse(customers=customers, total=total)
+    return CustomerListResponse(
+        customers=customers,
+        total=total,
+        next_cursor=repo.next_cursor(customers, limit)
+    )
+
+@router.get('/stats', response_model=CustomerStatsResponse)
+def get_customer_stats(
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_current_principal)
+):
+    """
+    Get entry, winner and notification counts for the current organization.
+    """
+    repo = CustomerRepository(db, organization_id=principal.organization_id)
+    stats = repo.get_stats()
+
+    return CustomerStatsResponse(
+        total=stats.total_customers,
+        winners=stats.winners,
+        notified=stats.notified
+    )
 
 @router.get('/{customer_id}', response_model=CustomerResponse)
 def get_customer_by_id(
     customer_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_current_principal)
 ):
     """
     Get a customer by ID.
     """
-    repo = CustomerRepository(db, organization_id=current_user.organization_id)
+    repo = CustomerRepository(db, organization_id=principal.organization_id)
     customer = repo.get_by_id(customer_id)
     
     if not customer:
@@ -107,12 +160,12 @@ def update_customer(
     customer_id: int,
     customer_data: CustomerUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_current_principal)
 ):
     """
     Update an existing customer entry.
     """
-    repo = CustomerRepository(db, organization_id=current_user.organization_id)
+    repo = CustomerRepository(db, organization_id=principal.organization_id)
 
     # If email is being updated, check if it's already taken in this org
     if customer_data.email:
@@ -137,12 +190,12 @@ def update_customer(
 def delete_customer(
     customer_id: int, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_current_principal)
 ):
     """
     Delete a customer.
     """
-    repo = CustomerRepository(db, organization_id=current_user.organization_id)
+    repo = CustomerRepository(db, organization_id=principal.organization_id)
     success = repo.delete(customer_id)
 
     if not success:
@@ -154,14 +207,17 @@ def delete_customer(
 
 @router.get('/winner/random', response_model=CustomerResponse)
 def get_random_winner(
+    weighted: bool = False,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_current_principal)
 ):
     """
     Get a random customer who hasn't won yet from the current organization.
+
+    - weighted: pick proportionally to each customer's entries (weight)
     """
-    repo = CustomerRepository(db, organization_id=current_user.organization_id)
-    winner = repo.get_random_non_winner()
+    repo = CustomerRepository(db, organization_id=principal.organization_id)
+    winner = repo.get_random_non_winner(weighted=weighted)
 
     if not winner:
         raise HTTPException(
@@ -171,17 +227,43 @@ def get_random_winner(
     
     return winner
 
+@router.post('/draw', response_model=DrawResponse)
+def draw_winners(
+    weighted: bool = False,
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_current_principal)
+):
+    """
+    Draw winners for all of the organization's prize places in one go.
+
+    Places come from the organization's prizes; places that already have a
+    winner are skipped. Winners are picked and marked in a single transaction,
+    so concurrent draws can never pick the same customer.
+
+    - weighted: pick proportionally to each customer's entries (weight)
+    """
+    repo = CustomerRepository(db, organization_id=principal.organization_id)
+    winners = repo.draw_winners(weighted=weighted)
+
+    if not winners:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No open prize places or eligible customers found"
+        )
+
+    return DrawResponse(winners=winners)
+
 @router.post('/{customer_id}/mark-winner', response_model=CustomerResponse)
 def mark_customer_as_winner(
     customer_id: int, 
     winner_place: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_current_principal)
 ):
     """
     Mark a customer as a winner.
     """
-    repo = CustomerRepository(db, organization_id=current_user.organization_id)
+    repo = CustomerRepository(db, organization_id=principal.organization_id)
     customer = repo.mark_as_winner(customer_id, winner_place)
 
     if not customer:
@@ -193,23 +275,27 @@ def mark_customer_as_winner(
     return customer
 
 
-@router.post('/notify-winner', response_model=NotificationResponse)
+@router.post('/notify-winner', response_model=NotificationResponse, status_code=status.HTTP_202_ACCEPTED)
 def notify_winner(
     notification_data: WinnerNotification, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_current_principal)
 ):
     """
-    Send notification to winner via email.
+    Queue a notification email to a winner.
 
-    Uses Resend API to send actual email notifications to winners.
+    The email is written to the notification outbox and sent by the
+    notification worker, with retries, so the request does not wait on the
+    Resend API. The customer is flagged notified once the email is sent.
+    Queuing a winner whose email is still pending returns the same job.
 
     - customer_id: ID of the winner to notify
-    - send_immediately: Whether to send the notification now or queue it for later
+    - send_immediately: Wake the worker now instead of at its next poll
     """
     import traceback
     try:
-        repo = CustomerRepository(db, organization_id=current_user.organization_id)
+        _require_email_service()
+        repo = CustomerRepository(db, organization_id=principal.organization_id)
         customer = repo.get_by_id(notification_data.customer_id)
 
         if not customer:
@@ -224,48 +310,17 @@ def notify_winner(
                 detail="Customer is not marked as a winner"
             )
 
+        job = NotificationOutboxRepository(db).enqueue(principal.organization_id, customer.id)
         if notification_data.send_immediately:
-            # Send email via Resend
-            try:
-                from app.services.email_service import EmailService
-                email_service = EmailService()
-                success, message = email_service.send_winner_notification(customer)
-                
-                if success:
-                    from datetime import datetime
-                    customer.is_notified = True
-                    customer.notified_at = datetime.now()
-                    db.commit()
-                    db.refresh(customer)
-
-                return NotificationResponse(
-                    success=success,
-                    message=message,
-                    email_sent_to=customer.email if success else None
-                )
-            except ValueError as e:
-                # Handle missing API key
-                print(f"Email service configuration error: {str(e)}")
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Email service not configured: {str(e)}"
-                )
-            except Exception as e:
-                # Handle other email errors
-                print(f"Error in email service: {str(e)}")
-                traceback.print_exc()
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Failed to send email: {str(e)}"
-                )
-        else:
-            # Queue for later (not implemented yet)
-            message = f"Winner notification queued for {customer.email}"
-            return NotificationResponse(
-                success=True,
-                message=message,
-                email_sent_to=None
-            )
+            notification_worker.wake()
+
+        return NotificationResponse(
+            success=True,
+            message=f"Winner notification queued for {customer.email}",
+            email_sent_to=None,
+            notification_id=job.id,
+            status=job.status
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -275,3 +330,53 @@ def notify_winner(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Internal server error: {str(e)}"
         )
+
+
+@router.post('/notify-winners', response_model=BulkNotificationResponse)
+def notify_winners(
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_current_principal)
+):
+    """
+    Email the winners of the organization that have not been notified yet.
+
+    Winners are selected and queued in the notification outbox in one
+    statement. Up to NOTIFICATION_BATCH_SIZE of them are emailed within the
+    request, concurrently (NOTIFICATION_SEND_CONCURRENCY at a time, within
+    RESEND_RATE_LIMIT_PER_SECOND), and flagged notified together; the rest
+    are left to the notification worker, so the request never waits on more
+    than one batch of sends.
+    Returns the outcome per winner: sent, retrying (the worker tries again
+    later), failed, or queued (sent by the worker).
+    """
+    _require_email_service()
+    repo = NotificationOutboxRepository(db)
+    winners = repo.enqueue_winners(
+        principal.organization_id,
+        claim_limit=settings.NOTIFICATION_BATCH_SIZE,
+        lease_seconds=settings.NOTIFICATION_LEASE_SECONDS,
+        seconds_per_job=1 / settings.RESEND_RATE_LIMIT_PER_SECOND,
+    )
+    jobs = [job for _, _, job in winners if job is not None and job.status == "sending"]
+    outcomes = notification_worker.process_batch(db, repo, jobs) if jobs else {}
+    if len(jobs) < sum(job is not None for _, _, job in winners):
+        notification_worker.wake()
+
+    results = []
+    for customer_id, email, job in winners:
+        if job is None:
+            status_, message = "queued", "A notification is already queued for this winner"
+        elif job.id not in outcomes:
+            status_, message = "queued", "Queued; the notification worker sends it"
+        else:
+            status_, message = outcomes[job.id]
+        results.append(WinnerNotificationResult(
+            customer_id=customer_id,
+            email=email,
+            status=status_,
+            message=message,
+            notification_id=job.id if job else None
+        ))
+
+    counts = {name: sum(result.status == name for result in results) for name in ("sent", "retrying", "failed", "queued")}
+    return BulkNotificationResponse(**counts, results=results)
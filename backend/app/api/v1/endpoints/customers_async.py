@@ -0,0 +1,135 @@
+"""
+Async customer API endpoints (DATABASE_ASYNC, experimental and off by default).
+
+async def versions of the hottest customer routes, running on the asyncpg
+engine so they are not capped by the threadpool size. They replace the
+sync versions of the same routes (see app.api.v1); every other customer
+route keeps its sync implementation.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db
+from app.api.deps import Principal, get_current_principal_async
+from app.core.rate_limit import limiter
+from app.repositories.async_customer_repository import AsyncCustomerRepository
+from app.services.organization_cache import get_organization_by_slug_async
+from app.schemas.customer import (
+    CustomerCreate,
+    CustomerResponse,
+    CustomerListResponse,
+    CustomerStatsResponse,
+)
+
+router = APIRouter(prefix='/customers', tags=['customers'])
+
+@router.post('/', response_model=CustomerResponse, status_code=status.HTTP_201_CREATED)
+@limiter.limit("10/minute")  # Limit to 10 customer submissions per minute
+async def create_customer(
+    request: Request,
+    customer_data: CustomerCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Create a new customer entry.
+    
+    Rate limited to 10 submissions per minute to prevent spam.
+    
+    - name: customer's full name
+    - email: customer's email address (must be unique)
+    - feedback: customer's feedback
+    - organization_slug: The slug of the business
+    """
+    org = await get_organization_by_slug_async(customer_data.organization_slug)
+    if not org:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Organization not found"
+        )
+
+    repo = AsyncCustomerRepository(db, organization_id=org.id)
+
+    # The insert skips emails already registered for this organization
+    customer = await repo.create(customer_data, org_id=org.id)
+    if not customer:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered for this draw"
+        )
+
+    return customer
+
+@router.get('/', response_model=CustomerListResponse)
+async def get_customers(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_current_principal_async)
+):
+    """
+    Get a list of customers for the current organization, oldest first.
+
+    - skip/limit: offset pagination (kept for compatibility)
+    - cursor: keyset pagination; pass an empty value for the first page, then
+      the next_cursor of the previous response. Overrides skip when present.
+    """
+    repo = AsyncCustomerRepository(db, organization_id=principal.organization_id)
+
+    if cursor is not None:
+        try:
+            customers = await repo.get_page_after(cursor, limit=limit)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+    else:
+        customers = await repo.get_all(skip=skip, limit=limit)
+    total = await repo.get_count()
+
+    return CustomerListResponse(
+        customers=customers,
+        total=total,
+        next_cursor=repo.next_cursor(customers, limit)
+    )
+
+@router.get('/stats', response_model=CustomerStatsResponse)
+async def get_customer_stats(
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_current_principal_async)
+):
+    """
+    Get entry, winner and notification counts for the current organization.
+    """
+    repo = AsyncCustomerRepository(db, organization_id=principal.organization_id)
+    stats = await repo.get_stats()
+
+    return CustomerStatsResponse(
+        total=stats.total_customers,
+        winners=stats.winners,
+        notified=stats.notified
+    )
+
+@router.get('/{customer_id}', response_model=CustomerResponse)
+async def get_customer_by_id(
+    customer_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_current_principal_async)
+):
+    """
+    Get a customer by ID.
+    """
+    repo = AsyncCustomerRepository(db, organization_id=principal.organization_id)
+    customer = await repo.get_by_id(customer_id)
+    
+    if not customer:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Customer not found"
+        )
+    
+    return customer
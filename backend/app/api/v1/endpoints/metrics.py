@@ -0,0 +1,62 @@
+"""
+Operational metrics endpoints.
+
+Expose in-process counters (per worker) so caches and pools can be sized for
+event spikes. Require authentication, since they describe the whole service.
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.api.deps import Principal, get_current_principal
+from app.core.database import async_engine, engine
+from app.core.db_pool import pool_status
+from app.core.security import token_cache
+from app.services.email_service import get_email_service
+from app.services.organization_cache import organization_cache
+from app.services.user_cache import user_cache
+
+router = APIRouter(prefix='/metrics', tags=['metrics'])
+
+@router.get('/cache')
+def get_cache_metrics(
+    principal: Principal = Depends(get_current_principal)
+):
+    """
+    Get hit/miss statistics of the in-process caches of this worker.
+    """
+    return {
+        "organizations": organization_cache.stats(),
+        "users": user_cache.stats(),
+        "tokens": token_cache.stats(),
+    }
+
+@router.get('/db-pool')
+def get_db_pool_metrics(
+    principal: Principal = Depends(get_current_principal)
+):
+    """
+    Get connection pool occupancy and checkout wait times of this worker.
+
+    Sustained waits or any timeouts during an event mean DB_POOL_SIZE /
+    DB_MAX_OVERFLOW are too small for the traffic (mind the database's
+    max_connections across all workers).
+    """
+    return {
+        "sync": pool_status(engine.pool),
+        "async": pool_status(async_engine.pool) if async_engine is not None else None,
+    }
+
+@router.get('/email')
+def get_email_metrics(
+    principal: Principal = Depends(get_current_principal)
+):
+    """
+    Get the email transport of this worker and its circuit breaker state.
+
+    An open circuit means the provider failed repeatedly; sends fail fast
+    and the notification worker waits until a trial send succeeds.
+    """
+    try:
+        service = get_email_service()
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    return service.transport.stats()
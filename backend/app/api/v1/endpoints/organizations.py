@@ -1,27 +1,38 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from jinja2 import TemplateSyntaxError
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.api.deps import get_current_user, get_current_organization
-from app.models.user import User
+from app.core.http_cache import cacheable_response, make_etag
+from app.api.deps import get_current_organization, get_current_organization_snapshot
 from app.models.organization import Organization
 from app.models.prize import Prize
-from app.schemas.organization import OrganizationResponse, OrganizationUpdate
+from app.schemas.organization import OrganizationAdminResponse, OrganizationResponse, OrganizationUpdate
 from app.schemas.prize import PrizeResponse, PrizeCreate, PrizeUpdate
+from app.services.email_templates import WINNER_EMAIL_VARIABLES, check_organization_template
+from app.services.organization_cache import (
+    bump_organization_version,
+    get_organization_by_slug,
+    OrganizationSnapshot,
+    invalidate_organization,
+)
 
 router = APIRouter(prefix='/organizations', tags=['organizations'])
 
-@router.get('/me', response_model=OrganizationResponse)
+@router.get('/me', response_model=OrganizationAdminResponse)
 def get_my_organization(
-    org: Organization = Depends(get_current_organization)
+    snapshot: OrganizationSnapshot = Depends(get_current_organization_snapshot)
 ):
     """
     Get the organization details for the current authenticated user.
     """
-    return org
+    return OrganizationAdminResponse(
+        **snapshot.organization.model_dump(),
+        winner_email_template=snapshot.winner_email_template,
+    )
 
-@router.put('/me', response_model=OrganizationResponse)
+@router.put('/me', response_model=OrganizationAdminResponse)
 def update_my_organization(
     data: OrganizationUpdate,
     db: Session = Depends(get_db),
@@ -29,52 +40,84 @@ def update_my_organization(
 ):
     """
     Update the branding and details of the current organization.
+
+    winner_email_template is a Jinja2 template with the variables
+    customer_name, customer_feedback, prize_name, place_str and
+    service_provider; it is checked for syntax errors and test-rendered
+    with sample values (within the render limits) before saving.
     """
     update_data = data.model_dump(exclude_unset=True)
+    if "winner_email_template" in update_data:
+        template = update_data["winner_email_template"] or None
+        update_data["winner_email_template"] = template
+        if template:
+            try:
+                check_organization_template(template)
+            except TemplateSyntaxError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid email template (line {e.lineno}): {e.message}. "
+                           f"Available variables: {', '.join(WINNER_EMAIL_VARIABLES)}"
+                )
+            except Exception as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Email template failed to render with sample values: {type(e).__name__}: {e}"
+                )
     for field, value in update_data.items():
         setattr(org, field, value)
+    bump_organization_version(db, org.id)
     
     db.commit()
     db.refresh(org)
+    invalidate_organization(org.slug)
     return org
 
 @router.get('/public/{slug}', response_model=OrganizationResponse)
-def get_public_organization(slug: str, db: Session = Depends(get_db)):
+def get_public_organization(slug: str, request: Request, response: Response):
     """
     Get public information about an organization by its slug.
     Used by the landing page before login.
+    Cacheable: returns 304 when If-None-Match carries the current ETag.
     """
-    org = db.query(Organization).filter(Organization.slug == slug).first()
-    if not org:
+    snapshot = get_organization_by_slug(slug)
+    if not snapshot:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Organization not found"
         )
-    return org
+    not_modified = cacheable_response(request, response, make_etag("org", snapshot.id, f"v{snapshot.version}"))
+    if not_modified:
+        return not_modified
+    return snapshot.organization
 
 # Prize Endpoints (Scoped to Organizations)
 
 @router.get('/me/prizes', response_model=List[PrizeResponse])
 def get_my_prizes(
-    org: Organization = Depends(get_current_organization)
+    snapshot: OrganizationSnapshot = Depends(get_current_organization_snapshot)
 ):
     """
     Get all prizes configured for the current organization.
     """
-    return org.prizes
+    return snapshot.prizes
 
 @router.get('/public/{slug}/prizes', response_model=List[PrizeResponse])
-def get_public_prizes(slug: str, db: Session = Depends(get_db)):
+def get_public_prizes(slug: str, request: Request, response: Response):
     """
     Get public prize list for an organization.
+    Cacheable: returns 304 when If-None-Match carries the current ETag.
     """
-    org = db.query(Organization).filter(Organization.slug == slug).first()
-    if not org:
+    snapshot = get_organization_by_slug(slug)
+    if not snapshot:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Organization not found"
         )
-    return org.prizes
+    not_modified = cacheable_response(request, response, make_etag("prizes", snapshot.id, f"v{snapshot.version}"))
+    if not_modified:
+        return not_modified
+    return snapshot.prizes
 
 @router.post('/me/prizes', response_model=PrizeResponse)
 def create_prize(
@@ -87,8 +130,10 @@ def create_prize(
     """
     prize = Prize(**data.model_dump(), organization_id=org.id)
     db.add(prize)
+    bump_organization_version(db, org.id)
     db.commit()
     db.refresh(prize)
+    invalidate_organization(org.slug)
     return prize
 
 @router.put('/me/prizes/{prize_id}', response_model=PrizeResponse)
@@ -111,9 +156,11 @@ def update_prize(
     update_data = data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(prize, field, value)
+    bump_organization_version(db, org.id)
     
     db.commit()
     db.refresh(prize)
+    invalidate_organization(org.slug)
     return prize
 
 @router.delete('/me/prizes/{prize_id}', status_code=status.HTTP_204_NO_CONTENT)
@@ -132,4 +179,6 @@ def delete_prize(
             detail="Prize not found"
         )
     db.delete(prize)
+    bump_organization_version(db, org.id)
     db.commit()
+    invalidate_organization(org.slug)
@@ -0,0 +1,231 @@
+"""
+In-process caching utilities.
+
+Each uvicorn worker keeps its own copy, so cached values should be small,
+safe to serve slightly stale, and invalidated explicitly on writes.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger("app.cache")
+
+
+class _Flight:
+    """ A call in progress and, once done, its outcome. """
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into a single execution.
+
+    The first caller runs the function; callers arriving while it runs wait
+    for it and share its result (or exception).
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = fn()
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after a time-to-live.
+
+    With get_or_load(), concurrent misses for a key share one load
+    (single-flight), and entries younger than ttl + stale_ttl keep being
+    served while a single background refresh replaces them
+    (stale-while-revalidate).
+
+    Keeps hit/miss/eviction counters so cache effectiveness can be monitored.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, stale_ttl: float = 0.0):
+        """
+        Args:
+            maxsize: Maximum number of entries before the least recently used is evicted
+            ttl: Default time-to-live of an entry in seconds
+            stale_ttl: How long after expiry get_or_load may still serve an entry while refreshing it
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        # key -> (fresh_until, stale_until, value)
+        self._data: "OrderedDict[Hashable, tuple[float, float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._refreshing: set = set()
+        # key -> token of the load in flight for it (single-flight: at most one per key)
+        self._loading: Dict[Hashable, object] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None, count_miss: bool = True) -> Any:
+        """
+        Return the cached value for key, or default if missing or expired.
+
+        Pass count_miss=False for a fast-path check that falls back to
+        get_or_load(), which counts the miss itself.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self.misses += count_miss
+                return default
+            self.hits += 1
+            return entry[2]
+
+    def get_or_load(self, key: Hashable, loader: Callable[[Hashable], Any]) -> Any:
+        """
+        Return the cached value for key, loading it on a miss.
+
+        Args:
+            key: Cache key
+            loader: Called with the key to produce the value; None results are
+                returned but not cached
+
+        Returns: Fresh or (within stale_ttl) stale value, or the loader's result
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None and now < entry[0]:
+                self.hits += 1
+                return entry[2]
+            if entry is not None:
+                self.stale_hits += 1
+                start_refresh = key not in self._refreshing
+                self._refreshing.add(key)
+            else:
+                self.misses += 1
+
+        if entry is not None:
+            if start_refresh:
+                threading.Thread(target=self._refresh, args=(key, loader), daemon=True).start()
+            return entry[2]
+        return self._flight.do(key, lambda: self._load(key, loader))
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """ Store a value, optionally with a TTL other than the default. """
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def invalidate(self, key: Hashable) -> None:
+        """ Drop a single entry (a load of this key already in flight will not store its result). """
+        with self._lock:
+            self._data.pop(key, None)
+            self._loading.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._loading.clear()
+
+    def _store(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """ Store a value, evicting the least recently used entries (expects the lock held). """
+        fresh_until = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (fresh_until, fresh_until + self.stale_ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def _lookup(self, key: Hashable) -> Optional[tuple]:
+        """ Entry for key unless past its stale window (expects the lock held). """
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def _load(self, key: Hashable, loader: Callable[[Hashable], Any]) -> Any:
+        token = object()
+        with self._lock:
+            self._loading[key] = token
+        try:
+            value = loader(key)
+        except BaseException:
+            with self._lock:
+                if self._loading.get(key) is token:
+                    del self._loading[key]
+            raise
+        with self._lock:
+            self.loads += 1
+            # Check and store under one lock hold: a result that raced with an
+            # invalidation of this key may be outdated and is not kept
+            if self._loading.get(key) is token:
+                del self._loading[key]
+                if value is not None:
+                    self._store(key, value)
+        return value
+
+    def _refresh(self, key: Hashable, loader: Callable[[Hashable], Any]) -> None:
+        """ Background refresh of a stale entry; at most one runs per key. """
+        try:
+            self._flight.do(key, lambda: self._load(key, loader))
+        except Exception as e:
+            # Keep serving the stale entry; the next stale hit retries
+            logger.warning(f"Background cache refresh failed for {key!r}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def stats(self) -> dict:
+        """ Hit/miss counters and current size. """
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "loads": self.loads,
+                "coalesced_loads": self._flight.coalesced,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "stale_ttl_seconds": self.stale_ttl,
+            }
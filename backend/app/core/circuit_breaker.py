@@ -0,0 +1,106 @@
+"""
+Circuit breaker for third-party APIs.
+
+When a provider is down, every call waits for its timeout before failing.
+After `failure_threshold` consecutive failures the breaker opens and calls
+fail immediately with CircuitOpenError for `reset_timeout` seconds; then one
+trial call is let through (half open) and its outcome closes the breaker or
+opens it again.
+"""
+import threading
+import time
+
+
+class CircuitOpenError(Exception):
+    """ Raised instead of calling a provider while its breaker is open. """
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"{name} circuit is open, retry in {retry_after:.1f}s")
+
+
+class CircuitBreaker:
+    """
+    Thread-safe consecutive-failure circuit breaker: closed, open or half open.
+
+    Callers run allow() before a call and report it with record_success() or
+    record_failure(). Only failures that say the provider is unhealthy
+    (network errors, timeouts, 5xx) should be recorded as failures.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_started = 0.0
+        self._times_opened = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> None:
+        """
+        Let one call through or refuse it.
+
+        Raises: CircuitOpenError while open, or while the half-open trial call is in flight
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._state == self.OPEN:
+                remaining = self._opened_at + self.reset_timeout - now
+                if remaining > 0:
+                    self._rejected += 1
+                    raise CircuitOpenError(self.name, remaining)
+                self._state = self.HALF_OPEN
+                self._trial_started = now
+            elif self._state == self.HALF_OPEN:
+                # A trial that never reported back (e.g. its thread died) does not block forever
+                remaining = self._trial_started + self.reset_timeout - now
+                if remaining > 0:
+                    self._rejected += 1
+                    raise CircuitOpenError(self.name, remaining)
+                self._trial_started = now
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._times_opened += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def retry_after(self) -> float:
+        """ Seconds until a call would be let through again (0 when closed). """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return 0.0
+            started = self._opened_at if self._state == self.OPEN else self._trial_started
+            return max(0.0, started + self.reset_timeout - time.monotonic())
+
+    def snapshot(self) -> dict:
+        """ State and counters, for the metrics endpoint. """
+        with self._lock:
+            state = self._state
+            failures = self._failures
+            times_opened = self._times_opened
+            rejected = self._rejected
+        return {
+            "state": state,
+            "consecutive_failures": failures,
+            "times_opened": times_opened,
+            "rejected_calls": rejected,
+            "retry_after_seconds": round(self.retry_after(), 1),
+        }
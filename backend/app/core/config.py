@@ -1,5 +1,9 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from os import getenv
+from pathlib import Path
+
+# backend/; local state such as the rate limit database goes in its var/ directory
+BACKEND_DIR = Path(__file__).resolve().parents[2]
 
 class Settings(BaseSettings):
     """
@@ -9,6 +13,19 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str
+    # Experimental: serve 4 customer endpoints (create, list, stats, get) with asyncpg instead of the
+    # threadpool; the rest stay sync. Keep off unless benchmarks.bench_async_endpoints shows a gain
+    DATABASE_ASYNC: bool = False
+    DB_POOL_SIZE: int = 10  # Connections kept open per engine and worker process
+    DB_MAX_OVERFLOW: int = 20  # Extra connections opened during spikes, closed when returned
+    DB_POOL_TIMEOUT_SECONDS: int = 10  # Wait for a free connection before failing the request
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Replace connections older than this (proxies drop idle ones)
+    DB_ECHO: bool = False  # Log every SQL statement
+    SLOW_QUERY_MS: int = 100  # Log statements slower than this, with their route
+    LOG_REQUESTS: bool = False  # One JSON log line per request with its query count and DB time
+    # Server-Timing header with DB time and statement count; exposes internals, so off outside debugging
+    SERVER_TIMING_ENABLED: bool = False
+    LOG_LEVEL: str = "INFO"
 
     # Application
     ENVIRONMENT: str = "production"
@@ -19,12 +36,58 @@ class Settings(BaseSettings):
     RESEND_API_KEY: str = ""  # Set via environment variable
     FROM_EMAIL: str = "noreply@notifications.luck-of-a-draw.com"
     FROM_NAME: str = "Luck of a Draw"
+    RESEND_API_URL: str = "https://api.resend.com"  # Point at a stub server to test the worker locally
+    RESEND_RATE_LIMIT_PER_SECOND: float = 2.0  # Requests per second allowed for the API key (Resend default: 2)
+    RESEND_RATE_LIMIT_BURST: int = 2
+    EMAIL_TRANSPORT: str = "resend"  # "resend", or "fake" to load-test notifications without sending anything
+    EMAIL_HTTP_CONNECT_TIMEOUT_SECONDS: float = 5.0  # Opening a connection to the email API
+    EMAIL_HTTP_TIMEOUT_SECONDS: float = 15.0  # Each read/write on it
+    EMAIL_HTTP_MAX_CONNECTIONS: int = 10  # Pooled keep-alive connections per process (>= NOTIFICATION_SEND_CONCURRENCY)
+    EMAIL_CIRCUIT_FAILURE_THRESHOLD: int = 5  # Consecutive network errors/5xx before sends fail fast
+    EMAIL_CIRCUIT_RESET_SECONDS: float = 30.0  # Fail fast this long, then let one trial send through
+    EMAIL_FAKE_LATENCY_MS: float = 50.0  # Simulated provider latency of the fake transport
+    EMAIL_FAKE_FAIL_RATE: float = 0.0  # Fraction of fake sends answered with a retryable 500
+    EMAIL_TEMPLATE_RENDER_SECONDS: float = 1.0  # Time limit for rendering an organization's own email template
+    EMAIL_TEMPLATE_MAX_CHARS: int = 500_000  # Size limit of the HTML it renders
+
+    # Notification outbox worker
+    NOTIFICATION_WORKER_IN_PROCESS: bool = True  # Run the worker inside the API process (else: python -m app.services.notification_worker)
+    NOTIFICATION_POLL_INTERVAL_SECONDS: float = 2.0  # Idle wait between outbox polls
+    NOTIFICATION_BATCH_SIZE: int = 20  # Jobs claimed per poll, and winners emailed within a notify-winners request
+    NOTIFICATION_SEND_CONCURRENCY: int = 4  # Emails in flight at once per process (worker and notify-winners)
+    NOTIFICATION_LEASE_SECONDS: int = 60  # A claimed job is retried by another worker after this
+    NOTIFICATION_MAX_ATTEMPTS: int = 6  # Attempts before a job is marked failed
+    NOTIFICATION_BACKOFF_BASE_SECONDS: float = 5.0  # Retry delay: base * 2^(attempt-1), with jitter
+    NOTIFICATION_BACKOFF_MAX_SECONDS: float = 900.0
 
     # Authentication & Security
     JWT_SECRET_KEY: str = "your-secret-key-change-this-in-production-use-openssl-rand-hex-32"
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION_MINUTES: int = 1440  # 24 hours
     ADMIN_PASSWORD_HASH: str = ""  # Hashed admin password (set via environment variable)
+    BCRYPT_ROUNDS: int = 12  # Cost factor for new hashes, calibrate with generate_password_hash.py --calibrate
+    PASSWORD_HASH_WORKERS: int = 2  # Threads dedicated to bcrypt
+    PASSWORD_HASH_MAX_PENDING: int = 16  # Queued hashes beyond the workers before answering 503
+
+    # Draw
+    DRAW_POOL_MAX_AGE_SECONDS: int = 300  # Full rebuild interval for the in-memory eligible pools
+
+    # Caching (per worker process)
+    ORG_CACHE_TTL_SECONDS: int = 60  # Public organization/prize snapshots by slug
+    ORG_CACHE_STALE_SECONDS: int = 300  # Serve expired snapshots this long while refreshing
+    ORG_CACHE_MAX_ENTRIES: int = 1024
+    AUTH_CACHE_TTL_SECONDS: int = 30  # User snapshots checked against token claims (revocation delay)
+    AUTH_CACHE_MAX_ENTRIES: int = 4096
+    TOKEN_CACHE_MAX_ENTRIES: int = 4096  # Verified JWT claims, each kept until the token expires
+
+    # HTTP caching of public organization/prize responses (browsers and CDNs)
+    PUBLIC_CACHE_MAX_AGE_SECONDS: int = 60
+    PUBLIC_CACHE_STALE_WHILE_REVALIDATE_SECONDS: int = 300
+
+    # Rate limiting
+    RATE_LIMIT_ENABLED: bool = True  # Disable only for load tests
+    # Shared by the workers of one host; redis://host:6379 across hosts (pip install redis), memory:// per process
+    RATE_LIMIT_STORAGE_URI: str = f"sqlite:///{BACKEND_DIR / 'var' / 'rate-limit.db'}"
 
     # CORS - Frontend URLs allowed to access the API
     # For production, you can pass comma-separated URLs as env var
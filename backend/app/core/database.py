@@ -1,15 +1,31 @@
+import anyio
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.core.db_pool import TimedAsyncAdaptedQueuePool, TimedQueuePool
+from app.core.query_stats import instrument_engine
+
+# Pool sizing and SQL logging, shared by the sync and async engines
+POOL_OPTIONS = dict(
+    pool_pre_ping=True, # Verifies connections before using them
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    echo=settings.DB_ECHO, # Log SQL queries (development only, it is expensive)
+)
 
 # Create the SQLAlchemy engine
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping= True, # Verifies connections before using them
-    echo=settings.ENVIRONMENT == "production" # Log SQL queries in development
+    poolclass=TimedQueuePool,
+    **POOL_OPTIONS
     )
+instrument_engine(engine)
 
 # Factory Design Pattern
 
@@ -21,13 +37,22 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+# Closing a session returns its connection to the pool. FastAPI would run the
+# teardown of a sync dependency on the shared threadpool, where under load it
+# queues behind requests that are themselves waiting for a connection, and
+# the pool deadlocks until pool_timeout. Closing gets its own thread limiter.
+_session_close_limiter = anyio.CapacityLimiter(settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+
+
 # Dependency Injection Pattern
-def get_db():
+async def get_db():
     """ 
     Dependency function to get database session.
     
     This is used with FastAPI's dependency injection system.
     It yields a session and ensures it's closed after use.
+    Endpoints using it can still be plain def; the session is only created
+    and closed from the event loop.
 
     Usage in endpoints:
         def read_times(db: Session = Depends(get_db)):
@@ -37,4 +62,44 @@ def get_db():
     try:
         yield db
     finally: 
-        db.close()
+        await anyio.to_thread.run_sync(db.close, limiter=_session_close_limiter)
+
+
+# Async engine (DATABASE_ASYNC)
+# Same database through asyncpg, for endpoints declared with async def.
+# Only created when enabled, so asyncpg stays an optional dependency.
+
+def async_database_url(url: str) -> str:
+    """ Point a postgresql:// (or postgresql+psycopg2://) URL at the asyncpg driver. """
+    parsed = make_url(url).set(drivername="postgresql+asyncpg")
+    # asyncpg takes "ssl" instead of libpq's "sslmode"
+    if "sslmode" in parsed.query:
+        query = dict(parsed.query)
+        query["ssl"] = query.pop("sslmode")
+        parsed = parsed.set(query=query)
+    return parsed.render_as_string(hide_password=False)
+
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.DATABASE_ASYNC:
+    async_engine = create_async_engine(
+        async_database_url(settings.DATABASE_URL),
+        poolclass=TimedAsyncAdaptedQueuePool,
+        **POOL_OPTIONS
+    )
+    instrument_engine(async_engine.sync_engine)
+    # expire_on_commit=False: attributes cannot lazy-load after commit in async code
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+
+async def get_async_db():
+    """
+    Async counterpart of get_db, yielding an AsyncSession.
+
+    Usage in endpoints:
+        async def read_times(db: AsyncSession = Depends(get_async_db)):
+            result = await db.scalars(...)
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
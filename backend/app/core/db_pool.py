@@ -0,0 +1,111 @@
+"""
+Connection pools that measure how long checkouts wait.
+
+SQLAlchemy reports the current pool occupancy (size, checked out, idle,
+overflow) but not how long requests queue for a connection. These pool
+classes time every checkout, so the pool can be sized from what happens
+during an event spike rather than guessed.
+"""
+import logging
+import statistics
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger("app.db")
+
+
+class CheckoutStats:
+    """ Thread-safe counters and recent wait times of pool checkouts. """
+
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=window)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, waited: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            self._recent.append(waited)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            recent = sorted(self._recent)
+            checkouts, timeouts = self.checkouts, self.timeouts
+            total_wait, max_wait = self.total_wait, self.max_wait
+
+        def percentile(fraction: float) -> float:
+            if not recent:
+                return 0.0
+            return recent[min(len(recent) - 1, int(len(recent) * fraction))] * 1000
+
+        return {
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "wait_ms_mean": round(total_wait / checkouts * 1000, 3) if checkouts else 0.0,
+            "wait_ms_max": round(max_wait * 1000, 3),
+            # Over the last `window` checkouts
+            "wait_ms_p50": round(statistics.median(recent) * 1000, 3) if recent else 0.0,
+            "wait_ms_p95": round(percentile(0.95), 3),
+            "wait_ms_p99": round(percentile(0.99), 3),
+        }
+
+
+class _TimedCheckoutMixin:
+    """ Times Pool.connect(): queueing for a free slot, plus connecting or pre-pinging. """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_stats = CheckoutStats()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.checkout_stats.record_timeout()
+            logger.warning(f"Database pool exhausted after {time.perf_counter() - start:.1f}s: {self.status()}")
+            raise
+        self.checkout_stats.record(time.perf_counter() - start)
+        return connection
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    """ QueuePool for the sync engine, with checkout wait statistics. """
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    """ AsyncAdaptedQueuePool for the asyncpg engine, with checkout wait statistics. """
+
+
+def pool_status(pool) -> dict:
+    """
+    Occupancy and checkout wait statistics of a pool.
+
+    Returns: size, checked_out, idle and overflow connections, plus the
+        counters of CheckoutStats when the pool records them
+    """
+    status = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # QueuePool counts overflow from -size; only connections beyond size matter here
+        "overflow": max(pool.overflow(), 0),
+        "timeout_seconds": pool.timeout(),
+    }
+    stats = getattr(pool, "checkout_stats", None)
+    if stats is not None:
+        status.update(stats.snapshot())
+    return status
@@ -0,0 +1,55 @@
+"""
+HTTP caching helpers: ETags, conditional requests and Cache-Control.
+
+Used by public, unauthenticated endpoints whose responses are the same for
+every visitor, so browsers and CDNs can store them and revalidate cheaply.
+"""
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+from app.core.config import settings
+
+
+def make_etag(*parts) -> str:
+    """ Build a strong ETag from version parts, e.g. make_etag("org", 3, "v7") -> '"org-3-v7"'. """
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag.
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def public_cache_control() -> str:
+    return (
+        f"public, max-age={settings.PUBLIC_CACHE_MAX_AGE_SECONDS}, "
+        f"stale-while-revalidate={settings.PUBLIC_CACHE_STALE_WHILE_REVALIDATE_SECONDS}"
+    )
+
+
+def cacheable_response(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Set ETag and Cache-Control on a public response.
+
+    Args:
+        request: Incoming request, checked for If-None-Match
+        response: Response the endpoint is about to return
+        etag: Current ETag of the resource
+
+    Returns: A 304 Not Modified response if the client already has this
+        version, None if the endpoint should return the full body
+    """
+    headers = {"ETag": etag, "Cache-Control": public_cache_control()}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
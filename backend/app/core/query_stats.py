@@ -0,0 +1,106 @@
+"""
+Per-request SQL instrumentation.
+
+Engine event hooks count the statements a request sends and the time spent
+in the database. The numbers are kept in a context variable, which FastAPI
+carries into the threadpool and background tasks, so sync and async
+endpoints are covered alike. Statements slower than SLOW_QUERY_MS are logged
+with the route that issued them.
+"""
+import json
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.sql")
+
+
+@dataclass
+class RequestQueryStats:
+    """ SQL statements and database time of one request. """
+    method: str
+    path: str
+    scope: dict = field(repr=False)
+    statements: int = 0
+    db_seconds: float = 0.0
+
+    @property
+    def route(self) -> str:
+        """ Route template once routing has happened (e.g. /customers/{customer_id}), else the raw path. """
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or self.path
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def start_request(scope: dict) -> RequestQueryStats:
+    """ Begin collecting statistics for the request described by an ASGI scope. """
+    stats = RequestQueryStats(method=scope.get("method", ""), path=scope.get("path", ""), scope=scope)
+    _current.set(stats)
+    return stats
+
+
+def current_stats() -> Optional[RequestQueryStats]:
+    return _current.get()
+
+
+def server_timing(stats: RequestQueryStats, total_seconds: float) -> str:
+    """ Server-Timing header value with database and total time in milliseconds. """
+    return (
+        f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.statements} queries", '
+        f"total;dur={total_seconds * 1000:.2f}"
+    )
+
+
+def log_request(stats: RequestQueryStats, status_code: int, total_seconds: float) -> None:
+    """ One structured (JSON) log line per request. """
+    logger.info(json.dumps({
+        "event": "request",
+        "method": stats.method,
+        "route": stats.route,
+        "status": status_code,
+        "duration_ms": round(total_seconds * 1000, 2),
+        "db_statements": stats.statements,
+        "db_ms": round(stats.db_seconds * 1000, 2),
+    }))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+
+    if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        logger.warning(json.dumps({
+            "event": "slow_query",
+            "route": f"{stats.method} {stats.route}" if stats else None,
+            "duration_ms": round(elapsed * 1000, 2),
+            "statement": " ".join(statement.split())[:500],
+        }))
+
+
+def _handle_error(exception_context):
+    # Keep the timing stack balanced when a statement fails
+    starts = exception_context.connection.info.get("query_start") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(engine) -> None:
+    """ Attach the timing hooks to an Engine (for an AsyncEngine pass its sync_engine). """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -2,10 +2,24 @@
 Rate limiting configuration using SlowAPI.
 
 Prevents abuse by limiting the number of requests per time period.
+Counters live in RATE_LIMIT_STORAGE_URI, shared by all worker processes
+(see app.core.rate_limit_storage), and are counted over a sliding window so
+a burst straddling two fixed windows cannot get twice the limit.
 """
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
+from app.core.config import settings
+# Registers the sqlite:// storage scheme
+from app.core import rate_limit_storage  # noqa: F401
+
 
 # Initialize rate limiter with remote address as the key
-limiter = Limiter(key_func=get_remote_address)
+limiter = Limiter(
+    key_func=get_remote_address,
+    enabled=settings.RATE_LIMIT_ENABLED,
+    storage_uri=settings.RATE_LIMIT_STORAGE_URI,
+    strategy="sliding-window-counter",
+    # If the storage is unreachable, serve the request unlimited rather than failing it
+    swallow_errors=True,
+)
@@ -0,0 +1,203 @@
+"""
+SQLite rate limit storage, shared by every worker process on the host.
+
+slowapi keeps its counters in the storage named by RATE_LIMIT_STORAGE_URI
+(see the `limits` library). Its default, memory://, is per process: with
+several uvicorn workers each keeps its own counters and "10/minute" really
+allows 10 per worker. This registers a sqlite:// storage: one database file
+in WAL mode, so all processes on the host count together without a server.
+Across hosts, use redis:// instead (needs the redis package).
+
+Only the sliding window counter strategy (and fixed window) is supported.
+Each limit key is one row holding the current and previous window counts;
+a hit rolls the windows forward, checks the weighted count and increments
+in a single UPSERT, so the cost per request is constant and concurrent
+processes cannot both take the last slot.
+
+    sqlite:////srv/app/var/rate-limit.db   absolute path (as in SQLAlchemy URLs)
+    sqlite:///rate-limit.db                relative to the working directory
+"""
+import os
+import sqlite3
+import threading
+import time
+import urllib.parse
+
+from limits.storage import SlidingWindowCounterSupport, Storage
+
+# Expired rows are deleted every this many hits of a process
+_PURGE_EVERY = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_limit_windows (
+    key TEXT PRIMARY KEY,
+    window INTEGER NOT NULL,
+    current INTEGER NOT NULL,
+    previous INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rate_limit_counters (
+    key TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Roll the row to window :window (the previous window's count survives one
+# window), then add :amount only if the weighted count leaves room for it.
+# In DO UPDATE, column names refer to the row before the update.
+_ACQUIRE = """
+INSERT INTO rate_limit_windows (key, window, current, previous, expires_at)
+VALUES (:key, :window, :amount, 0, :expires_at)
+ON CONFLICT (key) DO UPDATE SET
+    previous = CASE window WHEN :window THEN previous WHEN :window - 1 THEN current ELSE 0 END,
+    current = CASE window WHEN :window THEN current ELSE 0 END + :amount,
+    window = :window,
+    expires_at = :expires_at
+WHERE CAST(
+    CASE window WHEN :window THEN previous WHEN :window - 1 THEN current ELSE 0 END * :weight
+    + CASE window WHEN :window THEN current ELSE 0 END
+AS INTEGER) + :amount <= :limit
+RETURNING current
+"""
+
+
+class SQLiteStorage(Storage, SlidingWindowCounterSupport):
+    """
+    Rate limit storage in a SQLite database (WAL), for processes on one host.
+
+    Connections are per thread and per process (opened lazily, so forked
+    workers never share one).
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, timeout: float = 5.0, **options):
+        parsed = urllib.parse.urlparse(uri)
+        # Not :memory:, which would be a separate database per connection
+        if parsed.netloc or len(parsed.path) < 2:
+            raise ValueError(f"Expected sqlite:///<database file>, got {uri}")
+        self.path = urllib.parse.unquote(parsed.path[1:])
+        self.timeout = timeout
+        self._local = threading.local()
+        self._hits = 0
+        self._hits_lock = threading.Lock()
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self._connection()
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            # Only the app's user may read or change the counters
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), mode=0o700, exist_ok=True)
+            # Autocommit: every statement below is a transaction of its own
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            # Counters may lose the last hits on power loss, never get corrupted
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _purge(self, now: float) -> None:
+        with self._hits_lock:
+            self._hits += 1
+            due = self._hits % _PURGE_EVERY == 0
+        if due:
+            connection = self._connection()
+            connection.execute("DELETE FROM rate_limit_windows WHERE expires_at <= ?", (now,))
+            connection.execute("DELETE FROM rate_limit_counters WHERE expires_at <= ?", (now,))
+
+    # Sliding window counter
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        now = time.time()
+        window = int(now / expiry)
+        row = self._connection().execute(
+            _ACQUIRE,
+            {
+                "key": key,
+                "window": window,
+                "amount": amount,
+                "limit": limit,
+                # Share of the previous window still inside the sliding window
+                "weight": 1 - (now / expiry) % 1,
+                "expires_at": (window + 2) * expiry,
+            },
+        ).fetchone()
+        self._purge(now)
+        return row is not None
+
+    def get_sliding_window(self, key: str, expiry: int) -> tuple[int, float, int, float]:
+        now = time.time()
+        window = int(now / expiry)
+        row = self._connection().execute(
+            "SELECT window, current, previous FROM rate_limit_windows WHERE key = ?", (key,)
+        ).fetchone()
+        previous_count, current_count = 0, 0
+        if row is not None:
+            if row[0] == window:
+                current_count, previous_count = row[1], row[2]
+            elif row[0] == window - 1:
+                previous_count = row[1]
+        previous_ttl = (1 - (now / expiry) % 1) * expiry if previous_count else 0.0
+        current_ttl = (1 - (now / expiry) % 1) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        self.clear(key)
+
+    # Fixed window
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        row = self._connection().execute(
+            """
+            INSERT INTO rate_limit_counters (key, count, expires_at) VALUES (:key, :amount, :now + :expiry)
+            ON CONFLICT (key) DO UPDATE SET
+                count = CASE WHEN expires_at > :now THEN count + :amount ELSE :amount END,
+                expires_at = CASE WHEN expires_at > :now THEN expires_at ELSE :now + :expiry END
+            RETURNING count
+            """,
+            {"key": key, "amount": amount, "now": now, "expiry": expiry},
+        ).fetchone()
+        self._purge(now)
+        return row[0]
+
+    def get(self, key: str) -> int:
+        row = self._connection().execute(
+            "SELECT count FROM rate_limit_counters WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key: str) -> float:
+        now = time.time()
+        row = self._connection().execute(
+            "SELECT expires_at FROM rate_limit_counters WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        return row[0] if row else now
+
+    def clear(self, key: str) -> None:
+        connection = self._connection()
+        connection.execute("DELETE FROM rate_limit_windows WHERE key = ?", (key,))
+        connection.execute("DELETE FROM rate_limit_counters WHERE key = ?", (key,))
+
+    def check(self) -> bool:
+        try:
+            self._connection().execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int:
+        connection = self._connection()
+        removed = connection.execute("DELETE FROM rate_limit_windows").rowcount
+        removed += connection.execute("DELETE FROM rate_limit_counters").rowcount
+        return removed
@@ -1,17 +1,37 @@
 """
 Security utilities for password hashing and JWT token handling.
 """
+import asyncio
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 
 # Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+# bcrypt runs on its own small pool so a burst of logins cannot occupy the
+# threadpool every sync endpoint shares. Jobs beyond the workers plus
+# PASSWORD_HASH_MAX_PENDING are refused instead of queued without bound.
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+_password_slots = threading.BoundedSemaphore(
+    settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_PENDING
+)
+
+# Verified token claims keyed by token digest, each kept until the token expires
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_MAX_ENTRIES)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -41,6 +61,44 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHasherBusy(Exception):
+    """ Raised when the password hashing pool has no free slot. """
+
+
+async def _run_password_job(fn, *args):
+    """ Run a bcrypt call on the password pool without blocking the event loop. """
+    if not _password_slots.acquire(blocking=False):
+        raise PasswordHasherBusy()
+    try:
+        future = _password_executor.submit(fn, *args)
+    except BaseException:
+        _password_slots.release()
+        raise
+    # Release when the job finishes, even if the awaiting request is cancelled
+    future.add_done_callback(lambda _: _password_slots.release())
+    return await asyncio.wrap_future(future)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    verify_password() on the dedicated password pool.
+
+    Raises:
+        PasswordHasherBusy: If too many hashes are already running or queued
+    """
+    return await _run_password_job(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    get_password_hash() on the dedicated password pool.
+
+    Raises:
+        PasswordHasherBusy: If too many hashes are already running or queued
+    """
+    return await _run_password_job(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token.
@@ -68,6 +126,10 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 def decode_access_token(token: str) -> Optional[dict]:
     """
     Decode and validate a JWT access token.
+
+    Verified claims are cached under the token's SHA-256 digest until its
+    exp, so a dashboard polling with the same token pays for the signature
+    check once. Only valid tokens are cached.
     
     Args:
         token: JWT token string
@@ -75,8 +137,19 @@ def decode_access_token(token: str) -> Optional[dict]:
     Returns:
         Decoded token data if valid, None otherwise
     """
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return dict(payload)
+
     try:
         payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        return payload
     except JWTError:
         return None
+
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        remaining = exp - time.time()
+        if remaining > 0:
+            token_cache.set(key, dict(payload), ttl=remaining)
+    return payload
@@ -0,0 +1,62 @@
+"""
+Outbound request throttling.
+
+Email and other third-party APIs limit how fast one account may call them
+(Resend allows 2 requests per second by default). A TokenBucket per provider,
+shared by every thread of the process, keeps concurrent senders under that
+limit instead of collecting 429 answers and retrying.
+"""
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, at most `burst` saved up.
+
+    acquire() reserves a token even when none is available yet and sleeps
+    until it is due, so waiting callers are served in arrival order and the
+    long-run rate never exceeds `rate`.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, timeout: Optional[float] = None) -> Optional[float]:
+        """
+        Take one token without sleeping (for callers that wait their own way,
+        e.g. asyncio.sleep).
+
+        Returns: Seconds to wait before using the token, or None without
+            taking one if that would exceed timeout
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = (1 - self._tokens) / self.rate if self._tokens < 1 else 0.0
+            if timeout is not None and wait > timeout:
+                return None
+            # May go negative: a reservation later callers queue behind
+            self._tokens -= 1
+        return wait
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Take one token, sleeping until it is due.
+
+        Returns: False without taking a token if the wait would exceed timeout
+        """
+        wait = self.reserve(timeout)
+        if wait is None:
+            return False
+        if wait:
+            time.sleep(wait)
+        return True
@@ -1,3 +1,7 @@
+import logging
+from contextlib import asynccontextmanager
+
+import anyio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import _rate_limit_exceeded_handler
@@ -5,14 +9,40 @@ from slowapi.errors import RateLimitExceeded
 
 from app.api.v1 import api_router
 from app.core.config import settings
+from app.core.database import async_engine
 from app.core.rate_limit import limiter
+from app.middleware.query_timing import QueryTimingMiddleware
 from app.middleware.security import SecurityHeadersMiddleware
+from app.services.email_service import close_email_service, get_email_service
+from app.services.notification_worker import notification_worker
+
+# Application loggers (app.*); uvicorn configures its own
+logging.basicConfig(level=settings.LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+logger = logging.getLogger("app")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """ Startup/shutdown hook: open the email transport, run the notification worker, release pooled connections on shutdown. """
+    try:
+        get_email_service()
+    except ValueError as e:
+        # The API still serves everything else; notify endpoints answer 503 and the worker claims nothing
+        logger.warning(f"Email sending disabled: {e}")
+    if settings.NOTIFICATION_WORKER_IN_PROCESS:
+        notification_worker.start()
+    yield
+    if settings.NOTIFICATION_WORKER_IN_PROCESS:
+        await anyio.to_thread.run_sync(notification_worker.stop)
+    await close_email_service()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 # Create FastAPI application instance
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
     redirect_slashes=False,
+    lifespan=lifespan,
 )
 
 # Add rate limiting
@@ -22,6 +52,9 @@ app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 # Add security headers middleware
 app.add_middleware(SecurityHeadersMiddleware)
 
+# Count SQL statements and database time per request (slow query log, optional Server-Timing header and request log)
+app.add_middleware(QueryTimingMiddleware)
+
 # Configure CORS middleware
 # This should be added LAST to be the outermost middleware for handling preflights
 app.add_middleware(
@@ -0,0 +1,56 @@
+"""
+Query timing middleware for FastAPI.
+
+Collects the SQL statement count and database time of every request (see
+app.core.query_stats). With SERVER_TIMING_ENABLED it reports them in a
+Server-Timing header, and with LOG_REQUESTS it logs one structured line per
+request. Both are off by default: the header tells every client how much
+database work an endpoint does.
+
+Plain ASGI middleware: the header is added to http.response.start, the log
+line is written once the response has been sent.
+"""
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.query_stats import log_request, server_timing, start_request
+
+
+class QueryTimingMiddleware:
+    """
+    Middleware to measure database work per request.
+
+    Headers added (SERVER_TIMING_ENABLED only):
+    - Server-Timing: db (duration and statement count) and total, shown in
+      the browser's network panel. Measured until the response starts.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = start_request(scope)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.SERVER_TIMING_ENABLED:
+                    headers = MutableHeaders(scope=message)
+                    headers["Server-Timing"] = server_timing(stats, time.perf_counter() - start)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            if settings.LOG_REQUESTS:
+                log_request(stats, status_code, time.perf_counter() - start)
@@ -2,13 +2,16 @@
 Security headers middleware for FastAPI.
 
 Adds security-related HTTP headers to all responses.
+
+Written as a plain ASGI middleware rather than a BaseHTTPMiddleware: it only
+touches the http.response.start message, so the response body (streamed or
+not) passes through untouched and no extra task is spawned per request.
 """
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+class SecurityHeadersMiddleware:
     """
     Middleware to add security headers to responses.
     
@@ -19,27 +22,33 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     - Strict-Transport-Security: Enforces HTTPS
     - Referrer-Policy: Controls referrer information
     """
-    
-    async def dispatch(self, request: Request, call_next):
-        try:
-            response: Response = await call_next(request)
-            
-            # Prevent MIME type sniffing
-            response.headers["X-Content-Type-Options"] = "nosniff"
-            
-            # Prevent clickjacking
-            response.headers["X-Frame-Options"] = "DENY"
-            
-            # Enable XSS filter
-            response.headers["X-XSS-Protection"] = "1; mode=block"
-            
-            # Enforce HTTPS (only in production)
-            response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-            
-            # Control referrer information
-            response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-            
-            return response
-        except Exception as e:
-            # If an exception occurs, let it propagate but ensure we're not blocking CORS in the outer layer
-            raise e
+
+    HEADERS = {
+        # Prevent MIME type sniffing
+        "X-Content-Type-Options": "nosniff",
+        # Prevent clickjacking
+        "X-Frame-Options": "DENY",
+        # Enable XSS filter
+        "X-XSS-Protection": "1; mode=block",
+        # Enforce HTTPS (only in production)
+        "Strict-Transport-Security": "max-age=31536000; includeSubDomains",
+        # Control referrer information
+        "Referrer-Policy": "strict-origin-when-cross-origin",
+    }
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in self.HEADERS.items():
+                    headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -6,5 +6,7 @@ from app.models.customer import Customer
 from app.models.organization import Organization
 from app.models.user import User
 from app.models.prize import Prize
+from app.models.organization_stats import OrganizationStats
+from app.models.notification_outbox import NotificationOutbox
 
-__all__ = ["Customer", "Organization", "User", "Prize"]
+__all__ = ["Customer", "Organization", "User", "Prize", "OrganizationStats", "NotificationOutbox"]
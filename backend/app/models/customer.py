@@ -4,7 +4,7 @@ This defines the 'customers' table structure in PostgreSQL.
 """
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, Integer, String, Text, ForeignKey
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String, Text, ForeignKey, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -20,10 +20,11 @@ class Customer(Base):
     id = Column(Integer, primary_key=True, index=True)
     organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=True) # Temporarily nullable for migration
     name = Column(String(225), nullable=False)
-    email = Column(String(225), nullable=False, unique=True, index=True)
+    email = Column(String(225), nullable=False) # Unique per organization, case-insensitive
     feedback = Column(Text, nullable=False)
     winner_place = Column(Integer, nullable=True)
     is_winner = Column(Boolean, default=False, nullable=False)
+    weight = Column(Integer, default=1, server_default="1", nullable=False) # Entries in weighted draws
     is_notified = Column(Boolean, default=False, nullable=False)
     notified_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -31,6 +32,17 @@ class Customer(Base):
 
     organization = relationship("Organization", back_populates="customers")
 
+    __table_args__ = (
+        # Tenant-scoped listing and keyset pagination
+        Index("ix_customers_org_created_id", organization_id, created_at, id),
+        # Draw pool loading: eligible customers of an organization by id
+        Index("ix_customers_org_eligible", organization_id, id, postgresql_where=text("is_winner = false")),
+        # Awarded places and winner notification lookups
+        Index("ix_customers_org_winners", organization_id, winner_place, postgresql_where=text("is_winner = true")),
+        # One entry per email per organization
+        Index("uq_customers_org_email", organization_id, func.lower(email), unique=True),
+    )
+
     def __repr__(self):
         """  String representation of Customer object. """
         return f"<Customer(id='{self.id}', name='{self.name}'), email='{self.email}')"
@@ -0,0 +1,47 @@
+"""
+Notification outbox database model.
+This defines the 'notification_outbox' table: emails waiting to be sent by
+the notification worker (app.services.notification_worker).
+"""
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text, text
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class NotificationOutbox(Base):
+    """
+    One email to send, with its delivery state.
+
+    status goes pending -> sending -> sent, or back to pending with a later
+    available_at after a failed attempt, or to failed once retries run out.
+    A job in sending belongs to the worker that claimed it until locked_until;
+    after that it is treated as abandoned and claimed again.
+    """
+    __tablename__ = "notification_outbox"
+
+    id = Column(Integer, primary_key=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False)
+    customer_id = Column(Integer, ForeignKey("customers.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(String(32), default="winner", server_default="winner", nullable=False)
+    status = Column(String(16), default="pending", server_default="pending", nullable=False)
+    attempts = Column(Integer, default=0, server_default="0", nullable=False)
+    available_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False) # Not sent before
+    locked_until = Column(DateTime(timezone=True), nullable=True) # Lease of the worker sending it
+    last_error = Column(Text, nullable=True)
+    provider_message_id = Column(String(255), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Worker claims: due pending jobs and expired leases
+        Index("ix_notification_outbox_due", status, available_at, postgresql_where=text("status IN ('pending', 'sending')")),
+        # At most one open job per customer and kind, so repeated requests do not send twice
+        Index(
+            "uq_notification_outbox_open", customer_id, kind, unique=True,
+            postgresql_where=text("status IN ('pending', 'sending')"),
+        ),
+    )
+
+    def __repr__(self):
+        return f"<NotificationOutbox(id='{self.id}', customer_id='{self.customer_id}', status='{self.status}')>"
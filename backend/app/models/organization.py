@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -12,6 +12,9 @@ class Organization(Base):
     slug = Column(String(255), unique=True, index=True, nullable=False)
     primary_color = Column(String(50), default="#7c3aed")
     logo_url = Column(String(500), nullable=True)
+    winner_email_template = Column(Text, nullable=True) # Own Jinja2 winner email, replaces the built-in one
+    # Bumped whenever the public data (branding or prizes) changes, used for ETags
+    version = Column(Integer, server_default="1", nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     users = relationship("User", back_populates="organization")
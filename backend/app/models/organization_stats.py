@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, ForeignKey
+
+from app.core.database import Base
+
+class OrganizationStats(Base):
+    """
+    Per-organization entry counters.
+
+    Maintained by CustomerRepository in the same transaction as each write, so
+    dashboards can read counts with a single-row lookup instead of COUNT(*).
+    """
+    __tablename__ = "organization_stats"
+
+    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"), primary_key=True)
+    total_customers = Column(Integer, default=0, server_default="0", nullable=False)
+    winners = Column(Integer, default=0, server_default="0", nullable=False)
+    notified = Column(Integer, default=0, server_default="0", nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<OrganizationStats(organization_id='{self.organization_id}', "
+            f"total_customers='{self.total_customers}', winners='{self.winners}')>"
+        )
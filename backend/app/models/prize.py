@@ -7,7 +7,7 @@ class Prize(Base):
     __tablename__ = "prizes"
     
     id = Column(Integer, primary_key=True, index=True)
-    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
+    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False, index=True)
     place = Column(Integer, nullable=False) # 1, 2, 3
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
@@ -11,6 +11,8 @@ class User(Base):
     email = Column(String(255), unique=True, index=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
     organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
+    # Copied into tokens as the "ver" claim; bumping it revokes every issued token
+    token_version = Column(Integer, server_default="0", nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     organization = relationship("Organization", back_populates="users")
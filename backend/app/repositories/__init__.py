@@ -2,6 +2,9 @@
 Repository package: Import all repositories here for easy access
 """
 
+from app.repositories.async_customer_repository import AsyncCustomerRepository
 from app.repositories.customer_repository import CustomerRepository
+from app.repositories.notification_repository import NotificationOutboxRepository
+from app.repositories.stats_repository import OrganizationStatsRepository
 
-__all__ = ["CustomerRepository"]
\ No newline at end of file
+__all__ = ["AsyncCustomerRepository", "CustomerRepository", "NotificationOutboxRepository", "OrganizationStatsRepository"]
\ No newline at end of file
@@ -0,0 +1,102 @@
+"""
+Async customer repository for the AsyncSession (asyncpg) stack.
+
+Covers the hot paths served by the async endpoints: submissions, listing,
+single lookups and counters. Statements are shared with CustomerRepository,
+so both stacks send the same SQL; only execution differs.
+"""
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.expression import func
+
+from app.models.customer import Customer
+from app.models.organization_stats import OrganizationStats
+from app.repositories.customer_repository import CustomerRepository
+from app.repositories.stats_repository import OrganizationStatsRepository
+from app.schemas.customer import CustomerCreate
+
+
+class AsyncCustomerRepository:
+    """ Customer repository for async database operations. """
+
+    def __init__(self, db: AsyncSession, organization_id: Optional[int] = None):
+        """  Initialize repository with database session 
+            Args: 
+                db: SQLAlchemy async database session
+                organization_id: ID of the organization to filter by
+        """
+        self.db = db
+        self.organization_id = organization_id
+
+    async def create(self, customer_data: CustomerCreate, org_id: Optional[int] = None) -> Optional[Customer]:
+        """ Create a new customer in the database (see CustomerRepository.create).
+
+            Returns: Created Customer model instance, or None if the email is
+                already registered in the organization
+        """
+        data = CustomerRepository._insert_values(customer_data, org_id or self.organization_id)
+        result = await self.db.scalars(
+            CustomerRepository._returning_statement(*CustomerRepository._insert_ctes(data)),
+            execution_options={"populate_existing": True},
+        )
+        db_customer = result.first()
+        if db_customer is None:
+            await self.db.rollback()
+            return None
+
+        self.db.expunge(db_customer)
+        await self.db.commit()
+        CustomerRepository._note_eligible(db_customer)
+        return db_customer
+
+    async def get_by_id(self, customer_id: int) -> Optional[Customer]:
+        """
+        Get a customer by ID.
+        Returns: Customer model instance if found, None otherwise
+        """
+        result = await self.db.scalars(
+            CustomerRepository._by_id_statement(self.organization_id, customer_id)
+        )
+        return result.first()
+
+    async def get_all(self, skip: int = 0, limit: int = 100) -> List[Customer]:
+        """ 
+        Get all customers from the database, oldest first.
+        """
+        result = await self.db.scalars(
+            CustomerRepository._offset_page_statement(self.organization_id, skip, limit)
+        )
+        return list(result)
+
+    async def get_page_after(self, cursor: Optional[str], limit: int = 100) -> List[Customer]:
+        """
+        Get the page of customers that follows a cursor, oldest first.
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        result = await self.db.scalars(
+            CustomerRepository._keyset_page_statement(self.organization_id, cursor, limit)
+        )
+        return list(result)
+
+    next_cursor = staticmethod(CustomerRepository.next_cursor)
+
+    async def get_count(self) -> int:
+        """ 
+        Get the total count of customers, from the organization's counter row.
+        """
+        if self.organization_id:
+            return (await self.get_stats()).total_customers
+        return await self.db.scalar(select(func.count()).select_from(Customer))
+
+    async def get_stats(self) -> OrganizationStats:
+        """
+        Get the entry, winner and notification counters of the organization.
+        """
+        stats = await self.db.get(OrganizationStats, self.organization_id)
+        if stats is None:
+            return OrganizationStatsRepository.empty(self.organization_id)
+        return stats
@@ -3,12 +3,24 @@ Customer repository for database operations.
 
 This implements the Repository pattern - all database operations for customers are centralized here.
 """
+import random
 from typing import List, Optional
 
+from sqlalchemy import case, delete, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import func
 
 from app.models.customer import Customer
+from app.models.organization_stats import OrganizationStats
+from app.models.prize import Prize
+from app.repositories.pagination import decode_cursor, encode_cursor
+from app.repositories.stats_repository import OrganizationStatsRepository
 from app.schemas.customer import CustomerCreate, CustomerUpdate
+from app.services.draw_sampler import eligible_pools, weighted_pools
+
+# How many stale pool entries a single draw may skip before falling back to SQL
+MAX_DRAW_PROBES = 20
 
 class CustomerRepository:
     """ Customer repository for database operations. """
@@ -22,65 +34,223 @@ class CustomerRepository:
         self.db = db
         self.organization_id = organization_id
 
-    def create(self, customer_data: CustomerCreate, org_id: Optional[int] = None) -> Customer:
+    def create(self, customer_data: CustomerCreate, org_id: Optional[int] = None) -> Optional[Customer]:
         """ Create a new customer in the database. 
+
+            Inserts with ON CONFLICT DO NOTHING on the per-organization email
+            index and bumps the organization's counter in the same statement,
+            so a submission is one round trip plus COMMIT and duplicate checks
+            are race-free.
+
             Args: 
                 customer_data: Customer data from request
                 org_id: Organization ID (override)
-            Returns: Created Customer model instance
+            Returns: Created Customer model instance, or None if the email is
+                already registered in the organization
         """
+        data = self._insert_values(customer_data, org_id or self.organization_id)
+        db_customer = self._commit_returning(*self._insert_ctes(data))
+        if db_customer:
+            self._note_eligible(db_customer)
+        return db_customer
+
+    @staticmethod
+    def _insert_values(customer_data: CustomerCreate, organization_id: Optional[int]) -> dict:
+        """ Column values for a new customer row. """
         data = customer_data.model_dump()
         # Remove organization_slug as it's not a field in the Customer model
         data.pop("organization_slug", None)
         
-        target_org_id = org_id or self.organization_id
-        if target_org_id:
-            data["organization_id"] = target_org_id
-            
-        db_customer = Customer(**data)
-        self.db.add(db_customer)
+        if organization_id:
+            data["organization_id"] = organization_id
+        return data
+
+    @staticmethod
+    def _insert_ctes(data: dict) -> tuple:
+        """
+        INSERT ... ON CONFLICT DO NOTHING RETURNING on the per-organization
+        email index, plus the counter upsert that goes with it, as CTEs.
+        """
+        customers = Customer.__table__
+        inserted = (
+            insert(customers)
+            .values(**data)
+            .on_conflict_do_nothing(
+                index_elements=[customers.c.organization_id, func.lower(customers.c.email)]
+            )
+            .returning(*customers.c)
+            .cte("inserted")
+        )
+        bump = OrganizationStatsRepository.bump_from_rows(inserted, total_customers=func.count())
+        return inserted, bump.cte("bumped")
+
+    @staticmethod
+    def _returning_statement(rows, *ctes):
+        """ ORM select loading Customer objects from a RETURNING CTE, with further CTEs attached. """
+        query = select(*[rows.c[column.name] for column in Customer.__table__.c]).add_cte(*ctes)
+        return select(Customer).from_statement(query)
+
+    def _commit_returning(self, rows, *ctes) -> Optional[Customer]:
+        """
+        Load the customer returned by a data-modifying CTE and commit.
+
+        Args:
+            rows: INSERT/UPDATE ... RETURNING CTE with the customer columns
+            ctes: Further CTEs (e.g. counter upserts) to run in the same statement
+
+        Returns: The fresh Customer, or None (after rolling back) if no row was affected
+        """
+        db_customer = self.db.scalars(
+            self._returning_statement(rows, *ctes),
+            execution_options={"populate_existing": True},
+        ).first()
+        if db_customer is None:
+            self.db.rollback()
+            return None
+
+        # Detach so the commit does not expire the row we already have from RETURNING
+        self.db.expunge(db_customer)
         self.db.commit()
-        self.db.refresh(db_customer)
         return db_customer
 
+    def _update_returning(self, customer_id: int, values: dict) -> Optional[Customer]:
+        """
+        Update one customer of the organization in a single statement.
+
+        The row is locked and its previous flags read in a CTE, so winner and
+        notification counters are adjusted exactly in the same statement.
+
+        Returns: Updated Customer if found, None otherwise
+        """
+        customers = Customer.__table__
+        criteria = [customers.c.id == customer_id]
+        if self.organization_id:
+            criteria.append(customers.c.organization_id == self.organization_id)
+
+        old = (
+            select(customers.c.id, customers.c.is_winner, customers.c.is_notified)
+            .where(*criteria)
+            .with_for_update()
+            .cte("old")
+        )
+        updated = (
+            update(customers)
+            .where(customers.c.id == old.c.id)
+            .values(**values)
+            .returning(
+                *customers.c,
+                old.c.is_winner.label("was_winner"),
+                old.c.is_notified.label("was_notified"),
+            )
+            .cte("updated")
+        )
+        bump = OrganizationStatsRepository.bump_from_rows(
+            updated,
+            winners=self._flag_delta(updated.c.is_winner, updated.c.was_winner),
+            notified=self._flag_delta(updated.c.is_notified, updated.c.was_notified),
+        )
+        return self._commit_returning(updated, bump.cte("bumped"))
+
+    @staticmethod
+    def _flag_delta(new, old):
+        """ Aggregate: rows where a flag was set minus rows where it was cleared. """
+        return func.count().filter(new & ~old) - func.count().filter(~new & old)
+
     def get_by_id(self, customer_id: int) -> Optional[Customer]:
         """
         Get a customer by ID.
         Args: customer_id: ID of the customer to retrieve
         Returns: Customer model instance if found, None otherwise
         """
-        query = self.db.query(Customer).filter(Customer.id == customer_id)
-        if self.organization_id:
-            query = query.filter(Customer.organization_id == self.organization_id)
-        return query.first()
+        return self.db.scalars(self._by_id_statement(self.organization_id, customer_id)).first()
+
+    @staticmethod
+    def _by_id_statement(organization_id: Optional[int], customer_id: int):
+        query = select(Customer).where(Customer.id == customer_id)
+        if organization_id:
+            query = query.where(Customer.organization_id == organization_id)
+        return query
 
     def get_by_email(self, email: str, org_id: Optional[int] = None) -> Optional[Customer]:
         """
         Get a customer by email address within an organization.
+        Matching is case-insensitive, like the per-organization unique index.
         """
         target_org_id = org_id or self.organization_id
-        query = self.db.query(Customer).filter(Customer.email == email)
+        query = self.db.query(Customer).filter(func.lower(Customer.email) == email.lower())
         if target_org_id:
             query = query.filter(Customer.organization_id == target_org_id)
         return query.first()
 
     def get_all(self, skip: int = 0, limit: int = 100) -> List[Customer]:
         """ 
-        Get all customers from the database.
+        Get all customers from the database, oldest first.
         """
-        query = self.db.query(Customer)
-        if self.organization_id:
-            query = query.filter(Customer.organization_id == self.organization_id)
-        return query.offset(skip).limit(limit).all()
+        return list(self.db.scalars(self._offset_page_statement(self.organization_id, skip, limit)))
+
+    def get_page_after(self, cursor: Optional[str], limit: int = 100) -> List[Customer]:
+        """
+        Get the page of customers that follows a cursor, oldest first.
+
+        Seeks on (created_at, id) instead of using OFFSET, so deep pages cost
+        the same as the first one and rows created meanwhile never shift pages.
+
+        Args:
+            cursor: Cursor from a previous page, or None/empty for the first page
+            limit: Page size
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        return list(self.db.scalars(self._keyset_page_statement(self.organization_id, cursor, limit)))
+
+    @staticmethod
+    def _offset_page_statement(organization_id: Optional[int], skip: int, limit: int):
+        query = select(Customer)
+        if organization_id:
+            query = query.where(Customer.organization_id == organization_id)
+        return query.order_by(Customer.created_at, Customer.id).offset(skip).limit(limit)
+
+    @staticmethod
+    def _keyset_page_statement(organization_id: Optional[int], cursor: Optional[str], limit: int):
+        """ Raises ValueError if the cursor is malformed. """
+        query = select(Customer)
+        if organization_id:
+            query = query.where(Customer.organization_id == organization_id)
+        if cursor:
+            created_at, customer_id = decode_cursor(cursor)
+            query = query.where(
+                tuple_(Customer.created_at, Customer.id) > tuple_(created_at, customer_id)
+            )
+        return query.order_by(Customer.created_at, Customer.id).limit(limit)
+
+    @staticmethod
+    def next_cursor(page: List[Customer], limit: int) -> Optional[str]:
+        """ Cursor for the page after `page`, or None if it was the last one. """
+        if len(page) < limit or not page:
+            return None
+        return encode_cursor(page[-1].created_at, page[-1].id)
 
     def get_count(self) -> int:
         """ 
         Get the total count of customers in the database. 
+
+        Reads the organization's counter row instead of running COUNT(*).
         """
-        query = self.db.query(Customer)
         if self.organization_id:
-            query = query.filter(Customer.organization_id == self.organization_id)
-        return query.count()
+            return self.get_stats().total_customers
+        return self.db.query(Customer).count()
+
+    def get_stats(self) -> OrganizationStats:
+        """
+        Get the entry, winner and notification counters of the organization.
+        """
+        return OrganizationStatsRepository(self.db, self.organization_id).get()
+
+    def _bump_stats(self, organization_id: Optional[int], **deltas: int) -> None:
+        """ Adjust the organization's counters inside the current transaction. """
+        if organization_id:
+            OrganizationStatsRepository(self.db, organization_id).bump(**deltas)
 
     def update(self, customer_id: int, customer_data: CustomerUpdate) -> Optional[Customer]:
         """
@@ -92,47 +262,151 @@ class CustomerRepository:
 
         Returns: Updated Customer if found, None otherwise
         """
-        db_customer = self.get_by_id(customer_id)
-        if not db_customer:
-            return None
-        
         # Update only provided fields
         update_data = customer_data.model_dump(exclude_unset=True)
-        
-        for field, value in update_data.items():
-            setattr(db_customer, field, value)
+        if not update_data:
+            return self.get_by_id(customer_id)
 
-        self.db.commit()
-        self.db.refresh(db_customer)
+        db_customer = self._update_returning(customer_id, update_data)
+        if db_customer and ("is_winner" in update_data or "weight" in update_data):
+            self._note_ineligible(db_customer.organization_id, db_customer.id)
+            if not db_customer.is_winner:
+                self._note_eligible(db_customer)
         return db_customer
 
     def delete(self, customer_id: int) -> bool:
         """
-        Delete a customer
+        Delete a customer with a single DELETE ... RETURNING.
         """
+        customers = Customer.__table__
+        criteria = [customers.c.id == customer_id]
+        if self.organization_id:
+            criteria.append(customers.c.organization_id == self.organization_id)
 
-        db_customer = self.get_by_id(customer_id)
-        if not db_customer:
+        deleted = (
+            delete(customers)
+            .where(*criteria)
+            .returning(customers.c.id, customers.c.organization_id, customers.c.is_winner, customers.c.is_notified)
+            .cte("deleted")
+        )
+        bump = OrganizationStatsRepository.bump_from_rows(
+            deleted,
+            total_customers=-func.count(),
+            winners=-func.count().filter(deleted.c.is_winner),
+            notified=-func.count().filter(deleted.c.is_notified),
+        )
+        row = self.db.execute(
+            select(deleted.c.id, deleted.c.organization_id).add_cte(bump.cte("bumped"))
+        ).first()
+        if row is None:
+            self.db.rollback()
             return False
-        
-        self.db.delete(db_customer)
+
         self.db.commit()
+        self._note_ineligible(row.organization_id, row.id)
         return True
     
-    def get_random_non_winner(self) -> Optional[Customer]:
+    def get_random_non_winner(self, weighted: bool = False) -> Optional[Customer]:
         """ 
         Get a random customer who has not won a draw yet.
-        Used for the roulette winnder selection
+        Used for the roulette winner selection.
+
+        Samples from the organization's in-memory eligible pool and confirms
+        the pick with a primary key lookup, so the cost per draw does not grow
+        with the number of entries.
+
+        Args:
+            weighted: Pick proportionally to each customer's weight instead of uniformly
+
         Returns: Customer model instance if found, None otherwise
         """
+        if not self.organization_id:
+            return self._query_random_non_winner(weighted)
+
+        pool = self._get_pool(weighted)
+        for _ in range(MAX_DRAW_PROBES):
+            customer_id = pool.sample()
+            if customer_id is None:
+                return None
+
+            customer = self._get_eligible_by_id(customer_id)
+            if customer:
+                return customer
+
+            # Won or deleted since the pool was loaded (e.g. by another worker)
+            pool.discard(customer_id)
+
+        return self._query_random_non_winner(weighted)
+
+    def _get_pool(self, weighted: bool):
+        if weighted:
+            return weighted_pools.get(self.organization_id, self._get_eligible_weights_after)
+        return eligible_pools.get(self.organization_id, self._get_eligible_ids_after)
+
+    @staticmethod
+    def _note_eligible(customer: Customer) -> None:
+        """ Add a customer to the loaded draw pools of its organization. """
+        eligible_pools.note_added(customer.organization_id, customer.id)
+        weighted_pools.note_added(customer.organization_id, customer.id, customer.weight)
+
+    def _note_ineligible(self, organization_id: Optional[int], customer_id: int) -> None:
+        """ Remove a customer from the loaded draw pools of its organization. """
+        eligible_pools.note_removed(organization_id, customer_id)
+        weighted_pools.note_removed(organization_id, customer_id)
+
+    def _get_eligible_weights_after(self, after_id: int) -> List[tuple]:
+        """ (id, weight) of eligible customers in the organization above after_id, ascending. """
+        rows = (
+            self.db.query(Customer.id, Customer.weight)
+            .filter(
+                Customer.organization_id == self.organization_id,
+                Customer.is_winner == False,
+                Customer.id > after_id,
+            )
+            .order_by(Customer.id)
+            .all()
+        )
+        return [(row.id, row.weight) for row in rows]
 
-        from sqlalchemy.sql.expression import func
+    def _get_eligible_ids_after(self, after_id: int) -> List[int]:
+        """ IDs of eligible customers in the organization above after_id, ascending. """
+        rows = (
+            self.db.query(Customer.id)
+            .filter(
+                Customer.organization_id == self.organization_id,
+                Customer.is_winner == False,
+                Customer.id > after_id,
+            )
+            .order_by(Customer.id)
+            .all()
+        )
+        return [row.id for row in rows]
 
+    def _get_eligible_by_id(self, customer_id: int) -> Optional[Customer]:
+        return (
+            self.db.query(Customer)
+            .filter(
+                Customer.id == customer_id,
+                Customer.organization_id == self.organization_id,
+                Customer.is_winner == False,
+            )
+            .first()
+        )
+
+    def _query_random_non_winner(self, weighted: bool = False) -> Optional[Customer]:
+        """ Fallback draw with ORDER BY random(), which scans every eligible row. """
         query = self.db.query(Customer).filter(Customer.is_winner == False)
         if self.organization_id:
             query = query.filter(Customer.organization_id == self.organization_id)
             
-        return query.order_by(func.random()).first()
+        return query.order_by(self._random_order(weighted)).first()
+
+    @staticmethod
+    def _random_order(weighted: bool):
+        """ Random sort key; weighted uses -ln(u)/w so lower keys favour heavier entries. """
+        if weighted:
+            return -func.ln(1.0 - func.random()) / Customer.weight
+        return func.random()
 
     def mark_as_winner(self, customer_id: int, winner_place: int) -> Optional[Customer]:
         """
@@ -145,19 +419,187 @@ class CustomerRepository:
             Returns:
                 Updated Customer if found, None otherwise
         """
+        db_customer = self._update_returning(
+            customer_id, {"is_winner": True, "winner_place": winner_place}
+        )
+        if db_customer:
+            self._note_ineligible(db_customer.organization_id, db_customer.id)
+        return db_customer
 
-        db_customer = self.get_by_id(customer_id)
-        if not db_customer:
-            return None
+    def mark_as_notified(self, customer_id: int) -> Optional[Customer]:
+        """
+            Record that a winner has been notified.
+
+            Args:
+                customer_id: Customer's ID
+
+            Returns:
+                Updated Customer if found, None otherwise
+        """
+        return self._update_returning(
+            customer_id, {"is_notified": True, "notified_at": func.now()}
+        )
+
+    def mark_many_as_notified(self, customer_ids: List[int]) -> List[int]:
+        """
+            Record that several winners have been notified, in one statement.
 
-        db_customer.is_winner = True
-        db_customer.winner_place = winner_place
+            Like mark_as_notified, previous flags are read under lock in a CTE
+            and the notification counters of every affected organization are
+            adjusted in the same statement. Does not commit; the change is
+            part of the caller's transaction.
+
+            Args:
+                customer_ids: Customers' IDs (of any organization unless the
+                    repository is scoped to one)
+
+            Returns:
+                IDs of the customers that were updated
+        """
+        if not customer_ids:
+            return []
+        customers = Customer.__table__
+        criteria = [customers.c.id.in_(customer_ids)]
+        if self.organization_id:
+            criteria.append(customers.c.organization_id == self.organization_id)
+
+        old = (
+            select(customers.c.id, customers.c.is_notified)
+            .where(*criteria)
+            .with_for_update()
+            .cte("old")
+        )
+        updated = (
+            update(customers)
+            .where(customers.c.id == old.c.id)
+            .values(is_notified=True, notified_at=func.now())
+            .returning(
+                customers.c.id,
+                customers.c.organization_id,
+                customers.c.is_notified,
+                old.c.is_notified.label("was_notified"),
+            )
+            .cte("updated")
+        )
+        bump = OrganizationStatsRepository.bump_from_rows(
+            updated, notified=self._flag_delta(updated.c.is_notified, updated.c.was_notified)
+        )
+        return self.db.scalars(select(updated.c.id).add_cte(bump.cte("bumped"))).all()
+
+    def draw_winners(self, weighted: bool = False) -> List[Customer]:
+        """
+        Draw distinct winners for every prize place that has not been awarded yet.
+
+        Runs as a single transaction: the organization's prize rows are locked
+        so concurrent draws are serialized, candidates are locked with
+        FOR UPDATE SKIP LOCKED, and all winners are marked in one UPDATE.
+
+        Args:
+            weighted: Pick proportionally to each customer's weight instead of uniformly
+
+        Returns:
+            Newly marked winners ordered by place (empty if no prizes are open
+            or no eligible customers remain)
+        """
+        places = self._get_open_places()
+        if not places:
+            self.db.rollback()
+            return []
+
+        winner_ids = self._lock_random_eligible(len(places), weighted)
+        if not winner_ids:
+            self.db.rollback()
+            return []
+
+        place_by_id = dict(zip(winner_ids, places))
+        winners = self.db.scalars(
+            update(Customer)
+            .where(Customer.id.in_(winner_ids))
+            .values(
+                is_winner=True,
+                winner_place=case(place_by_id, value=Customer.id),
+            )
+            .returning(Customer),
+            execution_options={"synchronize_session": False, "populate_existing": True},
+        ).all()
+        self._bump_stats(self.organization_id, winners=len(winners))
         self.db.commit()
-        self.db.refresh(db_customer)
-        return db_customer
 
-        
+        for winner in winners:
+            self._note_ineligible(self.organization_id, winner.id)
+        return sorted(winners, key=lambda winner: winner.winner_place)
 
+    def _get_open_places(self) -> List[int]:
+        """ Prize places of the organization without a winner, locking its prize rows. """
+        prize_places = self.db.scalars(
+            select(Prize.place)
+            .where(Prize.organization_id == self.organization_id)
+            .order_by(Prize.place)
+            .with_for_update()
+        ).all()
 
-        
-                
+        awarded = set(
+            self.db.scalars(
+                select(Customer.winner_place).where(
+                    Customer.organization_id == self.organization_id,
+                    Customer.is_winner == True,
+                    Customer.winner_place.is_not(None),
+                )
+            ).all()
+        )
+        return sorted(set(prize_places) - awarded)
+
+    def _lock_random_eligible(self, count: int, weighted: bool = False) -> List[int]:
+        """
+        Pick and row-lock up to `count` distinct random eligible customers.
+
+        Candidates come from the eligible pool; rows that have already won,
+        were deleted, or are locked by a concurrent transaction are skipped.
+        """
+        pool = self._get_pool(weighted)
+        chosen: List[int] = []
+        tried = set()
+
+        for _ in range(MAX_DRAW_PROBES):
+            needed = count - len(chosen)
+            if needed == 0:
+                break
+
+            candidates = [
+                customer_id
+                for customer_id in pool.sample_many(needed + len(tried))
+                if customer_id not in tried
+            ][:needed]
+            if not candidates:
+                break
+            tried.update(candidates)
+
+            locked = self.db.scalars(
+                select(Customer.id)
+                .where(
+                    Customer.id.in_(candidates),
+                    Customer.organization_id == self.organization_id,
+                    Customer.is_winner == False,
+                )
+                .with_for_update(skip_locked=True)
+            ).all()
+            chosen.extend(locked)
+
+        if len(chosen) < count:
+            # Pool exhausted or heavily contended: let the database pick the rest
+            chosen.extend(
+                self.db.scalars(
+                    select(Customer.id)
+                    .where(
+                        Customer.organization_id == self.organization_id,
+                        Customer.is_winner == False,
+                        Customer.id.not_in(chosen or [0]),
+                    )
+                    .order_by(self._random_order(weighted))
+                    .limit(count - len(chosen))
+                    .with_for_update(skip_locked=True)
+                ).all()
+            )
+
+        random.shuffle(chosen)
+        return chosen
@@ -0,0 +1,271 @@
+"""
+Notification outbox repository.
+
+Queues emails in notification_outbox and moves jobs through their delivery
+states for the notification worker. Claims use FOR UPDATE SKIP LOCKED, so
+any number of workers can poll the same table without picking the same job.
+"""
+from datetime import timedelta
+from typing import List, Optional, Set, Tuple
+
+from sqlalchemy import Integer, String, Values, and_, case, column, func, literal, null, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.customer import Customer
+from app.models.notification_outbox import NotificationOutbox
+from app.repositories.customer_repository import CustomerRepository
+
+OPEN_STATUSES = ("pending", "sending")
+
+
+class NotificationOutboxRepository:
+    """ Repository for queued email notifications. """
+
+    def __init__(self, db: Session):
+        """  Initialize repository with database session
+            Args:
+                db: SQLAlchemy database session
+        """
+        self.db = db
+
+    def enqueue(self, organization_id: int, customer_id: int, kind: str = "winner") -> NotificationOutbox:
+        """
+        Queue a notification for a customer and commit.
+
+        A customer has at most one open (pending or sending) job per kind;
+        queuing again returns that job instead of adding a second email.
+
+        Returns: The new or already open NotificationOutbox job
+        """
+        stmt = (
+            insert(NotificationOutbox)
+            .values(organization_id=organization_id, customer_id=customer_id, kind=kind)
+            .on_conflict_do_nothing(
+                index_elements=[NotificationOutbox.customer_id, NotificationOutbox.kind],
+                index_where=NotificationOutbox.status.in_(OPEN_STATUSES),
+            )
+            .returning(NotificationOutbox)
+        )
+        while True:
+            job = self.db.scalars(stmt).first()
+            if job is not None:
+                break
+            job = self.db.scalars(
+                select(NotificationOutbox).where(
+                    NotificationOutbox.customer_id == customer_id,
+                    NotificationOutbox.kind == kind,
+                    NotificationOutbox.status.in_(OPEN_STATUSES),
+                )
+            ).first()
+            if job is not None:
+                break
+            # The conflicting job was settled between the two statements;
+            # nothing blocks the insert any more, so try it again
+        # Detach so the commit does not expire the row we already have
+        self.db.expunge(job)
+        self.db.commit()
+        return job
+
+    def enqueue_winners(
+        self, organization_id: int, claim_limit: int, lease_seconds: float, seconds_per_job: float
+    ) -> List[Tuple[int, str, Optional[NotificationOutbox]]]:
+        """
+        Queue a notification for every winner of the organization not yet
+        notified, in one statement, and commit.
+
+        The first claim_limit new jobs (by customer ID) are claimed by the
+        caller (status sending); the rest stay pending for the notification
+        worker. Winners that already have an open job are left to whoever
+        owns it. The caller sends its jobs before settling them, so their
+        lease is lease_seconds plus seconds_per_job for each claimed job.
+
+        Returns: (customer ID, email, new job or None if already queued)
+            for each winner, by customer ID
+        """
+        customers = Customer.__table__
+        outbox = NotificationOutbox.__table__
+        open_job = (
+            select(outbox.c.id)
+            .where(
+                outbox.c.customer_id == customers.c.id,
+                outbox.c.kind == "winner",
+                outbox.c.status.in_(OPEN_STATUSES),
+            )
+            .exists()
+        )
+        winners = (
+            select(customers.c.id, customers.c.organization_id, customers.c.email, open_job.label("queued"))
+            .where(
+                customers.c.organization_id == organization_id,
+                customers.c.is_winner == True,
+                customers.c.is_notified == False,
+            )
+            .cte("winners")
+        )
+        # Numbered after leaving out winners with an open job, so those take no claim slot
+        to_queue = (
+            select(
+                winners.c.id,
+                winners.c.organization_id,
+                func.row_number().over(order_by=winners.c.id).label("position"),
+                func.count().over().label("total"),
+            )
+            .where(winners.c.queued == False)
+            .cte("to_queue")
+        )
+        claimed = to_queue.c.position <= claim_limit
+        lease = lease_seconds + func.least(to_queue.c.total, claim_limit) * seconds_per_job
+        inserted = (
+            insert(outbox)
+            .from_select(
+                ["organization_id", "customer_id", "kind", "status", "attempts", "locked_until"],
+                select(
+                    to_queue.c.organization_id,
+                    to_queue.c.id,
+                    literal("winner"),
+                    case((claimed, literal("sending")), else_=literal("pending")),
+                    case((claimed, literal(1)), else_=literal(0)),
+                    case((claimed, func.now() + lease * literal(timedelta(seconds=1))), else_=null()),
+                ),
+            )
+            # A job opened by a concurrent request since the snapshot still wins
+            .on_conflict_do_nothing(
+                index_elements=[outbox.c.customer_id, outbox.c.kind],
+                index_where=outbox.c.status.in_(OPEN_STATUSES),
+            )
+            .returning(*outbox.c)
+            .cte("inserted")
+        )
+        rows = self.db.execute(
+            select(winners.c.id.label("winner_id"), winners.c.email.label("winner_email"), *inserted.c)
+            .select_from(winners.outerjoin(inserted, inserted.c.customer_id == winners.c.id))
+            .order_by(winners.c.id)
+        ).all()
+        self.db.commit()
+
+        return [
+            (
+                row.winner_id,
+                row.winner_email,
+                NotificationOutbox(**{c.name: row._mapping[c.name] for c in outbox.c}) if row.id is not None else None,
+            )
+            for row in rows
+        ]
+
+    def claim(self, batch_size: int, lease_seconds: float) -> List[NotificationOutbox]:
+        """
+        Lease up to batch_size due jobs to the calling worker and commit.
+
+        Due jobs are pending ones whose available_at has passed, and jobs left
+        in sending by a worker whose lease expired (crashed or hung). Rows
+        locked by another worker's claim are skipped, not waited for. Each
+        claim counts as an attempt.
+
+        Returns: Claimed jobs, status sending, locked until now + lease
+        """
+        outbox = NotificationOutbox
+        due = (
+            select(outbox.id)
+            .where(
+                or_(
+                    and_(outbox.status == "pending", outbox.available_at <= func.now()),
+                    and_(outbox.status == "sending", outbox.locked_until < func.now()),
+                )
+            )
+            .order_by(outbox.available_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .cte("due")
+        )
+        stmt = (
+            update(outbox)
+            .where(outbox.id == due.c.id)
+            .values(
+                status="sending",
+                attempts=outbox.attempts + 1,
+                locked_until=func.now() + timedelta(seconds=lease_seconds),
+            )
+            .returning(outbox)
+        )
+        jobs = self.db.scalars(stmt, execution_options={"populate_existing": True}).all()
+        for job in jobs:
+            self.db.expunge(job)
+        self.db.commit()
+        return jobs
+
+    def _owned(self, job: NotificationOutbox):
+        """
+        Criteria matching a job only while the caller's claim is current.
+
+        attempts is bumped by every claim, so a worker whose lease expired and
+        was taken over cannot overwrite the new owner's outcome.
+        """
+        return and_(
+            NotificationOutbox.id == job.id,
+            NotificationOutbox.status == "sending",
+            NotificationOutbox.attempts == job.attempts,
+        )
+
+    def mark_sent(self, sent: List[Tuple[NotificationOutbox, Optional[str]]]) -> Set[int]:
+        """
+        Record delivered jobs and flag their customers as notified, then commit.
+
+        One UPDATE settles all jobs still owned by the caller, one more flags
+        their customers (see CustomerRepository.mark_many_as_notified), in a
+        single transaction.
+
+        Args:
+            sent: (job, provider message ID) pairs
+
+        Returns: IDs of the jobs settled; jobs whose claim was lost are left alone
+        """
+        if not sent:
+            return set()
+        outbox = NotificationOutbox.__table__
+        delivered = Values(
+            column("id", Integer), column("attempts", Integer), column("message_id", String),
+            name="delivered",
+        ).data([(job.id, job.attempts, message_id) for job, message_id in sent])
+        rows = self.db.execute(
+            update(outbox)
+            .where(
+                outbox.c.id == delivered.c.id,
+                outbox.c.attempts == delivered.c.attempts,
+                outbox.c.status == "sending",
+            )
+            .values(status="sent", sent_at=func.now(), locked_until=None,
+                    provider_message_id=delivered.c.message_id, last_error=None)
+            .returning(outbox.c.id, outbox.c.customer_id)
+        ).all()
+        CustomerRepository(self.db).mark_many_as_notified([row.customer_id for row in rows])
+        self.db.commit()
+        return {row.id for row in rows}
+
+    def mark_retry(self, job: NotificationOutbox, error: str, delay_seconds: float) -> bool:
+        """
+        Put a failed job back in the queue, due again after delay_seconds.
+
+        Returns: False if the claim was lost in the meantime (nothing changed)
+        """
+        return self._finish(
+            job,
+            status="pending",
+            available_at=func.now() + timedelta(seconds=delay_seconds),
+            last_error=error,
+        )
+
+    def mark_failed(self, job: NotificationOutbox, error: str) -> bool:
+        """
+        Give up on a job (permanent error or no attempts left).
+
+        Returns: False if the claim was lost in the meantime (nothing changed)
+        """
+        return self._finish(job, status="failed", last_error=error)
+
+    def _finish(self, job: NotificationOutbox, **values) -> bool:
+        result = self.db.execute(
+            update(NotificationOutbox).where(self._owned(job)).values(locked_until=None, **values)
+        )
+        self.db.commit()
+        return result.rowcount > 0
@@ -0,0 +1,112 @@
+"""
+Organization stats repository.
+
+Keeps the per-organization counters in organization_stats. Writes never
+commit on their own: they join the caller's transaction, so counters change
+atomically with the customer rows they describe.
+"""
+from sqlalchemy import Integer, literal, or_, select
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.orm import Session
+
+from app.models.organization_stats import OrganizationStats
+
+
+class OrganizationStatsRepository:
+    """ Repository for per-organization counters. """
+
+    def __init__(self, db: Session, organization_id: int):
+        """  Initialize repository with database session
+            Args:
+                db: SQLAlchemy database session
+                organization_id: ID of the organization the counters belong to
+        """
+        self.db = db
+        self.organization_id = organization_id
+
+    def get(self) -> OrganizationStats:
+        """
+        Get the counters of the organization.
+        Returns: OrganizationStats (all zero if the organization has no entries yet)
+        """
+        stats = self.db.get(OrganizationStats, self.organization_id)
+        if stats is None:
+            return self.empty(self.organization_id)
+        return stats
+
+    @staticmethod
+    def empty(organization_id: int) -> OrganizationStats:
+        """ Transient all-zero counters for an organization without a stats row. """
+        return OrganizationStats(
+            organization_id=organization_id, total_customers=0, winners=0, notified=0
+        )
+
+    def bump(self, total_customers: int = 0, winners: int = 0, notified: int = 0) -> None:
+        """
+        Add deltas to the counters, creating the row on first use.
+        Does not commit; the change is part of the caller's transaction.
+        """
+        if not (total_customers or winners or notified):
+            return
+        self.db.execute(self.bump_statement(total_customers, winners, notified))
+
+    def bump_statement(self, total_customers=0, winners=0, notified=0) -> Insert:
+        """
+        Build the upsert used by bump() without executing it.
+
+        Deltas may be SQL expressions, so callers can embed the statement as a
+        CTE and bump the counters in the same round trip as their own write.
+        """
+        stmt = insert(OrganizationStats).values(
+            organization_id=self.organization_id,
+            total_customers=total_customers,
+            winners=winners,
+            notified=notified,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[OrganizationStats.organization_id],
+            set_={
+                "total_customers": OrganizationStats.total_customers + stmt.excluded.total_customers,
+                "winners": OrganizationStats.winners + stmt.excluded.winners,
+                "notified": OrganizationStats.notified + stmt.excluded.notified,
+            },
+        )
+        return stmt
+
+    @staticmethod
+    def bump_from_rows(rows, total_customers=0, winners=0, notified=0) -> Insert:
+        """
+        Build an upsert adding deltas aggregated over a set of customer rows.
+
+        Args:
+            rows: CTE of customer rows with an organization_id column, typically
+                the RETURNING of an INSERT/UPDATE/DELETE
+            total_customers, winners, notified: ints or aggregate expressions
+                over `rows`, evaluated per organization
+
+        Returns: INSERT ... SELECT ... ON CONFLICT statement, meant to be
+            attached as a CTE to the statement that produced `rows`
+        """
+        deltas = [
+            literal(delta, Integer) if isinstance(delta, int) else delta
+            for delta in (total_customers, winners, notified)
+        ]
+        source = (
+            select(rows.c.organization_id, *deltas)
+            .where(rows.c.organization_id.is_not(None))
+            .group_by(rows.c.organization_id)
+        )
+        if not any(isinstance(delta, int) and delta for delta in (total_customers, winners, notified)):
+            # Like bump(): leave the row alone (and unlocked) when no counter changes
+            source = source.having(or_(*(delta != 0 for delta in deltas)))
+        stmt = insert(OrganizationStats).from_select(
+            ["organization_id", "total_customers", "winners", "notified"], source
+        )
+        return stmt.on_conflict_do_update(
+            index_elements=[OrganizationStats.organization_id],
+            set_={
+                "total_customers": OrganizationStats.total_customers + stmt.excluded.total_customers,
+                "winners": OrganizationStats.winners + stmt.excluded.winners,
+                "notified": OrganizationStats.notified + stmt.excluded.notified,
+            },
+        )
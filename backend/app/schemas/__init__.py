@@ -10,6 +10,8 @@ from app.schemas.customer import (
     CustomerUpdate,
     CustomerResponse,
     CustomerListResponse,
+    CustomerStatsResponse,
+    DrawResponse,
 )
 
 from app.schemas.notification import (
@@ -23,6 +25,8 @@ __all__ = [
     "CustomerUpdate",
     "CustomerResponse",
     "CustomerListResponse",
+    "CustomerStatsResponse",
+    "DrawResponse",
     "WinnerNotification",
     "NotificationResponse"
 ]
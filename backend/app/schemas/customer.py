@@ -32,6 +32,7 @@ class CustomerUpdate(CustomerBase):
     email: Optional[EmailStr] = None
     feedback: Optional[str] = Field(None, min_length=1)
     is_winner: Optional[bool] = None
+    weight: Optional[int] = Field(None, ge=1, description="Number of entries in weighted draws")
 
 class CustomerResponse(CustomerBase):
     """
@@ -40,6 +41,7 @@ class CustomerResponse(CustomerBase):
     """
     id: int
     winner_place: Optional[int] = None
+    weight: int = 1
     is_winner: bool
     is_notified: bool
     notified_at: Optional[datetime] = None
@@ -55,4 +57,21 @@ class CustomerListResponse(BaseModel):
     Schema for list of customers.
     """
     total: int
-    customers: list[CustomerResponse]
\ No newline at end of file
+    customers: list[CustomerResponse]
+    next_cursor: Optional[str] = None
+
+
+class CustomerStatsResponse(BaseModel):
+    """
+    Schema for per-organization entry counters.
+    """
+    total: int
+    winners: int
+    notified: int
+
+
+class DrawResponse(BaseModel):
+    """
+    Schema for a multi-place draw result.
+    """
+    winners: list[CustomerResponse]
@@ -8,6 +8,9 @@ from pydantic import BaseModel, EmailStr
 class WinnerNotification(BaseModel):
     """
     Schema for sending winner notification.
+
+    The email is always queued; send_immediately wakes the worker instead of
+    leaving the job to its next poll.
     """
     customer_id: int
     send_immediately: bool = True
@@ -19,3 +22,25 @@ class NotificationResponse(BaseModel):
     success: bool
     message: str
     email_sent_to: str | None = None
+    notification_id: int | None = None  # Outbox job delivering the email
+    status: str | None = None  # pending, sending, sent or failed
+
+class WinnerNotificationResult(BaseModel):
+    """
+    Outcome of one winner in a bulk notification
+    """
+    customer_id: int
+    email: str
+    status: str  # sent, retrying (left to the worker), failed or queued (sent by the worker)
+    message: str
+    notification_id: int | None = None
+
+class BulkNotificationResponse(BaseModel):
+    """
+    Schema for bulk notification response
+    """
+    sent: int
+    retrying: int
+    failed: int
+    queued: int
+    results: list[WinnerNotificationResult]
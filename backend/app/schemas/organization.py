@@ -11,6 +11,8 @@ class OrganizationUpdate(BaseModel):
     name: Optional[str] = None
     primary_color: Optional[str] = None
     logo_url: Optional[str] = None
+    # Jinja2 HTML for the winner email; empty string restores the built-in template
+    winner_email_template: Optional[str] = Field(None, max_length=100_000)
 
 class OrganizationResponse(OrganizationBase):
     id: int
@@ -19,3 +21,7 @@ class OrganizationResponse(OrganizationBase):
 
     class Config:
         from_attributes = True
+
+class OrganizationAdminResponse(OrganizationResponse):
+    """ Organization as seen by its own admins, including settings not shown publicly. """
+    winner_email_template: Optional[str] = None
@@ -0,0 +1,348 @@
+"""
+In-memory samplers for the roulette draw.
+
+Picking a random row with ORDER BY random() sorts every eligible customer of the
+organization on each spin. Instead we keep a per-organization pool of eligible
+customer IDs in process memory and sample from it in O(1). Weighted draws use
+the same idea with a Walker/Vose alias table over each customer's entries.
+
+The pool is only a hint: the repository re-checks the sampled ID against the
+database and discards it if it has won or been deleted in the meantime, so a
+stale pool never produces an ineligible winner. New entries are picked up
+incrementally by loading IDs above the pool's high-water mark.
+"""
+import bisect
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+
+class EligiblePool:
+    """
+    Set of eligible customer IDs for a single organization.
+
+    IDs live in a list with an ID -> position index, so add, discard and
+    uniform sampling are all O(1) (discard swaps the last element into the hole).
+
+    Limits: the registry tops the pool up with IDs above high_water_id only.
+    A customer committed by another worker with a lower ID after the mark
+    moved past it (a long transaction), or un-won in another worker, is
+    missing from the pool until the next full rebuild (DRAW_POOL_MAX_AGE_SECONDS).
+    Such customers are not drawn in that time; nobody ineligible ever is.
+    """
+
+    def __init__(self):
+        self._ids: List[int] = []
+        self._positions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.high_water_id = 0
+        self.loaded_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, customer_id: int) -> None:
+        """ Add an ID to the pool (no-op if already present). """
+        with self._lock:
+            if customer_id in self._positions:
+                return
+            self._positions[customer_id] = len(self._ids)
+            self._ids.append(customer_id)
+
+    def load(self, customer_ids: Iterable[int]) -> None:
+        """
+        Add IDs loaded from the database and advance the high-water mark.
+
+        IDs added one by one through add() deliberately leave the mark alone,
+        so entries committed by other workers below them are still loaded.
+        """
+        for customer_id in customer_ids:
+            self.add(customer_id)
+            if customer_id > self.high_water_id:
+                self.high_water_id = customer_id
+
+    def discard(self, customer_id: int) -> None:
+        """ Remove an ID from the pool (no-op if missing). """
+        with self._lock:
+            position = self._positions.pop(customer_id, None)
+            if position is None:
+                return
+            last = self._ids.pop()
+            if last != customer_id:
+                self._ids[position] = last
+                self._positions[last] = position
+
+    def sample(self) -> Optional[int]:
+        """ Return a uniformly random ID from the pool, or None if empty. """
+        with self._lock:
+            if not self._ids:
+                return None
+            return self._ids[random.randrange(len(self._ids))]
+
+    def sample_many(self, count: int) -> List[int]:
+        """ Return up to `count` distinct random IDs from the pool. """
+        with self._lock:
+            return random.sample(self._ids, min(count, len(self._ids)))
+
+
+class AliasTable:
+    """
+    Walker/Vose alias table for O(1) sampling from a discrete distribution.
+
+    Building is O(n); each sample costs one random index and one coin flip.
+    """
+
+    def __init__(self, weights: Sequence[float]):
+        count = len(weights)
+        total = float(sum(weights))
+        self._prob = [1.0] * count
+        self._alias = list(range(count))
+
+        scaled = [weight * count / total for weight in weights]
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+
+        while small and large:
+            lesser = small.pop()
+            greater = large.pop()
+            self._prob[lesser] = scaled[lesser]
+            self._alias[lesser] = greater
+            scaled[greater] = scaled[greater] + scaled[lesser] - 1.0
+            if scaled[greater] < 1.0:
+                small.append(greater)
+            else:
+                large.append(greater)
+        # Whatever is left (including float leftovers in `small`) keeps prob 1.0
+
+    def __len__(self) -> int:
+        return len(self._prob)
+
+    def sample(self) -> int:
+        """ Return a random index, chosen proportionally to its weight. """
+        index = random.randrange(len(self._prob))
+        return index if random.random() < self._prob[index] else self._alias[index]
+
+
+class WeightedPool:
+    """
+    Eligible customer IDs with entry weights for a single organization.
+
+    The bulk of the entries sits in an alias table. To avoid an O(n) rebuild
+    on every change, the table is maintained incrementally:
+
+    - new entries go into a small pending buffer with running weight totals,
+      sampled by binary search, and are merged into the table once the
+      buffer grows past a fraction of it;
+    - removed entries (in the table or the buffer) are tombstoned and
+      rejected at sampling time, and everything is rebuilt once tombstones
+      hold half of the table's or the buffer's weight.
+
+    Choosing between the table and the buffer proportionally to their totals
+    (tombstoned weight included), then rejecting tombstones, keeps every live
+    entry's probability exactly proportional to its weight. A draw costs
+    O(1) in the table and O(log n) in the buffer.
+    """
+
+    MIN_PENDING_BEFORE_MERGE = 32
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids: List[int] = []
+        self._weights: List[int] = []
+        self._index: Dict[int, int] = {}
+        self._table: Optional[AliasTable] = None
+        self._table_total = 0
+        self._removed: set = set()
+        self._removed_total = 0
+        # Buffer: IDs in arrival order with running weight totals, live ID -> position
+        self._pending_ids: List[int] = []
+        self._pending_weights: List[int] = []
+        self._pending_cumulative: List[int] = []
+        self._pending: Dict[int, int] = {}
+        self._pending_removed: set = set()
+        self._pending_removed_total = 0
+        self.high_water_id = 0
+        self.loaded_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._index) - len(self._removed) + len(self._pending)
+
+    def add(self, customer_id: int, weight: int = 1) -> None:
+        """ Add an entry to the pending buffer (no-op if already live). """
+        with self._lock:
+            self._add(customer_id, max(int(weight), 1))
+
+    def load(self, rows: Iterable[Tuple[int, int]]) -> None:
+        """ Add (id, weight) rows loaded from the database and advance the high-water mark. """
+        with self._lock:
+            for customer_id, weight in rows:
+                self._add(customer_id, max(int(weight), 1))
+                if customer_id > self.high_water_id:
+                    self.high_water_id = customer_id
+            if len(self._pending) >= self.MIN_PENDING_BEFORE_MERGE:
+                self._rebuild()
+
+    def discard(self, customer_id: int) -> None:
+        """ Remove an entry (no-op if missing). """
+        with self._lock:
+            self._discard(customer_id)
+
+    def sample(self) -> Optional[int]:
+        """ Return a random live ID chosen proportionally to its weight, or None if empty. """
+        with self._lock:
+            return self._sample()
+
+    def sample_many(self, count: int) -> List[int]:
+        """ Return up to `count` distinct IDs, drawn by weight without replacement. """
+        with self._lock:
+            chosen: List[int] = []
+            seen = set()
+            target = min(count, len(self))
+            for _ in range(target * 8):
+                if len(chosen) == target:
+                    break
+                customer_id = self._sample()
+                if customer_id is not None and customer_id not in seen:
+                    seen.add(customer_id)
+                    chosen.append(customer_id)
+            return chosen
+
+    def _add(self, customer_id: int, weight: int) -> None:
+        index = self._index.get(customer_id)
+        if (index is not None and index not in self._removed) or customer_id in self._pending:
+            return
+        self._pending[customer_id] = len(self._pending_ids)
+        self._pending_ids.append(customer_id)
+        self._pending_weights.append(weight)
+        self._pending_cumulative.append(self._pending_all_total + weight)
+        if len(self._pending) > max(self.MIN_PENDING_BEFORE_MERGE, len(self._ids) // 8):
+            self._rebuild()
+
+    def _discard(self, customer_id: int) -> None:
+        position = self._pending.pop(customer_id, None)
+        if position is not None:
+            self._pending_removed.add(position)
+            self._pending_removed_total += self._pending_weights[position]
+            if self._pending_removed_total * 2 > self._pending_all_total:
+                self._rebuild()
+            return
+
+        index = self._index.get(customer_id)
+        if index is None or index in self._removed:
+            return
+        self._removed.add(index)
+        self._removed_total += self._weights[index]
+        if self._removed_total * 2 > self._table_total:
+            self._rebuild()
+
+    def _sample(self) -> Optional[int]:
+        if len(self) == 0:
+            return None
+
+        # Acceptance is at least 1/2 because tombstones never exceed half the table or buffer
+        pending_total = self._pending_all_total
+        for _ in range(64):
+            if random.random() * (self._table_total + pending_total) < pending_total:
+                position = bisect.bisect_right(self._pending_cumulative, random.random() * pending_total)
+                position = min(position, len(self._pending_ids) - 1)
+                if position not in self._pending_removed:
+                    return self._pending_ids[position]
+                continue
+            index = self._table.sample()
+            if index not in self._removed:
+                return self._ids[index]
+
+        self._rebuild()
+        return self._sample()
+
+    @property
+    def _pending_all_total(self) -> int:
+        """ Weight of the buffer, tombstones included. """
+        return self._pending_cumulative[-1] if self._pending_cumulative else 0
+
+    def _rebuild(self) -> None:
+        """ Merge live table entries and the pending buffer into a fresh alias table. """
+        live = [
+            (customer_id, self._weights[index])
+            for customer_id, index in self._index.items()
+            if index not in self._removed
+        ]
+        live.extend((customer_id, self._pending_weights[position]) for customer_id, position in self._pending.items())
+
+        self._ids = [customer_id for customer_id, _ in live]
+        self._weights = [weight for _, weight in live]
+        self._index = {customer_id: index for index, customer_id in enumerate(self._ids)}
+        self._table = AliasTable(self._weights) if live else None
+        self._table_total = sum(self._weights)
+        self._removed = set()
+        self._removed_total = 0
+        self._pending_ids = []
+        self._pending_weights = []
+        self._pending_cumulative = []
+        self._pending = {}
+        self._pending_removed = set()
+        self._pending_removed_total = 0
+
+
+class EligiblePoolRegistry:
+    """
+    Process-wide registry of eligible pools, keyed by organization ID.
+
+    Pools are loaded lazily on the first draw and fully rebuilt after max_age
+    seconds, which also picks up wins, deletions and weight changes made by
+    other workers.
+    """
+
+    def __init__(self, pool_class=EligiblePool, max_age: float = 300.0):
+        self.pool_class = pool_class
+        self.max_age = max_age
+        self._pools: Dict[int, EligiblePool] = {}
+        self._lock = threading.Lock()
+
+    def get(self, organization_id: int, loader: Callable[[int], list]):
+        """
+        Get an up-to-date pool for an organization.
+
+        Args:
+            organization_id: Organization to draw from
+            loader: Callable returning eligible rows (IDs, or (id, weight) for
+                weighted pools) with an ID greater than the given one, ascending
+
+        Returns: Pool containing every eligible customer known to the database
+        """
+        with self._lock:
+            pool = self._pools.get(organization_id)
+            if pool is None or time.monotonic() - pool.loaded_at > self.max_age:
+                pool = self.pool_class()
+                self._pools[organization_id] = pool
+
+        # Top up with entries created since the last draw (possibly by other workers)
+        pool.load(loader(pool.high_water_id))
+        return pool
+
+    def note_added(self, organization_id: Optional[int], customer_id: int, weight: Optional[int] = None) -> None:
+        """ Record a newly eligible customer in an already-loaded pool (weight only for weighted pools). """
+        pool = self._pools.get(organization_id)
+        if pool is not None:
+            if weight is None:
+                pool.add(customer_id)
+            else:
+                pool.add(customer_id, weight)
+
+    def note_removed(self, organization_id: Optional[int], customer_id: int) -> None:
+        """ Record that a customer is no longer eligible (won or deleted). """
+        pool = self._pools.get(organization_id)
+        if pool is not None:
+            pool.discard(customer_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pools.clear()
+
+
+# Singletons: one registry per draw mode shared by every request in this process
+eligible_pools = EligiblePoolRegistry(EligiblePool, max_age=settings.DRAW_POOL_MAX_AGE_SECONDS)
+weighted_pools = EligiblePoolRegistry(WeightedPool, max_age=settings.DRAW_POOL_MAX_AGE_SECONDS)
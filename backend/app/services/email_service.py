@@ -1,106 +1,134 @@
 """
 Email service for sending winner notifications using Resend.
+
+One EmailService per process (get_email_service(), created by the API
+lifespan or the worker on first use) so its transport's pooled connections,
+rate limit throttle and circuit breaker are shared by every sender.
 """
-import os
-import resend
+import threading
+from typing import Optional
+
 from app.core.config import settings
 from app.models.customer import Customer
+from app.services.email_templates import render_winner_email
+from app.services.email_transport import EmailTransport, create_transport
+from app.services.organization_cache import OrganizationSnapshot, get_organization_by_slug
 
 
 class EmailService:
     """Service for sending emails via Resend API."""
     
-    def __init__(self):
-        """Initialize Resend client with API key."""
-        if settings.RESEND_API_KEY:
-            resend.api_key = settings.RESEND_API_KEY
-        else:
-            raise ValueError("RESEND_API_KEY not configured")
+    def __init__(self, transport: Optional[EmailTransport] = None):
+        """
+        Initialize with the transport selected by EMAIL_TRANSPORT unless one is given.
+
+        Raises: ValueError if RESEND_API_KEY is not configured (Resend transport)
+        """
+        self.transport = transport or create_transport()
     
-    def send_winner_notification(self, customer: Customer) -> tuple[bool, str]:
+    def send_winner_email(self, customer: Customer) -> str:
         """
-        Send winner notification email to customer.
-        
+        Send winner notification email to customer, raising on failure.
+
+        Used by the notification worker, which decides from the exception
+        (resend.exceptions.*, CircuitOpenError) whether the send is worth retrying.
+
         Args:
             customer: Customer object with email and name
-            
+
         Returns:
-            tuple: (success: bool, message: str)
+            str: Resend email ID
         """
-        try:
-            # Determine prize name and place string
-            place_str = {1: "1st", 2: "2nd", 3: "3rd"}.get(customer.winner_place, "")
-            
-            # Find the prize in the database
-            prize_name = "a special prize"
-            if customer.organization and customer.organization.prizes:
-                for prize in customer.organization.prizes:
-                    if prize.place == customer.winner_place:
-                        prize_name = prize.name
-                        break
-            
-            # Create HTML email content
-            html_content = self._create_winner_email_html(customer, prize_name, place_str)
-            
-            subject = f"🎉 Congratulations! You won the {place_str} Prize!" if place_str else "🎉 Congratulations! You're a Winner!"
-
-            # Send email via Resend
-            # Use organization name in from field if available
-            from_name = customer.organization.name if customer.organization else settings.FROM_NAME
-            params = {
-                "from": f"{from_name} <{settings.FROM_EMAIL}>",
-                "to": [customer.email],
-                "subject": subject,
-                "html": html_content,
-            }
-            
-            email = resend.Emails.send(params)
-            
-            return True, f"Email sent successfully to {customer.email} (ID: {email.get('id')})"
-            
-        except Exception as e:
-            error_message = f"Failed to send email to {customer.email}: {str(e)}"
-            print(f"Email error: {error_message}")
-            return False, error_message
+        # Prizes (and any custom template) come from the cached organization snapshot, not a query per email
+        snapshot = get_organization_by_slug(customer.organization.slug) if customer.organization else None
+        return self.transport.send(self.build_winner_email(customer, snapshot))
+
+    def build_winner_email(self, customer: Customer, snapshot: Optional[OrganizationSnapshot]) -> dict:
+        """
+        Compose the winner email for the transport.
+
+        Args:
+            customer: Customer object with email and name
+            snapshot: The customer's cached organization (prizes, custom template)
+
+        Returns:
+            dict: Resend POST /emails payload
+        """
+        # Determine prize name and place string
+        place_str = {1: "1st", 2: "2nd", 3: "3rd"}.get(customer.winner_place, "")
+        prize = snapshot.prizes_by_place.get(customer.winner_place) if snapshot else None
+        prize_name = prize.name if prize else "a special prize"
+        
+        # Create HTML email content
+        html_content = self._create_winner_email_html(
+            customer, prize_name, place_str,
+            template_override=snapshot.winner_email_template if snapshot else None
+        )
+        
+        subject = f"🎉 Congratulations! You won the {place_str} Prize!" if place_str else "🎉 Congratulations! You're a Winner!"
+
+        # Use organization name in from field if available
+        from_name = customer.organization.name if customer.organization else settings.FROM_NAME
+        return {
+            "from": f"{from_name} <{settings.FROM_EMAIL}>",
+            "to": [customer.email],
+            "subject": subject,
+            "html": html_content,
+        }
     
-    def _create_winner_email_html(self, customer: Customer, prize_name: str, place_str: str) -> str:
+    def _create_winner_email_html(
+        self, customer: Customer, prize_name: str, place_str: str, template_override: str | None = None
+    ) -> str:
         """
         Create HTML email template for winner notification.
         
-        Loads template from file and substitutes customer data.
+        Renders the precompiled template (or the organization's own) with
+        customer data; every value is HTML-escaped.
         
         Args:
             customer: Customer object
             prize_name: Name of the prize
             place_str: String representation of the place (e.g., "1st")
+            template_override: The organization's winner email template, if any
             
         Returns:
             str: HTML email content
         """
-        # Load template from file
-        template_path = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)),
-            'templates',
-            'winner_email.html'
-        )
-        
-        try:
-            with open(template_path, 'r', encoding='utf-8') as f:
-                template_content = f.read()
-        except Exception as e:
-            print(f"Error loading email template: {str(e)}")
-            # Fallback simple template if file load fails
-            template_content = "<h1>Congratulations, {customer_name}!</h1><p>You won the {place_str} prize: {prize_name}</p>"
-
-        # Substitute customer data
         service_provider = customer.organization.name if customer.organization else 'Our Team'
         
-        html_content = template_content.format(
-            customer_name=customer.name,
-            customer_feedback=customer.feedback if customer.feedback else 'Your kind feedback',
-            prize_name=prize_name,
-            place_str=place_str,
-            service_provider=service_provider
+        return render_winner_email(
+            {
+                "customer_name": customer.name,
+                "customer_feedback": customer.feedback if customer.feedback else 'Your kind feedback',
+                "prize_name": prize_name,
+                "place_str": place_str,
+                "service_provider": service_provider,
+            },
+            template_override,
         )
-        
-        return html_content
+
+
+_email_service: Optional[EmailService] = None
+_email_service_lock = threading.Lock()
+
+
+def get_email_service() -> EmailService:
+    """
+    The EmailService of this process, created on first use.
+
+    Raises: ValueError if email is not configured (retried on the next call)
+    """
+    global _email_service
+    if _email_service is None:
+        with _email_service_lock:
+            if _email_service is None:
+                _email_service = EmailService()
+    return _email_service
+
+
+async def close_email_service() -> None:
+    """ Close the process's EmailService transport (pooled connections); the next get creates a new one. """
+    global _email_service
+    service, _email_service = _email_service, None
+    if service is not None:
+        await service.transport.aclose()
@@ -0,0 +1,159 @@
+"""
+Compiled email templates.
+
+The built-in templates in app/templates are Jinja2 templates, loaded and
+compiled once when this module is imported and auto-escaped, so customer
+input (names, feedback) cannot inject markup into an email.
+
+An organization may replace the winner email with its own template
+(organizations.winner_email_template). Those come from users, so they are
+compiled in a sandbox that blocks attribute tricks reaching Python internals,
+once per distinct template text, and rendered under limits: at most
+EMAIL_TEMPLATE_RENDER_SECONDS of template code and EMAIL_TEMPLATE_MAX_CHARS
+of output, so one organization's template cannot hold a send thread shared
+by every organization. If one fails to render for any reason, the built-in
+template is used instead.
+"""
+import logging
+import os
+import sys
+import time
+from functools import lru_cache
+from typing import Optional
+
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
+from jinja2.exceptions import SecurityError
+from jinja2.sandbox import ImmutableSandboxedEnvironment
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.notifications")
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
+
+# Variables available to winner email templates
+WINNER_EMAIL_VARIABLES = ("customer_name", "customer_feedback", "prize_name", "place_str", "service_provider")
+
+# Values an organization's template is test-rendered with before it is saved
+SAMPLE_WINNER_EMAIL_CONTEXT = {
+    "customer_name": "Alex Example",
+    "customer_feedback": "Great event, thank you!",
+    "prize_name": "Gift card",
+    "place_str": "1st",
+    "service_provider": "Example Events",
+}
+
+# Largest integer a template may compute with **, in bits
+_MAX_POWER_BITS = 4096
+
+
+class TemplateLimitError(SecurityError):
+    """ An organization's template exceeded its render time or output size. """
+
+
+class _LimitedSandbox(ImmutableSandboxedEnvironment):
+    """
+    Sandbox that also refuses operators building huge values in one step
+    (a string repeated a billion times, 10 ** 100000000), which no time
+    limit on template code could interrupt.
+    """
+
+    intercepted_binops = frozenset(["*", "**"])
+
+    def call_binop(self, context, operator, left, right):
+        if operator == "*":
+            for sequence, times in ((left, right), (right, left)):
+                if isinstance(sequence, (str, list, tuple)) and isinstance(times, int):
+                    if len(sequence) * times > settings.EMAIL_TEMPLATE_MAX_CHARS:
+                        raise TemplateLimitError("Repeated value would exceed the template size limit")
+        elif operator == "**" and isinstance(left, int) and isinstance(right, int):
+            # Bits of the result; float powers overflow instead of growing
+            if left.bit_length() * right > _MAX_POWER_BITS:
+                raise TemplateLimitError("Power would exceed the template number size limit")
+        return super().call_binop(context, operator, left, right)
+
+
+_environment = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    autoescape=select_autoescape(["html"]),
+)
+_sandbox = _LimitedSandbox(autoescape=True)
+
+winner_email_template = _environment.get_template("winner_email.html")
+
+
+@lru_cache(maxsize=256)
+def compile_organization_template(source: str) -> Template:
+    """
+    Compile an organization's template in the sandbox (cached by its text).
+
+    Raises: jinja2.TemplateSyntaxError if the template is invalid
+    """
+    return _sandbox.from_string(source)
+
+
+def _render_limited(template: Template, context: dict) -> str:
+    """
+    Render a sandboxed template within EMAIL_TEMPLATE_RENDER_SECONDS and
+    EMAIL_TEMPLATE_MAX_CHARS.
+
+    The time limit is checked on every line the template's compiled code
+    runs (loops included), through a trace function set for the duration
+    of the render on this thread only.
+
+    Raises: TemplateLimitError past either limit; any error of the template itself
+    """
+    deadline = time.monotonic() + settings.EMAIL_TEMPLATE_RENDER_SECONDS
+
+    def check_deadline(frame, event, arg):
+        if time.monotonic() > deadline:
+            raise TemplateLimitError(f"Template took longer than {settings.EMAIL_TEMPLATE_RENDER_SECONDS}s to render")
+        return check_deadline
+
+    def trace_template_frames(frame, event, arg):
+        # Compiled templates run as code named <template>; nothing else is traced
+        return check_deadline if frame.f_code.co_filename == "<template>" else None
+
+    parts = []
+    size = 0
+    previous_trace = sys.gettrace()
+    sys.settrace(trace_template_frames)
+    try:
+        for part in template.generate(context):
+            size += len(part)
+            if size > settings.EMAIL_TEMPLATE_MAX_CHARS:
+                raise TemplateLimitError(f"Template output is larger than {settings.EMAIL_TEMPLATE_MAX_CHARS} characters")
+            parts.append(part)
+    finally:
+        sys.settrace(previous_trace)
+    return "".join(parts)
+
+
+def check_organization_template(source: str) -> None:
+    """
+    Compile an organization's template and render it with sample values,
+    so templates that fail at render time are refused when saved.
+
+    Raises: jinja2.TemplateSyntaxError if the template is invalid;
+        TemplateLimitError or the template's own error if rendering fails
+    """
+    _render_limited(compile_organization_template(source), SAMPLE_WINNER_EMAIL_CONTEXT)
+
+
+def render_winner_email(context: dict, override: Optional[str] = None) -> str:
+    """
+    Render the winner email HTML.
+
+    Args:
+        context: values for WINNER_EMAIL_VARIABLES
+        override: the organization's own template text, if it has one
+
+    Returns: HTML with every variable auto-escaped
+    """
+    if override:
+        try:
+            return _render_limited(compile_organization_template(override), context)
+        except Exception as e:
+            # Any failure of user code, not only template errors (1/0, "a" + 1, limits)
+            logger.warning(f"Organization winner email template failed, using the default: {type(e).__name__}: {e}")
+    return winner_email_template.render(context)
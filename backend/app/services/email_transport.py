@@ -0,0 +1,249 @@
+"""
+Email transports: how a composed email reaches the provider.
+
+EmailService builds messages (Resend's POST /emails payload) and hands them
+to a transport:
+
+  ResendTransport  Resend's HTTP API through long-lived httpx clients (sync
+                   and async), so sends reuse pooled keep-alive connections
+                   instead of a new TLS handshake each. It owns the rate
+                   limit throttle and a circuit breaker for the provider.
+  FakeTransport    records messages after a configurable delay and never
+                   contacts anyone, to load-test notification throughput
+                   offline (EMAIL_TRANSPORT=fake).
+
+Errors are raised as resend.exceptions (ValidationError, RateLimitError,
+ResendError with the HTTP status as code, ...), so the notification worker
+classifies them the same way whichever transport sent the email.
+"""
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Optional
+
+import httpx
+from resend.exceptions import ResendError, raise_for_code_and_type
+
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.config import settings
+from app.core.throttle import TokenBucket
+
+logger = logging.getLogger("app.notifications")
+# httpx logs every request at INFO; the worker logs the outcome of each email itself
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+class EmailTransport(ABC):
+    """ Sends one email message (Resend API payload) and returns the provider's message ID. """
+
+    name = "base"
+
+    @abstractmethod
+    def send(self, message: dict) -> str:
+        ...
+
+    @abstractmethod
+    async def send_async(self, message: dict) -> str:
+        ...
+
+    def retry_after(self) -> float:
+        """ Seconds before sends are accepted again (circuit open), 0 when available. """
+        return 0.0
+
+    def stats(self) -> dict:
+        return {"transport": self.name}
+
+    def close(self) -> None:
+        """ Release pooled connections of the sync client. """
+
+    async def aclose(self) -> None:
+        """ Release all pooled connections (sync and async clients). """
+        self.close()
+
+
+def _network_error(error: httpx.HTTPError) -> ResendError:
+    """ The error the Resend SDK raises when the request itself fails (retryable 500). """
+    return ResendError(
+        code=500,
+        message=f"{type(error).__name__}: {error}",
+        error_type="HttpClientError",
+        suggested_action="Request failed, please try again.",
+    )
+
+
+class ResendTransport(EmailTransport):
+    """
+    Resend's POST /emails over pooled httpx clients.
+
+    One sync client (thread-safe, shared by the send pool) is opened up front;
+    the async client is opened on first use, in the event loop that uses it.
+    Network errors, timeouts and 5xx answers count against the circuit
+    breaker; 4xx answers (invalid address, rate limit) mean the provider is
+    up and do not.
+    """
+
+    name = "resend"
+
+    def __init__(
+        self,
+        api_key: str,
+        api_url: str = settings.RESEND_API_URL,
+        connect_timeout: float = settings.EMAIL_HTTP_CONNECT_TIMEOUT_SECONDS,
+        timeout: float = settings.EMAIL_HTTP_TIMEOUT_SECONDS,
+        max_connections: int = settings.EMAIL_HTTP_MAX_CONNECTIONS,
+        throttle: Optional[TokenBucket] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        if not api_key:
+            raise ValueError("RESEND_API_KEY not configured")
+        # Shared by every sender in the process, so concurrent sends stay within Resend's rate limit
+        self.throttle = throttle or TokenBucket(settings.RESEND_RATE_LIMIT_PER_SECOND, settings.RESEND_RATE_LIMIT_BURST)
+        self.breaker = breaker or CircuitBreaker(
+            "resend", settings.EMAIL_CIRCUIT_FAILURE_THRESHOLD, settings.EMAIL_CIRCUIT_RESET_SECONDS
+        )
+        self._client_options = dict(
+            base_url=api_url,
+            headers={"Authorization": f"Bearer {api_key}", "Accept": "application/json"},
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+        self._client = httpx.Client(**self._client_options)
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_lock = threading.Lock()
+
+    def send(self, message: dict) -> str:
+        self.breaker.allow()
+        self.throttle.acquire()
+        try:
+            response = self._client.post("/emails", json=message)
+        except httpx.HTTPError as e:
+            self.breaker.record_failure()
+            raise _network_error(e) from e
+        return self._message_id(response)
+
+    async def send_async(self, message: dict) -> str:
+        self.breaker.allow()
+        wait = self.throttle.reserve()
+        if wait:
+            await asyncio.sleep(wait)
+        try:
+            response = await self._get_async_client().post("/emails", json=message)
+        except httpx.HTTPError as e:
+            self.breaker.record_failure()
+            raise _network_error(e) from e
+        return self._message_id(response)
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None:
+            with self._async_lock:
+                if self._async_client is None:
+                    self._async_client = httpx.AsyncClient(**self._client_options)
+        return self._async_client
+
+    def _message_id(self, response: httpx.Response) -> str:
+        """ Record the answer with the breaker; return the email ID or raise the matching resend error. """
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+        try:
+            data = response.json()
+        except ValueError:
+            data = None
+        if response.is_success and isinstance(data, dict) and data.get("id"):
+            return data["id"]
+
+        # Same mapping as the Resend SDK, headers included for Retry-After
+        code = response.status_code if response.status_code >= 400 else 500
+        data = data if isinstance(data, dict) else {}
+        raise_for_code_and_type(
+            code=code,
+            error_type=data.get("name", "application_error"),
+            message=data.get("message", f"Unexpected answer: HTTP {response.status_code}"),
+            headers=dict(response.headers),
+        )
+
+    def retry_after(self) -> float:
+        return self.breaker.retry_after()
+
+    def stats(self) -> dict:
+        return {"transport": self.name, "circuit": self.breaker.snapshot()}
+
+    def close(self) -> None:
+        self._client.close()
+
+    async def aclose(self) -> None:
+        self.close()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+
+class FakeTransport(EmailTransport):
+    """
+    Accepts every message after latency_ms without sending anything.
+
+    fail_rate answers that fraction of sends with a retryable 500, to watch
+    the retry path under load. The last messages are kept in `sent`.
+    """
+
+    name = "fake"
+
+    def __init__(self, latency_ms: float = 0, fail_rate: float = 0, keep: int = 1000):
+        self.latency_ms = latency_ms
+        self.fail_rate = fail_rate
+        self.sent = deque(maxlen=keep)
+        self.sent_count = 0
+        self.failed_count = 0
+        self._lock = threading.Lock()
+
+    def send(self, message: dict) -> str:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return self._record(message)
+
+    async def send_async(self, message: dict) -> str:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return self._record(message)
+
+    def _record(self, message: dict) -> str:
+        if self.fail_rate and random.random() < self.fail_rate:
+            with self._lock:
+                self.failed_count += 1
+            raise_for_code_and_type(code=500, error_type="application_error", message="Fake transport failure")
+        email_id = f"fake-{uuid.uuid4()}"
+        with self._lock:
+            self.sent_count += 1
+            self.sent.append({"id": email_id, **message})
+        return email_id
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"transport": self.name, "sent": self.sent_count, "failed": self.failed_count}
+
+
+def create_transport() -> EmailTransport:
+    """
+    The transport selected by EMAIL_TRANSPORT ("resend" or "fake").
+
+    Raises: ValueError if unknown, or if resend is selected without RESEND_API_KEY
+    """
+    if settings.EMAIL_TRANSPORT == "fake":
+        logger.warning("EMAIL_TRANSPORT=fake: emails are recorded in memory, not delivered")
+        return FakeTransport(settings.EMAIL_FAKE_LATENCY_MS, settings.EMAIL_FAKE_FAIL_RATE)
+    if settings.EMAIL_TRANSPORT == "resend":
+        return ResendTransport(
+            settings.RESEND_API_KEY,
+            api_url=settings.RESEND_API_URL,
+            connect_timeout=settings.EMAIL_HTTP_CONNECT_TIMEOUT_SECONDS,
+            timeout=settings.EMAIL_HTTP_TIMEOUT_SECONDS,
+            max_connections=settings.EMAIL_HTTP_MAX_CONNECTIONS,
+        )
+    raise ValueError(f"Unknown EMAIL_TRANSPORT: {settings.EMAIL_TRANSPORT}")
@@ -0,0 +1,265 @@
+"""
+Background worker that delivers queued notification emails.
+
+Endpoints only write a row to notification_outbox (see
+NotificationOutboxRepository) and answer 202. This worker claims due jobs in
+batches, sends each batch concurrently through EmailService outside any
+database transaction, and records the outcome: sent (the customer is flagged
+notified in the same transaction), retried later with exponential backoff,
+or failed.
+
+Runs as a thread inside the API process (NOTIFICATION_WORKER_IN_PROCESS),
+or on its own:
+    python -m app.services.notification_worker
+Several workers may run at once; SKIP LOCKED keeps their claims apart and the
+lease hands jobs of a crashed worker to the others. Delivery is at least once.
+"""
+import logging
+import random
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from resend.exceptions import MissingRequiredFieldsError, RateLimitError, ValidationError
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.customer import Customer
+from app.models.notification_outbox import NotificationOutbox
+from app.repositories.notification_repository import NotificationOutboxRepository
+from app.services.email_service import EmailService, get_email_service
+
+logger = logging.getLogger("app.notifications")
+
+# Emails in flight at once, shared by the worker and POST /customers/notify-winners
+_send_executor = ThreadPoolExecutor(
+    max_workers=settings.NOTIFICATION_SEND_CONCURRENCY,
+    thread_name_prefix="email-send",
+)
+
+# 4xx answers that mean "fix the configuration and retry", not "this email is undeliverable"
+RETRYABLE_CLIENT_ERRORS = {401, 403, 408, 409, 429}
+
+
+def is_permanent_error(error: Exception) -> bool:
+    """ Whether sending again cannot succeed (invalid address or payload). """
+    if isinstance(error, (ValidationError, MissingRequiredFieldsError)):
+        return True
+    try:
+        code = int(getattr(error, "code", None))
+    except (TypeError, ValueError):
+        # Network errors, timeouts and unknown failures are worth another try
+        return False
+    return 400 <= code < 500 and code not in RETRYABLE_CLIENT_ERRORS
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """ Delay requested by a 429 answer's Retry-After header or an open circuit breaker, if any. """
+    if isinstance(error, CircuitOpenError):
+        return error.retry_after
+    if not isinstance(error, RateLimitError):
+        return None
+    headers = getattr(error, "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class NotificationWorker:
+    """ Claims, sends and settles notification_outbox jobs. """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        email_service_factory: Callable[[], EmailService] = get_email_service,
+        batch_size: int = settings.NOTIFICATION_BATCH_SIZE,
+        lease_seconds: float = settings.NOTIFICATION_LEASE_SECONDS,
+        max_attempts: int = settings.NOTIFICATION_MAX_ATTEMPTS,
+        backoff_base_seconds: float = settings.NOTIFICATION_BACKOFF_BASE_SECONDS,
+        backoff_max_seconds: float = settings.NOTIFICATION_BACKOFF_MAX_SECONDS,
+        poll_interval_seconds: float = settings.NOTIFICATION_POLL_INTERVAL_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.email_service_factory = email_service_factory
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+
+        self._email_service: Optional[EmailService] = None
+        self._unconfigured_logged = False
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def backoff_seconds(self, attempts: int) -> float:
+        """ Delay before the next attempt: base * 2^(attempts-1), capped, with jitter (50-100%). """
+        delay = min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def run_once(self) -> int:
+        """
+        Claim one batch of due jobs and process it.
+
+        Returns: Number of jobs claimed (0 when the queue has nothing due,
+            while email is not configured, or while the email provider's
+            circuit breaker is open)
+        """
+        # Leave due jobs unclaimed instead of spending their attempts on sends that cannot succeed
+        if self._email_service is None:
+            try:
+                self._email_service = self.email_service_factory()
+            except ValueError as e:
+                if not self._unconfigured_logged:
+                    logger.warning(f"Email is not configured, notifications stay queued: {e}")
+                    self._unconfigured_logged = True
+                return 0
+        if self._email_service.transport.retry_after() > 0:
+            return 0
+        db = self.session_factory()
+        try:
+            repo = NotificationOutboxRepository(db)
+            jobs = repo.claim(self.batch_size, self.lease_seconds)
+            if jobs:
+                self.process_batch(db, repo, jobs)
+            return len(jobs)
+        finally:
+            db.close()
+
+    def process_batch(
+        self, db: Session, repo: NotificationOutboxRepository, jobs: List[NotificationOutbox]
+    ) -> Dict[int, Tuple[str, str]]:
+        """
+        Send claimed jobs concurrently and record their outcomes.
+
+        Customers are loaded in one query, then the session is closed so no
+        transaction stays open while emails are in flight on the send pool
+        (NOTIFICATION_SEND_CONCURRENCY threads, throttled per provider).
+        Delivered jobs are settled together in one transaction; failures are
+        retried later or marked failed one by one.
+
+        Returns: job ID -> (status, message), status being sent, retrying or failed
+        """
+        results: Dict[int, Tuple[str, str]] = {}
+        sendable = []
+        for job in jobs:
+            if job.attempts > self.max_attempts:
+                # Claimed again after the lease of its last attempt expired
+                error = job.last_error or "Lease expired on the last attempt"
+                repo.mark_failed(job, error)
+                results[job.id] = ("failed", error)
+            else:
+                sendable.append(job)
+
+        customers = {
+            customer.id: customer
+            for customer in db.scalars(
+                select(Customer)
+                .where(Customer.id.in_([job.customer_id for job in sendable]))
+                .options(joinedload(Customer.organization))
+            )
+        } if sendable else {}
+        # Detach the loaded rows and release the connection before waiting on the email API
+        db.close()
+
+        outcomes = list(_send_executor.map(lambda job: self._try_send(job, customers.get(job.customer_id)), sendable))
+
+        delivered = [(job, message_id) for job, message_id, error in outcomes if error is None]
+        settled = repo.mark_sent(delivered)
+        for job, message_id in delivered:
+            if job.id in settled:
+                results[job.id] = ("sent", f"Email sent to {customers[job.customer_id].email} (ID: {message_id})")
+            else:
+                logger.warning(f"Notification {job.id} was sent but its lease had expired; another worker owns it now")
+                results[job.id] = ("sent", "Email sent; recorded by the worker that took over the job")
+
+        for job, _, error in outcomes:
+            if error is not None:
+                results[job.id] = self._handle_failure(repo, job, customers.get(job.customer_id), error)
+        return results
+
+    def _try_send(self, job: NotificationOutbox, customer: Optional[Customer]):
+        """ Send one job; returns (job, message ID, None) or (job, None, exception). """
+        try:
+            if customer is None:
+                raise LookupError("Customer no longer exists")
+            return job, self._send(job, customer), None
+        except Exception as e:
+            return job, None, e
+
+    def _send(self, job: NotificationOutbox, customer: Customer) -> str:
+        if job.kind != "winner":
+            raise ValueError(f"Unknown notification kind: {job.kind}")
+        if self._email_service is None:
+            self._email_service = self.email_service_factory()
+        return self._email_service.send_winner_email(customer)
+
+    def _handle_failure(self, repo, job: NotificationOutbox, customer: Optional[Customer], error: Exception) -> Tuple[str, str]:
+        message = f"{type(error).__name__}: {error}"[:1000]
+        recipient = customer.email if customer else f"customer {job.customer_id}"
+        if customer is None or is_permanent_error(error) or job.attempts >= self.max_attempts:
+            logger.error(f"Notification {job.id} to {recipient} failed after {job.attempts} attempt(s): {message}")
+            repo.mark_failed(job, message)
+            return "failed", message
+
+        delay = self.backoff_seconds(job.attempts)
+        requested = retry_after_seconds(error)
+        if requested is not None:
+            delay = max(delay, requested)
+        logger.warning(f"Notification {job.id} to {recipient} failed (attempt {job.attempts}), retrying in {delay:.1f}s: {message}")
+        repo.mark_retry(job, message, delay)
+        return "retrying", message
+
+    def run_forever(self) -> None:
+        """ Poll until stop(): drain full batches back to back, otherwise sleep until woken or the poll interval passes. """
+        while not self._stop.is_set():
+            try:
+                claimed = self.run_once()
+            except Exception as e:
+                logger.exception(f"Notification worker poll failed: {e}")
+                claimed = 0
+            if claimed < self.batch_size:
+                self._wake.wait(self.poll_interval_seconds)
+                self._wake.clear()
+
+    def wake(self) -> None:
+        """ Poll now instead of at the end of the interval (e.g. right after queuing a job). """
+        self._wake.set()
+
+    def start(self) -> None:
+        """ Run the worker in a daemon thread of this process. """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="notification-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """ Finish the current batch and stop. """
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+# The worker of this process (started by the API lifespan when in-process)
+notification_worker = NotificationWorker()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=settings.LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    signal.signal(signal.SIGTERM, lambda signum, frame: notification_worker.stop())
+    logger.info("Notification worker started")
+    try:
+        notification_worker.run_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,152 @@
+"""
+Cached organization lookups for public (slug-based) endpoints and for the
+read-only admin views of the current organization.
+
+A QR code campaign sends hundreds of visitors to the same slug within minutes,
+and each of them hits the landing page, the prize list and the submission
+endpoint. Instead of querying the organization (and lazy-loading its prizes)
+on every hit, we cache an immutable snapshot per slug.
+
+Concurrent misses for a slug share a single database load, and expired
+snapshots keep being served for ORG_CACHE_STALE_SECONDS while one background
+refresh runs, so a stampede on a cold or just-expired slug costs one query.
+
+Writes to an organization or its prizes must call bump_organization_version()
+before committing and invalidate_organization() after. The version feeds the
+ETags of the public endpoints; other workers pick up changes once their
+entry expires.
+
+Authenticated requests know their organization by ID (the org_id claim).
+Slugs never change, so the ID is mapped to the slug once and the snapshot
+comes from the same per-slug cache, with the same invalidation.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import update
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.organization import Organization
+from app.schemas.organization import OrganizationResponse
+from app.schemas.prize import PrizeResponse
+
+
+@dataclass(frozen=True)
+class OrganizationSnapshot:
+    """ Read-only copy of an organization's public data (and its email template). """
+    organization: OrganizationResponse
+    prizes: List[PrizeResponse]
+    version: int
+    prizes_by_place: Dict[int, PrizeResponse]
+    winner_email_template: Optional[str] = None
+
+    @property
+    def id(self) -> int:
+        return self.organization.id
+
+
+organization_cache = TTLCache(
+    maxsize=settings.ORG_CACHE_MAX_ENTRIES,
+    ttl=settings.ORG_CACHE_TTL_SECONDS,
+    stale_ttl=settings.ORG_CACHE_STALE_SECONDS,
+)
+
+# Organization ID -> slug; slugs are immutable, so nothing invalidates these
+organization_slug_cache = TTLCache(
+    maxsize=settings.ORG_CACHE_MAX_ENTRIES,
+    ttl=settings.ORG_CACHE_TTL_SECONDS,
+    stale_ttl=settings.ORG_CACHE_STALE_SECONDS,
+)
+
+
+def load_organization_snapshot(db: Session, slug: str) -> Optional[OrganizationSnapshot]:
+    """
+    Load an organization and its prizes from the database in one query.
+    Returns: OrganizationSnapshot if the slug exists, None otherwise
+    """
+    org = (
+        db.query(Organization)
+        .options(joinedload(Organization.prizes))
+        .filter(Organization.slug == slug)
+        .first()
+    )
+    if not org:
+        return None
+
+    prizes = [
+        PrizeResponse.model_validate(prize)
+        for prize in sorted(org.prizes, key=lambda prize: prize.place)
+    ]
+    return OrganizationSnapshot(
+        organization=OrganizationResponse.model_validate(org),
+        prizes=prizes,
+        version=org.version,
+        prizes_by_place={prize.place: prize for prize in prizes},
+        winner_email_template=org.winner_email_template,
+    )
+
+
+def _load_with_own_session(slug: str) -> Optional[OrganizationSnapshot]:
+    """ Loader for the cache; may run in a background thread, so it never borrows a request session. """
+    db = SessionLocal()
+    try:
+        return load_organization_snapshot(db, slug)
+    finally:
+        db.close()
+
+
+def get_organization_by_slug(slug: str) -> Optional[OrganizationSnapshot]:
+    """
+    Get an organization snapshot by slug, from cache when possible.
+
+    Unknown slugs are not cached, so creating an organization never has to
+    invalidate anything.
+    """
+    return organization_cache.get_or_load(slug, _load_with_own_session)
+
+
+def _load_slug_with_own_session(org_id: int) -> Optional[str]:
+    db = SessionLocal()
+    try:
+        return db.query(Organization.slug).filter(Organization.id == org_id).scalar()
+    finally:
+        db.close()
+
+
+def get_organization_by_id(org_id: int) -> Optional[OrganizationSnapshot]:
+    """
+    Get an organization snapshot by ID, from cache when possible.
+
+    For read-only views of the current organization; endpoints that modify
+    it load the row in their own session instead.
+    """
+    slug = organization_slug_cache.get_or_load(org_id, _load_slug_with_own_session)
+    if slug is None:
+        return None
+    return get_organization_by_slug(slug)
+
+
+async def get_organization_by_slug_async(slug: str) -> Optional[OrganizationSnapshot]:
+    """ Async get_organization_by_slug(): cache hits stay on the event loop, misses load in the threadpool. """
+    cached = organization_cache.get(slug, count_miss=False)
+    if cached is not None:
+        return cached
+    return await run_in_threadpool(get_organization_by_slug, slug)
+
+
+def bump_organization_version(db: Session, org_id: int) -> None:
+    """ Increment the organization's version in the current transaction (caller commits). """
+    db.execute(
+        update(Organization)
+        .where(Organization.id == org_id)
+        .values(version=Organization.version + 1)
+    )
+
+
+def invalidate_organization(slug: str) -> None:
+    """ Drop the cached snapshot of an organization after it (or its prizes) changed. """
+    organization_cache.invalidate(slug)
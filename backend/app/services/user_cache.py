@@ -0,0 +1,84 @@
+"""
+Cached user lookups for token authentication.
+
+Tokens carry the user ID, organization ID and token version as claims, so
+authenticated requests do not need to read the user row. The only thing
+the database is still needed for is revocation: a token is valid while its
+"ver" claim matches users.token_version. That check runs against a short
+lived snapshot per user instead of a SELECT per request.
+
+Changes to token_version must call invalidate_user(). Other workers pick
+them up within AUTH_CACHE_TTL_SECONDS.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.user import User
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """ Read-only copy of the user fields authentication depends on. """
+    id: int
+    email: str
+    organization_id: int
+    token_version: int
+
+
+# No stale window: a revoked token must stop working once the entry expires
+user_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+)
+
+
+def load_user_snapshot(db: Session, user_id: int) -> Optional[UserSnapshot]:
+    """
+    Load the authentication fields of a user.
+    Returns: UserSnapshot if the user exists, None otherwise
+    """
+    row = (
+        db.query(User.id, User.email, User.organization_id, User.token_version)
+        .filter(User.id == user_id)
+        .first()
+    )
+    if not row:
+        return None
+    return UserSnapshot(
+        id=row.id,
+        email=row.email,
+        organization_id=row.organization_id,
+        token_version=row.token_version,
+    )
+
+
+def _load_with_own_session(user_id: int) -> Optional[UserSnapshot]:
+    db = SessionLocal()
+    try:
+        return load_user_snapshot(db, user_id)
+    finally:
+        db.close()
+
+
+def get_user_snapshot(user_id: int) -> Optional[UserSnapshot]:
+    """ Get a user snapshot by ID, from cache when possible. """
+    return user_cache.get_or_load(user_id, _load_with_own_session)
+
+
+async def get_user_snapshot_async(user_id: int) -> Optional[UserSnapshot]:
+    """ Async get_user_snapshot(): cache hits stay on the event loop, misses load in the threadpool. """
+    cached = user_cache.get(user_id, count_miss=False)
+    if cached is not None:
+        return cached
+    return await run_in_threadpool(get_user_snapshot, user_id)
+
+
+def invalidate_user(user_id: int) -> None:
+    """ Drop the cached snapshot of a user after its token version changed. """
+    user_cache.invalidate(user_id)
@@ -0,0 +1,90 @@
+"""
+Shared setup for the benchmarks and checks.
+
+Every script works on throwaway organizations: registered through the API
+when it needs an admin token, inserted straight into the database when it
+only needs rows. `delete_organizations` removes them again together with
+every row that belongs to them.
+"""
+import uuid
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.organization import Organization
+from app.models.prize import Prize
+from app.repositories.stats_repository import OrganizationStatsRepository
+
+API = settings.API_V1_PREFIX
+
+# Every table with an organization_id, children first: deleted before the organizations themselves
+ORGANIZATION_TABLES = ("notification_outbox", "customers", "prizes", "organization_stats", "users")
+
+
+def _registration(prefix: str) -> dict:
+    tag = uuid.uuid4().hex[:8]
+    return {"business_name": f"{prefix}-{tag}", "email": f"{prefix}-{tag}@example.com", "password": f"{prefix}-password"}
+
+
+def register(client, prefix: str) -> tuple[dict, dict]:
+    """ Register an organization through the API (TestClient or httpx.Client); return auth headers and the organization. """
+    response = client.post(f"{API}/auth/register", json=_registration(prefix))
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return headers, client.get(f"{API}/organizations/me", headers=headers).json()
+
+
+async def register_async(client, prefix: str) -> tuple[dict, dict]:
+    """ `register` for an httpx.AsyncClient. """
+    response = await client.post(f"{API}/auth/register", json=_registration(prefix))
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return headers, (await client.get(f"{API}/organizations/me", headers=headers)).json()
+
+
+def create_organization(db, prefix: str, prizes: int = 0) -> int:
+    """ Insert an organization without an admin, with prizes for places 1..`prizes`; return its ID. """
+    tag = uuid.uuid4().hex[:8]
+    org = Organization(name=f"{prefix}-{tag}", slug=f"{prefix}-{tag}")
+    db.add(org)
+    db.flush()
+    db.add_all(Prize(organization_id=org.id, place=place, name=f"Prize {place}") for place in range(1, prizes + 1))
+    db.commit()
+    return org.id
+
+
+def insert_customers(db, org_id: int, count: int, winner_every: int = 0) -> None:
+    """
+    Bulk-insert `count` customers and count them in organization_stats.
+    With `winner_every` = n, every n-th customer is a not yet notified winner
+    whose place is its row number (1 makes every customer a winner).
+    """
+    db.execute(
+        text(
+            """
+            INSERT INTO customers (organization_id, name, email, feedback, is_winner, winner_place, is_notified)
+            SELECT :org_id, 'Customer ' || g, 'customer-' || :tag || '-' || g || '@example.com', 'Great event',
+                   winner, CASE WHEN winner THEN g END, false
+            FROM generate_series(1, :count) AS g,
+                 LATERAL (SELECT CASE WHEN :every > 0 THEN g % :every = 0 ELSE false END AS winner) AS w
+            """
+        ),
+        {"org_id": org_id, "tag": uuid.uuid4().hex[:8], "count": count, "every": winner_every},
+    )
+    winners = count // winner_every if winner_every > 0 else 0
+    OrganizationStatsRepository(db, org_id).bump(total_customers=count, winners=winners)
+    db.commit()
+
+
+def delete_organizations(org_ids: list[int]) -> None:
+    """ Delete the organizations and everything they own, in a session of its own. """
+    db = SessionLocal()
+    try:
+        params = {"org_ids": list(org_ids)}
+        for table in ORGANIZATION_TABLES:
+            db.execute(text(f"DELETE FROM {table} WHERE organization_id = ANY(:org_ids)"), params)
+        db.execute(text("DELETE FROM organizations WHERE id = ANY(:org_ids)"), params)
+        db.commit()
+    finally:
+        db.close()
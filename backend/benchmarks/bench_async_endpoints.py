@@ -0,0 +1,144 @@
+"""
+Benchmark: sync (threadpool) vs async (asyncpg) customer endpoints under load.
+
+Starts the API with uvicorn once per mode (DATABASE_ASYNC=false/true, rate
+limiting disabled), registers a throwaway organization, then fires
+POST /customers/ and GET /customers/ at a fixed concurrency and reports
+throughput, latency and failed requests: HTTP errors (e.g. 500 when the
+sync pool runs out of connections) and dropped connections counted apart.
+The client drops idle keep-alive connections before the server does, so
+a connection the server just closed is never reused (which would count
+as a dropped connection that is not the server's fault). Needs a PostgreSQL DATABASE_URL migrated to head and
+asyncpg installed; benchmark organizations are deleted afterwards.
+
+Usage (from backend/):
+    python -m benchmarks.bench_async_endpoints [--requests 2000] [--concurrency 200]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+
+import httpx
+
+from benchmarks._support import API, delete_organizations, register_async
+
+
+# uvicorn closes idle keep-alive connections after this; the client lets them go sooner
+SERVER_KEEP_ALIVE_SECONDS = 5
+CLIENT_KEEP_ALIVE_SECONDS = 1
+
+
+def start_server(port: int, async_mode: bool) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        DATABASE_ASYNC=str(async_mode).lower(),
+        RATE_LIMIT_ENABLED="false",
+        ENVIRONMENT=os.environ.get("ENVIRONMENT", "development"),
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning",
+         "--timeout-keep-alive", str(SERVER_KEEP_ALIVE_SECONDS)],
+        env=env,
+        # Failed requests are counted per endpoint; their tracebacks would drown the report
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_until_up(client: httpx.AsyncClient, timeout: float = 20) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+async def load(concurrency: int, total: int, request) -> tuple[float, list[float], Counter]:
+    """ Run `total` calls of `request(n)` with at most `concurrency` in flight; errors by kind. """
+    semaphore = asyncio.Semaphore(concurrency)
+    timings, errors = [], Counter()
+
+    async def one(n: int):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await request(n)
+                if response.status_code >= 400:
+                    errors[f"HTTP {response.status_code}"] += 1
+            except httpx.TransportError as e:
+                errors[type(e).__name__] += 1
+            timings.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(n) for n in range(total)))
+    return time.perf_counter() - start, sorted(timings), errors
+
+
+def report(mode: str, endpoint: str, elapsed: float, timings: list[float], errors: Counter) -> None:
+    p99 = timings[int(len(timings) * 0.99) - 1]
+    details = ", ".join(f"{count} {kind}" for kind, count in errors.most_common())
+    print(
+        f"{mode:>5} | {endpoint:<16} | {len(timings) / elapsed:>8.0f} req/s | "
+        f"p50 {statistics.median(timings):>7.1f} ms | p99 {p99:>7.1f} ms | errors {sum(errors.values())}"
+        + (f" ({details})" if details else "")
+    )
+
+
+async def run_mode(async_mode: bool, port: int, args) -> int:
+    mode = "async" if async_mode else "sync"
+    server = start_server(port, async_mode)
+    limits = httpx.Limits(
+        max_connections=args.concurrency,
+        max_keepalive_connections=args.concurrency,
+        keepalive_expiry=CLIENT_KEEP_ALIVE_SECONDS,
+    )
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            await wait_until_up(client)
+            headers, org = await register_async(client, "bench-async")
+            tag = uuid.uuid4().hex[:8]
+
+            def submit(n: int):
+                return client.post(f"{API}/customers/", json={
+                    "name": f"Bench {n}", "email": f"bench-{tag}-{n}@example.com",
+                    "feedback": "benchmark", "organization_slug": org["slug"],
+                })
+
+            def list_page(n: int):
+                return client.get(f"{API}/customers/", params={"cursor": "", "limit": 50}, headers=headers)
+
+            await load(args.concurrency, min(args.concurrency, args.requests), list_page)  # warm up
+            report(mode, "POST /customers/", *await load(args.concurrency, args.requests, submit))
+            report(mode, "GET /customers/", *await load(args.concurrency, args.requests, list_page))
+            return org["id"]
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per endpoint and mode")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    org_ids = []
+    try:
+        for async_mode in (False, True):
+            org_ids.append(asyncio.run(run_mode(async_mode, args.port, args)))
+    finally:
+        delete_organizations(org_ids)
+
+
+if __name__ == "__main__":
+    main()
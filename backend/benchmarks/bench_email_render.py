@@ -0,0 +1,128 @@
+"""
+Benchmark: rendering winner emails.
+
+Renders the winner email for 10,000 winners (spread over the prize places)
+three ways:
+
+  file + str.format   what EmailService did before: read the template from
+                      disk and str.format it for every email, looking the
+                      prize up by looping over the organization's prizes
+  precompiled         the Jinja2 template compiled once at import, prize
+                      from the organization snapshot's place -> prize map
+  org override        an organization's own template, compiled once in
+                      the sandbox and reused
+
+It also checks that the compiled templates escape customer input. The
+prize lookup before also cost a lazy-loading query per email; no database
+is used here, so that saving is not part of the timings.
+
+Usage (from backend/):
+    python -m benchmarks.bench_email_render [--emails 10000]
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from app.schemas.prize import PrizeResponse
+from app.services.email_templates import TEMPLATES_DIR, render_winner_email
+
+ORG_TEMPLATE = """<h1>Congratulations, {{ customer_name }}!</h1>
+<p>You won our {{ place_str }} prize: <strong>{{ prize_name }}</strong>.</p>
+<blockquote>{{ customer_feedback }}</blockquote>
+<p>See you soon, the {{ service_provider }} team</p>"""
+
+PLACES = {1: "1st", 2: "2nd", 3: "3rd"}
+
+
+def legacy_template_file() -> str:
+    """ The current template in the str.format syntax the old code used, written to a temp file. """
+    with open(os.path.join(TEMPLATES_DIR, "winner_email.html"), encoding="utf-8") as f:
+        source = f.read()
+    fd, path = tempfile.mkstemp(suffix=".html")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(re.sub(r"\{\{ (\w+) \}\}", r"{\1}", source))
+    return path
+
+
+def render_legacy(path: str, customer, organization) -> str:
+    prize_name = "a special prize"
+    for prize in organization.prizes:
+        if prize.place == customer.winner_place:
+            prize_name = prize.name
+            break
+    with open(path, "r", encoding="utf-8") as f:
+        template_content = f.read()
+    return template_content.format(
+        customer_name=customer.name,
+        customer_feedback=customer.feedback,
+        prize_name=prize_name,
+        place_str=PLACES.get(customer.winner_place, ""),
+        service_provider=organization.name,
+    )
+
+
+def render_compiled(customer, organization, prizes_by_place, override=None) -> str:
+    prize = prizes_by_place.get(customer.winner_place)
+    return render_winner_email(
+        {
+            "customer_name": customer.name,
+            "customer_feedback": customer.feedback,
+            "prize_name": prize.name if prize else "a special prize",
+            "place_str": PLACES.get(customer.winner_place, ""),
+            "service_provider": organization.name,
+        },
+        override,
+    )
+
+
+def main(emails: int):
+    prizes = [PrizeResponse(id=place, organization_id=1, place=place, name=f"Prize {place}", description=None) for place in range(1, 11)]
+    organization = SimpleNamespace(name="Bench Studio", prizes=prizes)
+    prizes_by_place = {prize.place: prize for prize in prizes}
+    customers = [
+        SimpleNamespace(name=f"Winner {n}", feedback=f"Loved it, visit #{n}!", winner_place=n % 10 + 1)
+        for n in range(emails)
+    ]
+
+    path = legacy_template_file()
+    runs = {
+        "file + str.format": lambda customer: render_legacy(path, customer, organization),
+        "precompiled": lambda customer: render_compiled(customer, organization, prizes_by_place),
+        "org override": lambda customer: render_compiled(customer, organization, prizes_by_place, ORG_TEMPLATE),
+    }
+
+    print(f"Rendering {emails} winner emails\n")
+    print(f"{'template':<18} | {'total':>8} | {'per email':>10} | {'emails/s':>9}")
+    print("-" * 55)
+    results = {}
+    try:
+        for label, render in runs.items():
+            render(customers[0])  # Compile outside the timing, as at startup
+            start = time.perf_counter()
+            for customer in customers:
+                render(customer)
+            elapsed = time.perf_counter() - start
+            results[label] = elapsed
+            print(f"{label:<18} | {elapsed:>7.3f}s | {elapsed / emails * 1_000_000:>7.1f} µs | {emails / elapsed:>9.0f}")
+    finally:
+        os.remove(path)
+    print(f"\nPrecompiled is {results['file + str.format'] / results['precompiled']:.1f}x faster than file + str.format")
+
+    hostile = SimpleNamespace(name="<b>Eve</b>", feedback="<script>alert(1)</script>", winner_place=1)
+    for label in ("precompiled", "org override"):
+        html = runs[label](hostile)
+        if "<script>" in html or "<b>Eve</b>" in html:
+            print(f"FAIL {label}: customer input rendered unescaped")
+            sys.exit(1)
+    print("Customer input is HTML-escaped in both compiled templates")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--emails", type=int, default=10_000)
+    args = parser.parse_args()
+    main(args.emails)
@@ -0,0 +1,172 @@
+"""
+Benchmark: email transports against the stub Resend API.
+
+Sends N emails to the stub (benchmarks/stub_resend_server.py) five ways:
+
+  resend SDK        resend.Emails.send, as EmailService did before: a new
+                    HTTP connection for every email
+  pooled            ResendTransport.send, one after the other over the
+                    pooled keep-alive client
+  pooled, threads   ResendTransport.send from --concurrency threads, as the
+                    notification send pool does
+  pooled, async     ResendTransport.send_async, --concurrency at a time
+  fake              FakeTransport with the same simulated latency, threads
+
+and counts the connections the stub accepted for each. Against the real API
+every new connection also costs a TLS handshake (one or more round trips),
+which loopback hides, so the gap here is the lower bound.
+
+Then checks the circuit breaker: with the stub failing every send, only
+EMAIL_CIRCUIT_FAILURE_THRESHOLD requests may reach it; the rest must fail
+fast with CircuitOpenError. The rate limit throttle is lifted for the run.
+
+Usage (from backend/):
+    python -m benchmarks.bench_email_transport [--emails 500] [--latency-ms 0] [--concurrency 8]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import resend
+
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.core.config import settings
+from app.core.throttle import TokenBucket
+from app.services.email_transport import FakeTransport, ResendTransport
+from benchmarks.stub_resend_server import StubResendServer
+
+
+def message(n: int) -> dict:
+    return {
+        "from": f"Bench <{settings.FROM_EMAIL}>",
+        "to": [f"winner-{n}@example.com"],
+        "subject": "You won!",
+        "html": "<p>Congratulations</p>",
+    }
+
+
+def unthrottled() -> TokenBucket:
+    return TokenBucket(rate=1_000_000, burst=1_000_000)
+
+
+def run_sdk(stub: StubResendServer, emails: int, concurrency: int) -> None:
+    resend.api_key = "re_stub"
+    resend.api_url = stub.url
+    for n in range(emails):
+        resend.Emails.send(message(n))
+
+
+def run_pooled(stub: StubResendServer, emails: int, concurrency: int) -> None:
+    transport = ResendTransport("re_stub", api_url=stub.url, throttle=unthrottled())
+    try:
+        for n in range(emails):
+            transport.send(message(n))
+    finally:
+        transport.close()
+
+
+def run_threads(transport, emails: int, concurrency: int) -> None:
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(lambda n: transport.send(message(n)), range(emails)))
+
+
+def run_pooled_threads(stub: StubResendServer, emails: int, concurrency: int) -> None:
+    transport = ResendTransport("re_stub", api_url=stub.url, max_connections=concurrency, throttle=unthrottled())
+    try:
+        run_threads(transport, emails, concurrency)
+    finally:
+        transport.close()
+
+
+def run_pooled_async(stub: StubResendServer, emails: int, concurrency: int) -> None:
+    async def send_all():
+        transport = ResendTransport("re_stub", api_url=stub.url, max_connections=concurrency, throttle=unthrottled())
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def send(n):
+            async with semaphore:
+                return await transport.send_async(message(n))
+
+        try:
+            await asyncio.gather(*(send(n) for n in range(emails)))
+        finally:
+            await transport.aclose()
+
+    asyncio.run(send_all())
+
+
+def check_circuit_breaker() -> list[str]:
+    stub = StubResendServer(fail_rate=1.0).start()
+    threshold = settings.EMAIL_CIRCUIT_FAILURE_THRESHOLD
+    breaker = CircuitBreaker("resend", failure_threshold=threshold, reset_timeout=60)
+    transport = ResendTransport("re_stub", api_url=stub.url, throttle=unthrottled(), breaker=breaker)
+    rejected = 0
+    try:
+        for n in range(threshold * 4):
+            try:
+                transport.send(message(n))
+            except CircuitOpenError:
+                rejected += 1
+            except resend.exceptions.ResendError:
+                pass
+    finally:
+        transport.close()
+        stub.stop()
+
+    failures = []
+    if stub.requests != threshold or rejected != threshold * 3:
+        failures.append(f"circuit breaker: {stub.requests} requests reached the failing API and {rejected} "
+                        f"were rejected, expected {threshold} and {threshold * 3}")
+    if breaker.snapshot()["state"] != CircuitBreaker.OPEN:
+        failures.append(f"circuit breaker is {breaker.snapshot()['state']}, expected open")
+    return failures
+
+
+def main(emails: int, latency_ms: float, concurrency: int):
+    runs = {
+        "resend SDK": run_sdk,
+        "pooled": run_pooled,
+        "pooled, threads": run_pooled_threads,
+        "pooled, async": run_pooled_async,
+    }
+    print(f"Sending {emails} emails, {latency_ms:.0f} ms stub latency, concurrency {concurrency}\n")
+    print(f"{'transport':<16} | {'total':>8} | {'per email':>9} | {'emails/s':>8} | {'connections':>11}")
+    print("-" * 65)
+    results = {}
+    failures = []
+    for label, run in runs.items():
+        stub = StubResendServer(latency_ms=latency_ms).start()
+        try:
+            started = time.perf_counter()
+            run(stub, emails, concurrency)
+            elapsed = time.perf_counter() - started
+        finally:
+            stub.stop()
+        if len(stub.sent) != emails:
+            failures.append(f"{label}: stub accepted {len(stub.sent)} of {emails} emails")
+        results[label] = elapsed
+        print(f"{label:<16} | {elapsed:>7.2f}s | {elapsed / emails * 1000:>6.2f} ms | {emails / elapsed:>8.0f} | {stub.connections:>11}")
+
+    fake = FakeTransport(latency_ms=latency_ms)
+    started = time.perf_counter()
+    run_threads(fake, emails, concurrency)
+    elapsed = time.perf_counter() - started
+    print(f"{'fake':<16} | {elapsed:>7.2f}s | {elapsed / emails * 1000:>6.2f} ms | {emails / elapsed:>8.0f} | {0:>11}")
+
+    print(f"\nPooled is {results['resend SDK'] / results['pooled']:.1f}x faster than the SDK one by one")
+    failures += check_circuit_breaker()
+    if failures:
+        print("\n" + "\n".join(f"FAIL {failure}" for failure in failures))
+        sys.exit(1)
+    print("Circuit breaker opened after the failure threshold and failed fast without calling the API")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--emails", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    main(args.emails, args.latency_ms, args.concurrency)
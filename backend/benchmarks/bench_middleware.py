@@ -0,0 +1,144 @@
+"""
+Benchmark: BaseHTTPMiddleware vs plain ASGI middleware.
+
+SecurityHeadersMiddleware and QueryTimingMiddleware used to be
+BaseHTTPMiddleware subclasses, which wrap every request in a task group and
+relay the response body through a memory stream. This drives the app
+in-process (httpx ASGITransport, no network or server) once with the former
+BaseHTTPMiddleware versions, reproduced below, and once with the current ASGI
+ones, and reports requests per second on GET / and GET /customers/.
+Rate limiting and request logging are disabled and Server-Timing is on in
+both, so only the middleware differs. Needs a PostgreSQL DATABASE_URL migrated to head; the benchmark
+organization is deleted afterwards.
+
+Usage (from backend/):
+    python -m benchmarks.bench_middleware [--requests 2000] [--concurrency 20]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import time
+
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("LOG_REQUESTS", "false")
+# The legacy middleware below always adds the header
+os.environ.setdefault("SERVER_TIMING_ENABLED", "true")
+
+import httpx
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.database import SessionLocal
+from app.core.query_stats import server_timing, start_request
+from app.main import app
+from app.middleware.query_timing import QueryTimingMiddleware
+from app.middleware.security import SecurityHeadersMiddleware
+from benchmarks._support import API, delete_organizations, insert_customers, register_async
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    """ SecurityHeadersMiddleware as it was written before (BaseHTTPMiddleware). """
+
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        for name, value in SecurityHeadersMiddleware.HEADERS.items():
+            response.headers[name] = value
+        return response
+
+
+class LegacyQueryTimingMiddleware(BaseHTTPMiddleware):
+    """ QueryTimingMiddleware as it was written before (BaseHTTPMiddleware). """
+
+    async def dispatch(self, request, call_next):
+        stats = start_request(request.scope)
+        start = time.perf_counter()
+        response = await call_next(request)
+        response.headers["Server-Timing"] = server_timing(stats, time.perf_counter() - start)
+        return response
+
+
+VARIANTS = {
+    "BaseHTTPMiddleware": {
+        SecurityHeadersMiddleware: LegacySecurityHeadersMiddleware,
+        QueryTimingMiddleware: LegacyQueryTimingMiddleware,
+    },
+    "ASGI": {},
+}
+
+
+def use_variant(replacements: dict) -> None:
+    """ Swap middleware classes and make Starlette rebuild its stack on the next request. """
+    originals = {legacy: current for current, legacy in VARIANTS["BaseHTTPMiddleware"].items()}
+    middleware = []
+    for entry in app.user_middleware:
+        cls = originals.get(entry.cls, entry.cls)
+        middleware.append(Middleware(replacements.get(cls, cls), *entry.args, **entry.kwargs))
+    app.user_middleware = middleware
+    app.middleware_stack = None
+
+
+async def register(client: httpx.AsyncClient) -> tuple[dict, int]:
+    """ Create an organization with an admin and some customers; return auth headers and org ID. """
+    headers, org = await register_async(client, "middleware-bench")
+    db = SessionLocal()
+    try:
+        insert_customers(db, org["id"], 50)
+    finally:
+        db.close()
+    return headers, org["id"]
+
+
+async def run(client: httpx.AsyncClient, path: str, headers: dict, requests: int, concurrency: int) -> tuple[float, float]:
+    """ Fire `requests` GETs with `concurrency` workers; return req/s and median latency in ms. """
+    latencies = []
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return requests / elapsed, statistics.median(latencies) * 1000
+
+
+async def main(requests: int, concurrency: int):
+    # Per-request client logs and slow-query warnings (queries queue behind the GIL here) drown the table
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("app.sql").setLevel(logging.ERROR)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        headers, org_id = await register(client)
+        try:
+            targets = [("GET /", "/", {}), ("GET /customers/", f"{API}/customers/", headers)]
+            print(f"{requests} requests per run, concurrency {concurrency}\n")
+            print(f"{'endpoint':<16} | {'middleware':<18} | {'req/s':>8} | {'p50 ms':>7}")
+            print("-" * 58)
+            for label, path, request_headers in targets:
+                results = {}
+                for variant, replacements in VARIANTS.items():
+                    use_variant(replacements)
+                    # Warm up the rebuilt stack, caches and pool
+                    await run(client, path, request_headers, min(200, requests), concurrency)
+                    rate, p50 = await run(client, path, request_headers, requests, concurrency)
+                    results[variant] = rate
+                    print(f"{label:<16} | {variant:<18} | {rate:>8.0f} | {p50:>7.2f}")
+                gain = results["ASGI"] / results["BaseHTTPMiddleware"] - 1
+                print(f"{'':<16} | {'ASGI vs Base':<18} | {gain:>+8.0%} |")
+        finally:
+            use_variant(VARIANTS["ASGI"])
+            delete_organizations([org_id])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
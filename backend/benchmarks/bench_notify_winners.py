@@ -0,0 +1,140 @@
+"""
+Benchmark: notifying winners one by one vs POST /customers/notify-winners.
+
+Starts the stub Resend API (benchmarks/stub_resend_server.py) with a fixed
+latency per send, registers a throwaway organization with N winners, and
+times two ways to email them all:
+
+  sequential  one Resend round trip after the other, as clicking "notify"
+              per winner did when the request sent the email itself
+  bulk        one POST /customers/notify-winners: one query to queue them,
+              concurrent sends of the first NOTIFICATION_BATCH_SIZE, one
+              transaction to flag them notified; the rest stay queued
+  + worker    then the notification worker sends the queued rest
+
+The bulk call must answer "sent" for the first batch and "queued" for the
+rest. Once the worker has drained the outbox, every winner must have
+exactly one email and is_notified set, and be counted in the organization
+stats.
+The stub has no rate limit, so RESEND_RATE_LIMIT_PER_SECOND is raised for
+the run unless set. With --fake the emails go to the in-memory fake
+transport (EMAIL_TRANSPORT=fake) instead, with the same latency, to
+load-test without any HTTP. Needs a PostgreSQL DATABASE_URL migrated to
+head; the organization is deleted afterwards.
+
+Usage (from backend/):
+    python -m benchmarks.bench_notify_winners [--winners 40] [--latency-ms 100] [--concurrency 8] [--batch-size 20] [--fake]
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+
+def configure(concurrency: int, batch_size: int, fake: bool) -> None:
+    os.environ["NOTIFICATION_WORKER_IN_PROCESS"] = "false"
+    os.environ["NOTIFICATION_BATCH_SIZE"] = str(batch_size)
+    os.environ["EMAIL_TRANSPORT"] = "fake" if fake else "resend"
+    os.environ["NOTIFICATION_SEND_CONCURRENCY"] = str(concurrency)
+    os.environ.setdefault("RESEND_RATE_LIMIT_PER_SECOND", "1000")
+    os.environ.setdefault("RESEND_RATE_LIMIT_BURST", str(concurrency))
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    os.environ.setdefault("LOG_REQUESTS", "false")
+
+
+def main(winners: int, latency_ms: float, concurrency: int, batch_size: int, fake: bool):
+    configure(concurrency, batch_size, fake)
+    # Settings are read at import time
+    from fastapi.testclient import TestClient
+    from sqlalchemy import select
+
+    from app.core.config import settings
+    from app.core.database import SessionLocal
+    from app.main import app
+    from app.models.customer import Customer
+    from app.services.email_service import EmailService, get_email_service
+    from app.services.notification_worker import NotificationWorker
+    from benchmarks._support import delete_organizations, insert_customers, register
+    from benchmarks.stub_resend_server import StubResendServer
+
+    api = settings.API_V1_PREFIX
+    stub = StubResendServer(latency_ms=latency_ms).start()
+    settings.RESEND_API_KEY = settings.RESEND_API_KEY or "re_stub"
+    settings.RESEND_API_URL = stub.url
+    settings.EMAIL_FAKE_LATENCY_MS = latency_ms
+    # Fake: every email of the bulk call is recorded by the process's transport
+    sent = get_email_service().transport.sent if fake else stub.sent
+
+    client = TestClient(app)
+    headers, org = register(client, "notify-bench")
+    db = SessionLocal()
+    insert_customers(db, org["id"], winners, winner_every=1)
+
+    failures = []
+    try:
+        # Sequential: one blocking send per winner
+        customers = db.scalars(select(Customer).where(Customer.organization_id == org["id"])).all()
+        service = EmailService()
+        started = time.perf_counter()
+        for customer in customers:
+            service.send_winner_email(customer)
+        sequential = time.perf_counter() - started
+        service.transport.close()
+        db.close()
+        sent.clear()
+
+        # Bulk endpoint
+        started = time.perf_counter()
+        response = client.post(f"{api}/customers/notify-winners", headers=headers)
+        bulk = time.perf_counter() - started
+        response.raise_for_status()
+        body = response.json()
+
+        inline = min(winners, batch_size)
+        statuses = [result["status"] for result in body["results"]]
+        if statuses != ["sent"] * inline + ["queued"] * (winners - inline):
+            failures.append(f"bulk answer: {body['sent']} sent, {body['queued']} queued, {body['retrying']} retrying, "
+                            f"{body['failed']} failed, expected {inline} sent and {winners - inline} queued")
+
+        # The rest, by the worker
+        worker = NotificationWorker()
+        while worker.run_once():
+            pass
+        total = time.perf_counter() - started
+
+        deliveries = Counter(email["to"][0] for email in sent)
+        if len(deliveries) != winners or set(deliveries.values()) != {1}:
+            failures.append(f"{len(sent)} emails to {len(deliveries)} recipients, expected one each for {winners}")
+        stats = client.get(f"{api}/customers/stats", headers=headers).json()
+        if stats["notified"] != winners:
+            failures.append(f"stats count {stats['notified']} notified, expected {winners}")
+        again = client.post(f"{api}/customers/notify-winners", headers=headers).json()
+        if again["results"]:
+            failures.append(f"second call found {len(again['results'])} winners still to notify")
+    finally:
+        delete_organizations([org["id"]])
+        stub.stop()
+
+    target = "fake transport" if fake else "Resend call"
+    print(f"{winners} winners, {latency_ms:.0f} ms per {target}, send concurrency {concurrency}\n")
+    print(f"{'mode':<12} | {'total':>8} | {'per winner':>10}")
+    print("-" * 37)
+    print(f"{'sequential':<12} | {sequential:>7.2f}s | {sequential / winners * 1000:>7.1f} ms")
+    print(f"{'bulk':<12} | {bulk:>7.2f}s | {bulk / inline * 1000:>7.1f} ms   ({inline} sent inline)")
+    print(f"{'+ worker':<12} | {total:>7.2f}s | {total / winners * 1000:>7.1f} ms")
+    print(f"\nBulk notification is {sequential / total:.1f}x faster; the request took {bulk:.2f}s")
+    if failures:
+        print("\n" + "\n".join(f"FAIL {failure}" for failure in failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--winners", type=int, default=40)
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=20, help="NOTIFICATION_BATCH_SIZE: winners emailed within the request")
+    parser.add_argument("--fake", action="store_true", help="send through the fake transport instead of the stub API")
+    args = parser.parse_args()
+    main(args.winners, args.latency_ms, args.concurrency, args.batch_size, args.fake)
@@ -0,0 +1,84 @@
+"""
+Benchmark: ORDER BY random() draw vs the in-memory eligible pool sampler.
+
+Seeds a throwaway organization with N customers for each size, then times
+repeated draws with both strategies. Needs a PostgreSQL DATABASE_URL with the
+schema migrated (alembic upgrade head). The benchmark organization is deleted
+afterwards.
+
+Usage (from backend/):
+    python -m benchmarks.bench_random_draw [sizes...] [--draws 50]
+
+Example:
+    python -m benchmarks.bench_random_draw 1000 10000 100000
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import text
+
+from app.core.database import SessionLocal
+from app.repositories.customer_repository import CustomerRepository
+from app.services.draw_sampler import eligible_pools
+from benchmarks._support import create_organization, delete_organizations, insert_customers
+
+
+def seed(db, size: int) -> int:
+    """ Create a benchmark organization with `size` customers and return its ID. """
+    org_id = create_organization(db, "bench")
+    insert_customers(db, org_id, size)
+    db.execute(text("ANALYZE customers"))
+    return org_id
+
+
+def time_draws(draw, draws: int) -> list[float]:
+    timings = []
+    for _ in range(draws):
+        start = time.perf_counter()
+        winner = draw()
+        timings.append((time.perf_counter() - start) * 1000)
+        assert winner is not None
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sizes", nargs="*", type=int, default=[1_000, 10_000, 50_000, 100_000])
+    parser.add_argument("--draws", type=int, default=50, help="draws per strategy and size")
+    args = parser.parse_args()
+
+    print(f"{'entries':>10} | {'ORDER BY random() p50':>22} | {'pool build':>10} | {'pool draw p50':>13} | {'speedup':>7}")
+    print("-" * 76)
+
+    db = SessionLocal()
+    try:
+        for size in args.sizes:
+            org_id = seed(db, size)
+            try:
+                repo = CustomerRepository(db, organization_id=org_id)
+                eligible_pools.clear()
+
+                baseline = time_draws(repo._query_random_non_winner, args.draws)
+
+                start = time.perf_counter()
+                repo.get_random_non_winner()  # first draw loads the pool
+                build_ms = (time.perf_counter() - start) * 1000
+
+                sampled = time_draws(repo.get_random_non_winner, args.draws)
+
+                baseline_p50 = statistics.median(baseline)
+                sampled_p50 = statistics.median(sampled)
+                print(
+                    f"{size:>10} | {baseline_p50:>19.2f} ms | {build_ms:>7.1f} ms | "
+                    f"{sampled_p50:>10.3f} ms | {baseline_p50 / sampled_p50:>6.1f}x"
+                )
+            finally:
+                db.rollback()
+                delete_organizations([org_id])
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
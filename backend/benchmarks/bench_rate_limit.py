@@ -0,0 +1,146 @@
+"""
+Benchmark: rate limiter storage cost and accuracy across processes.
+
+1. Storage: time per hit of the sliding window counter in each storage,
+   all hits on one key and spread over many keys (clients). The cost must
+   not grow with the number of hits or keys.
+2. Per request: requests per second of a minimal FastAPI route with and
+   without @limiter.limit, driven in-process (httpx ASGITransport); the
+   difference is the limiter's overhead per request, slowapi included.
+3. Across processes: --processes workers hit one "10/minute" key at once,
+   like uvicorn workers receiving one client's requests. memory:// lets
+   each process allow 10; a shared storage must allow exactly 10 in total.
+
+Storages: memory:// (per process, the previous default), sqlite:// (a
+temporary WAL database) and, with --redis-url, Redis (needs the redis
+package and a server).
+
+Usage (from backend/):
+    python -m benchmarks.bench_rate_limit [--hits 20000] [--requests 3000] [--processes 4] [--redis-url redis://localhost:6379]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import SlidingWindowCounterRateLimiter
+from slowapi import Limiter, _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+from slowapi.util import get_remote_address
+
+# Registers the sqlite:// storage scheme
+from app.core import rate_limit_storage  # noqa: F401
+
+STRATEGY = "sliding-window-counter"
+
+
+def storage_hit_cost(uri: str, hits: int, keys: int) -> float:
+    """ Microseconds per hit of a limit that is never exceeded. """
+    limiter = SlidingWindowCounterRateLimiter(storage_from_string(uri))
+    item = parse(f"{hits * 10}/minute")
+    clients = [f"10.0.{n // 256}.{n % 256}" for n in range(keys)]
+    limiter.hit(item, "warmup")
+    started = time.perf_counter()
+    for n in range(hits):
+        limiter.hit(item, clients[n % keys])
+    return (time.perf_counter() - started) / hits * 1_000_000
+
+
+def make_app(uri: str | None) -> FastAPI:
+    """ One route, limited in the given storage (or not limited with None). """
+    app = FastAPI()
+    if uri is None:
+        @app.get("/ping")
+        async def ping(request: Request):
+            return {"ok": True}
+        return app
+
+    limiter = Limiter(key_func=get_remote_address, storage_uri=uri, strategy=STRATEGY)
+    app.state.limiter = limiter
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+    @app.get("/ping")
+    @limiter.limit("1000000/minute")
+    async def ping(request: Request):
+        return {"ok": True}
+    return app
+
+
+async def requests_per_second(app: FastAPI, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(100):
+            (await client.get("/ping")).raise_for_status()
+        started = time.perf_counter()
+        for _ in range(requests):
+            (await client.get("/ping")).raise_for_status()
+        return requests / (time.perf_counter() - started)
+
+
+def hit_shared_key(uri: str, attempts: int, start_at: float) -> int:
+    """ Run in a worker process: hit one "10/minute" key, return how many were allowed. """
+    limiter = SlidingWindowCounterRateLimiter(storage_from_string(uri))
+    item = parse("10/minute")
+    while time.time() < start_at:
+        time.sleep(0.001)
+    return sum(limiter.hit(item, "one-client") for _ in range(attempts))
+
+
+def allowed_across_processes(uri: str, processes: int) -> int:
+    context = multiprocessing.get_context("spawn")
+    start_at = time.time() + 2  # Let every process start and connect first
+    with context.Pool(processes) as pool:
+        return sum(pool.starmap(hit_shared_key, [(uri, 30, start_at)] * processes))
+
+
+def main(hits: int, requests: int, processes: int, redis_url: str | None):
+    directory = tempfile.mkdtemp(prefix="rate-limit-bench-")
+    storages = {"memory": "memory://", "sqlite": f"sqlite:///{os.path.join(directory, 'limits.db')}"}
+    if redis_url:
+        storages["redis"] = redis_url
+
+    print(f"Sliding window counter, {hits} hits per run\n")
+    print(f"{'storage':<8} | {'1 key':>10} | {'1000 keys':>10}")
+    print("-" * 34)
+    for name, uri in storages.items():
+        single = storage_hit_cost(uri, hits, 1)
+        spread = storage_hit_cost(uri, hits, 1000)
+        print(f"{name:<8} | {single:>7.1f} µs | {spread:>7.1f} µs")
+
+    print(f"\n{requests} requests to a minimal route\n")
+    print(f"{'limiter':<8} | {'req/s':>8} | {'overhead':>12}")
+    print("-" * 34)
+    baseline = asyncio.run(requests_per_second(make_app(None), requests))
+    print(f"{'none':<8} | {baseline:>8.0f} |")
+    for name, uri in storages.items():
+        rate = asyncio.run(requests_per_second(make_app(uri), requests))
+        print(f"{name:<8} | {rate:>8.0f} | {(1 / rate - 1 / baseline) * 1_000_000:>6.0f} µs/req")
+
+    print(f"\n{processes} processes, one client, limit 10/minute\n")
+    failures = []
+    for name, uri in storages.items():
+        allowed = allowed_across_processes(uri, processes)
+        print(f"{name:<8} | {allowed:>3} requests allowed")
+        if name != "memory" and allowed != 10:
+            failures.append(f"{name} allowed {allowed} requests across {processes} processes, expected 10")
+    if failures:
+        print("\n" + "\n".join(f"FAIL {failure}" for failure in failures))
+        sys.exit(1)
+    print("\nShared storages enforce the limit across processes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hits", type=int, default=20_000)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--redis-url", default=None, help="also benchmark a Redis storage, e.g. redis://localhost:6379")
+    args = parser.parse_args()
+    main(args.hits, args.requests, args.processes, args.redis_url)
@@ -0,0 +1,146 @@
+"""
+Notification check: queued winner emails are delivered by the outbox worker.
+
+Starts the stub Resend API (benchmarks/stub_resend_server.py) in-process,
+registers a throwaway organization with winners whose addresses script
+server errors, a rate limit and an invalid address, queues their
+notifications through POST /customers/notify-winner (expecting 202 without
+any email sent yet), then runs two workers against the outbox until it is
+drained. Checks that every deliverable winner got exactly one email and is
+flagged notified, that retried jobs recorded their attempts, and that the
+invalid address failed without retries. Exit code 1 on any mismatch.
+Needs a PostgreSQL DATABASE_URL migrated to head; the organization is
+deleted afterwards.
+
+Usage (from backend/):
+    python -m benchmarks.check_notification_outbox [--winners 20]
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from collections import Counter
+
+os.environ["NOTIFICATION_WORKER_IN_PROCESS"] = "false"
+os.environ.setdefault("RESEND_RATE_LIMIT_PER_SECOND", "1000")  # The stub has no rate limit
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("LOG_REQUESTS", "false")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select, text
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.main import app
+from app.models.customer import Customer
+from app.models.notification_outbox import NotificationOutbox
+from app.services.notification_worker import NotificationWorker
+from benchmarks._support import API, delete_organizations, register
+from benchmarks.stub_resend_server import StubResendServer
+
+
+def register_winners(client: TestClient, emails: list[str]) -> tuple[dict, int, list[int]]:
+    """ Create an organization with one winner per email; return auth headers, org ID and customer IDs. """
+    headers, org = register(client, "outbox-check")
+    customer_ids = []
+    for email in emails:
+        response = client.post(
+            f"{API}/customers/",
+            json={"name": email.split("@")[0], "email": email, "feedback": "Great event", "organization_slug": org["slug"]},
+        )
+        response.raise_for_status()
+        customer_id = response.json()["id"]
+        client.put(f"{API}/customers/{customer_id}", json={"is_winner": True}, headers=headers).raise_for_status()
+        customer_ids.append(customer_id)
+    return headers, org["id"], customer_ids
+
+
+def drain(workers: list[NotificationWorker], org_id: int, timeout: float) -> None:
+    """ Run the workers in threads until no job of the organization is open. """
+    for worker in workers:
+        worker.start()
+    deadline = time.monotonic() + timeout
+    try:
+        while time.monotonic() < deadline:
+            db = SessionLocal()
+            open_jobs = db.scalar(
+                text("SELECT count(*) FROM notification_outbox WHERE organization_id = :org_id AND status IN ('pending', 'sending')"),
+                {"org_id": org_id},
+            )
+            db.close()
+            if open_jobs == 0:
+                return
+            time.sleep(0.1)
+        raise TimeoutError(f"Outbox not drained after {timeout:.0f}s")
+    finally:
+        for worker in workers:
+            worker.stop()
+
+
+def main(winners: int):
+    stub = StubResendServer().start()
+    settings.RESEND_API_KEY = settings.RESEND_API_KEY or "re_stub"
+    settings.RESEND_API_URL = stub.url
+
+    tag = uuid.uuid4().hex[:6]
+    scripted = [f"winner-{tag}+retry@example.com", f"winner-{tag}+ratelimit@example.com", f"winner-{tag}+invalid@example.com"]
+    emails = [f"winner-{tag}-{n}@example.com" for n in range(winners)] + scripted
+
+    client = TestClient(app)
+    headers, org_id, customer_ids = register_winners(client, emails)
+    failures = []
+    try:
+        started = time.perf_counter()
+        for customer_id in customer_ids + customer_ids[:3]:  # The first three twice: must not queue twice
+            response = client.post(f"{API}/customers/notify-winner", json={"customer_id": customer_id}, headers=headers)
+            if response.status_code != 202:
+                failures.append(f"notify-winner answered {response.status_code}: {response.text}")
+        queue_ms = (time.perf_counter() - started) * 1000 / (len(customer_ids) + 3)
+        if stub.requests:
+            failures.append(f"{stub.requests} email(s) sent during the requests, expected none")
+
+        workers = [NotificationWorker(backoff_base_seconds=0.05, backoff_max_seconds=0.5, poll_interval_seconds=0.05) for _ in range(2)]
+        drain_started = time.perf_counter()
+        drain(workers, org_id, timeout=60)
+        drain_seconds = time.perf_counter() - drain_started
+
+        db = SessionLocal()
+        jobs = db.scalars(select(NotificationOutbox).where(NotificationOutbox.organization_id == org_id)).all()
+        customers = {c.id: c for c in db.scalars(select(Customer).where(Customer.organization_id == org_id))}
+        db.close()
+
+        by_email = {customers[job.customer_id].email: job for job in jobs}
+        deliveries = Counter(email["to"][0] for email in stub.sent)
+        if len(jobs) != len(emails):
+            failures.append(f"{len(jobs)} outbox jobs for {len(emails)} winners")
+        for email, job in by_email.items():
+            customer = customers[job.customer_id]
+            invalid = "+invalid" in email
+            expected_status, expected_attempts = ("failed", 1) if invalid else ("sent", 1)
+            if "+retry" in email:
+                expected_attempts = 3
+            elif "+ratelimit" in email:
+                expected_attempts = 2
+            if job.status != expected_status or job.attempts != expected_attempts:
+                failures.append(f"{email}: {job.status} after {job.attempts} attempt(s), expected {expected_status} after {expected_attempts}")
+            if customer.is_notified == invalid or deliveries[email] != (0 if invalid else 1):
+                failures.append(f"{email}: notified={customer.is_notified}, emails received={deliveries[email]}")
+    finally:
+        delete_organizations([org_id])
+        stub.stop()
+
+    print(f"Queued {len(emails)} notifications at {queue_ms:.1f} ms per request (202, nothing sent)")
+    print(f"Two workers drained the outbox in {drain_seconds:.2f}s: {len(stub.sent)} delivered, "
+          f"{stub.requests} Resend calls including scripted failures")
+    if failures:
+        print("\n" + "\n".join(f"FAIL {failure}" for failure in failures))
+        sys.exit(1)
+    print("Every winner got exactly one email; retries, rate limit and invalid address handled as expected")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--winners", type=int, default=20)
+    args = parser.parse_args()
+    main(args.winners)
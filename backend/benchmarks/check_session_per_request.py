@@ -0,0 +1,82 @@
+"""
+Connection check: an authenticated request holds at most one pooled connection.
+
+Registers a throwaway organization, then calls the authenticated admin
+endpoints through the ASGI app while tracking pool checkouts and checkins.
+Auth and handler share one session, so any request holding two connections
+at the same time fails the check (exit code 1). A session that commits and
+then refreshes checks its connection out again; that still counts as one.
+Needs a PostgreSQL DATABASE_URL migrated to head; the organization is
+deleted afterwards.
+
+Usage (from backend/):
+    python -m benchmarks.check_session_per_request
+"""
+import sys
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.core.database import engine
+from app.main import app
+from benchmarks._support import API, delete_organizations, register
+
+
+def register_with_prize(client: TestClient) -> tuple[dict, int]:
+    """ Create an organization with an admin and one prize; return auth headers and org ID. """
+    headers, org = register(client, "session-check")
+    client.post(f"{API}/organizations/me/prizes", json={"place": 1, "name": "Prize 1"}, headers=headers).raise_for_status()
+    return headers, org["id"]
+
+
+def main():
+    client = TestClient(app)
+    headers, org_id = register_with_prize(client)
+    pool = {"checkouts": 0, "held": 0, "peak": 0}
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool["checkouts"] += 1
+        pool["held"] += 1
+        pool["peak"] = max(pool["peak"], pool["held"])
+
+    def on_checkin(dbapi_connection, connection_record):
+        pool["held"] -= 1
+
+    requests = [
+        ("GET", "/organizations/me", None),
+        ("PUT", "/organizations/me", {"primary_color": "#000000"}),
+        ("GET", "/organizations/me/prizes", None),
+        ("POST", "/organizations/me/prizes", {"place": 2, "name": "Prize 2"}),
+        ("GET", "/customers/", None),
+        ("GET", "/customers/stats", None),
+        ("GET", "/customers/winner/random", None),
+        ("GET", "/metrics/cache", None),
+    ]
+
+    failures = 0
+    event.listen(engine, "checkout", on_checkout)
+    event.listen(engine, "checkin", on_checkin)
+    try:
+        for method, path, body in requests:
+            pool.update(checkouts=0, held=0, peak=0)
+            response = client.request(method, f"{API}{path}", json=body, headers=headers)
+            # 404 is the expected answer of a random draw with no customers
+            ok = response.status_code in (200, 404) and pool["peak"] <= 1 and pool["held"] == 0
+            failures += not ok
+            print(
+                f"[{'ok' if ok else 'FAIL':>4}] {method:<4} {path:<28} {response.status_code}  "
+                f"peak connections: {pool['peak']}  checkouts: {pool['checkouts']}"
+            )
+    finally:
+        event.remove(engine, "checkout", on_checkout)
+        event.remove(engine, "checkin", on_checkin)
+        delete_organizations([org_id])
+
+    if failures:
+        print(f"\n{failures} request(s) failed or held more than one connection")
+        sys.exit(1)
+    print("\nEvery request held at most one pooled connection")
+
+
+if __name__ == "__main__":
+    main()
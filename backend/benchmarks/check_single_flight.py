@@ -0,0 +1,98 @@
+"""
+Concurrency check: one load per key per refresh in TTLCache.get_or_load.
+
+Simulates a QR-code stampede: many threads request the same slug at once,
+first against a cold cache, then against an expired (stale) entry. The
+loader stands in for the database query and counts its calls. Exits with
+code 1 if any phase issues more than one load per key.
+
+Usage (from backend/):
+    python -m benchmarks.check_single_flight [--threads 200] [--load-ms 100]
+"""
+import argparse
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.cache import TTLCache
+
+
+class CountingLoader:
+    """ Fake database load that takes load_ms and counts calls per key. """
+
+    def __init__(self, load_ms: float):
+        self.load_seconds = load_ms / 1000
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        self.version = 0
+
+    def __call__(self, key):
+        with self._lock:
+            self.calls[key] += 1
+        time.sleep(self.load_seconds)
+        return f"{key}-v{self.version}"
+
+
+def stampede(cache: TTLCache, loader: CountingLoader, keys: list, threads: int) -> list:
+    """ Release `threads` concurrent get_or_load calls spread over `keys` at once. """
+    barrier = threading.Barrier(threads)
+
+    def request(n: int):
+        barrier.wait()
+        return cache.get_or_load(keys[n % len(keys)], loader)
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(request, range(threads)))
+
+
+def check(phase: str, loader: CountingLoader, expected: Counter) -> bool:
+    ok = loader.calls == expected
+    print(f"[{'ok' if ok else 'FAIL':>4}] {phase}: loads per key {dict(loader.calls)} (expected {dict(expected)})")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=200)
+    parser.add_argument("--load-ms", type=float, default=100)
+    args = parser.parse_args()
+
+    keys = ["spring-fair", "lash-studio"]
+    ttl = 0.5
+    cache = TTLCache(maxsize=16, ttl=ttl, stale_ttl=60)
+    loader = CountingLoader(args.load_ms)
+    passed = True
+
+    # 1. Cold cache: every thread misses at once, one load per key is shared
+    results = stampede(cache, loader, keys, args.threads)
+    passed &= check("cold stampede", loader, Counter({key: 1 for key in keys}))
+    passed &= all(result.endswith("-v0") for result in results)
+
+    # 2. Warm cache: no loads at all
+    stampede(cache, loader, keys, args.threads)
+    passed &= check("warm stampede", loader, Counter({key: 1 for key in keys}))
+
+    # 3. Expired entry: stale values are served immediately, one background refresh per key
+    time.sleep(ttl + 0.05)
+    loader.version = 1
+    start = time.perf_counter()
+    results = stampede(cache, loader, keys, args.threads)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    time.sleep(args.load_ms / 1000 * 3)
+    passed &= check("stale stampede", loader, Counter({key: 2 for key in keys}))
+    served_stale = all(result.endswith("-v0") for result in results)
+    print(f"[{'ok' if served_stale else 'FAIL':>4}] stale stampede served stale values in {elapsed_ms:.1f} ms without waiting for the load")
+    passed &= served_stale
+
+    refreshed = all(cache.get(key).endswith("-v1") for key in keys)
+    print(f"[{'ok' if refreshed else 'FAIL':>4}] background refresh replaced the stale entries")
+    passed &= refreshed
+
+    print(f"\ncache stats: {cache.stats()}")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
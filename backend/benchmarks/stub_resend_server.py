@@ -0,0 +1,146 @@
+"""
+Local stand-in for the Resend email API (POST /emails).
+
+Accepts sends like Resend and records them instead of delivering anything,
+so the notification worker can be exercised end to end. Point the API or
+worker at it with RESEND_API_URL=http://127.0.0.1:<port> and any non-empty
+RESEND_API_KEY. Failures are scripted through the recipient address:
+
+    anything+retry@...      500 application_error twice, then accepted
+    anything+ratelimit@...  429 rate_limit_exceeded once (Retry-After: 1), then accepted
+    anything+invalid@...    422 validation_error, every time
+
+GET /emails lists the accepted emails as JSON. Connections are kept alive
+(HTTP/1.1) and counted in `connections`.
+
+Usage (from backend/):
+    python -m benchmarks.stub_resend_server [--port 8025] [--latency-ms 50] [--fail-rate 0.1]
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SCRIPTED_FAILURES = {
+    "+retry": (2, 500, "application_error", {}),
+    "+ratelimit": (1, 429, "rate_limit_exceeded", {"Retry-After": "1"}),
+    "+invalid": (None, 422, "validation_error", {}),
+}
+
+
+class StubResendServer:
+    """ Threaded HTTP server imitating POST /emails; start() it in-process or run the module. """
+
+    def __init__(self, port: int = 0, latency_ms: float = 0, fail_rate: float = 0):
+        self.latency_ms = latency_ms
+        self.fail_rate = fail_rate
+        self.sent = []
+        self.requests = 0
+        self.connections = 0
+        self._attempts = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubResendServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def answer(self, payload: dict) -> tuple[int, dict, dict]:
+        """ Status, JSON body and extra headers for one POST /emails. """
+        recipient = (payload.get("to") or [""])[0]
+        with self._lock:
+            self.requests += 1
+            self._attempts[recipient] += 1
+            attempt = self._attempts[recipient]
+
+        for tag, (times, status, error, headers) in SCRIPTED_FAILURES.items():
+            if tag in recipient and (times is None or attempt <= times):
+                return status, {"statusCode": status, "name": error, "message": f"Scripted {error}"}, headers
+        if self.fail_rate and random.random() < self.fail_rate:
+            return 500, {"statusCode": 500, "name": "application_error", "message": "Random failure"}, {}
+
+        email_id = str(uuid.uuid4())
+        with self._lock:
+            self.sent.append({"id": email_id, **payload})
+        return 200, {"id": email_id}, {}
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, like the real API, so pooled clients reuse their connections
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; don't let Nagle hold the body back
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if self.path.rstrip("/") != "/emails":
+                    self._reply(404, {"statusCode": 404, "name": "not_found", "message": "Not found"})
+                    return
+                if stub.latency_ms:
+                    time.sleep(stub.latency_ms / 1000)
+                status, body, headers = stub.answer(payload)
+                self._reply(status, body, headers)
+
+            def do_GET(self):
+                if self.path.rstrip("/") != "/emails":
+                    self._reply(404, {"statusCode": 404, "name": "not_found", "message": "Not found"})
+                    return
+                with stub._lock:
+                    self._reply(200, {"data": list(stub.sent)})
+
+            def _reply(self, status, body, headers=None):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--latency-ms", type=float, default=0, help="delay before answering each send")
+    parser.add_argument("--fail-rate", type=float, default=0, help="fraction of sends answered with a random 500")
+    args = parser.parse_args()
+
+    server = StubResendServer(args.port, args.latency_ms, args.fail_rate)
+    print(f"Stub Resend API on {server.url} (RESEND_API_URL={server.url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
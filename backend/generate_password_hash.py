@@ -1,27 +1,88 @@
 """
-Helper script to generate password hash for admin authentication.
+Helper script to generate password hashes and calibrate the bcrypt cost factor.
 
 Usage:
-    python generate_password_hash.py <your-password>
-    
-The output should be set as ADMIN_PASSWORD_HASH environment variable in Railway.
+    python generate_password_hash.py <your-password> [--rounds 12]
+    python generate_password_hash.py --calibrate [--target-ms 250]
+
+The hash output should be set as ADMIN_PASSWORD_HASH environment variable in Railway.
+Calibration times bcrypt on this host for a range of cost factors and
+recommends the highest one whose hash still fits the target latency; set it
+as BCRYPT_ROUNDS. Run it on the machine (or instance size) that serves logins.
 """
-import sys
+import argparse
+import os
+import statistics
+import time
+
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python generate_password_hash.py <password>")
-        sys.exit(1)
-    
-    password = sys.argv[1]
+
+def time_rounds(rounds: int, samples: int) -> float:
+    """ Median milliseconds to hash a password with the given cost factor. """
+    context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        context.hash("calibration-password")
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(target_ms: float, samples: int) -> None:
+    print(f"Timing bcrypt on this host (median of {samples}, target {target_ms:.0f} ms)\n")
+    print(f"{'rounds':>6} | {'hash/verify':>11}")
+    print("-" * 22)
+
+    recommended = None
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        elapsed = time_rounds(rounds, samples)
+        fits = elapsed <= target_ms
+        print(f"{rounds:>6} | {elapsed:>8.1f} ms{'' if fits else '  (over target)'}")
+        if fits:
+            recommended = (rounds, elapsed)
+        # Each extra round doubles the cost, no need to time further
+        if elapsed > target_ms * 2:
+            break
+
+    if recommended is None:
+        print(f"\nEven {MIN_ROUNDS} rounds exceed {target_ms:.0f} ms on this host; use BCRYPT_ROUNDS={MIN_ROUNDS}.")
+        return
+
+    rounds, elapsed = recommended
+    print(f"\nRecommended: BCRYPT_ROUNDS={rounds} (~{elapsed:.0f} ms per login)")
+    print("Each login occupies one PASSWORD_HASH_WORKERS thread for that long, so one")
+    print(f"worker sustains about {1000 / elapsed:.1f} logins per second.")
+
+
+def generate(password: str, rounds: int) -> None:
+    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
     hashed = pwd_context.hash(password)
-    
+
     print("\nGenerated password hash:")
     print(hashed)
     print("\nAdd this to your Railway environment variables:")
     print(f"ADMIN_PASSWORD_HASH={hashed}")
     print("\nOr add to backend/.env for local development:")
     print(f"ADMIN_PASSWORD_HASH=\"{hashed}\"")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("password", nargs="?", help="password to hash")
+    parser.add_argument("--rounds", type=int, default=int(os.getenv("BCRYPT_ROUNDS", "12")),
+                        help="bcrypt cost factor (default: $BCRYPT_ROUNDS or 12)")
+    parser.add_argument("--calibrate", action="store_true", help="benchmark cost factors on this host")
+    parser.add_argument("--target-ms", type=float, default=250, help="latency budget per hash for --calibrate")
+    parser.add_argument("--samples", type=int, default=5, help="hashes timed per cost factor")
+    args = parser.parse_args()
+
+    if args.calibrate:
+        calibrate(args.target_ms, args.samples)
+    elif args.password:
+        generate(args.password, args.rounds)
+    else:
+        parser.error("give a password to hash, or --calibrate")
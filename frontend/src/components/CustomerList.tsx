@@ -38,7 +38,7 @@ export function CustomerList() {
         try {
             const result = await customerService.notifyWinner(customerId);
             if (result.success) {
-                setNotifyMessage({ id: customerId, text: 'Notification sent!', type: 'success' });
+                setNotifyMessage({ id: customerId, text: 'Notification queued!', type: 'success' });
             } else {
                 setNotifyMessage({ id: customerId, text: result.message, type: 'error' });
             }